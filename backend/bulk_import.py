@@ -0,0 +1,228 @@
+"""Streaming bulk import of videos from NDJSON or CSV.
+
+Used by POST /api/videos/bulk and, run as a script, to load a file
+straight into MongoDB:
+
+    python bulk_import.py videos.ndjson
+    python bulk_import.py videos.csv --format csv --batch-size 2000
+"""
+from pymongo.errors import BulkWriteError
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import csv
+import json
+import os
+
+from database import videos_collection
+from logs import logger
+
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 1000))
+
+# CSV columns holding lists use this separator, e.g. "business|strategy"
+CSV_LIST_SEPARATOR = '|'
+CSV_LIST_FIELDS = {'tags'}
+
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into (line number, raw line) without buffering the whole body.
+
+    Lines are decoded by the record iterators, so one line of invalid
+    UTF-8 is reported as an invalid record instead of failing the import.
+    """
+    buffer = b''
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip(b'\r')
+    if buffer:
+        yield line_no + 1, buffer.rstrip(b'\r')
+
+def decode_line(line: bytes) -> str:
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Invalid UTF-8 at byte {e.start}") from None
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield (line, record, error) for each non-blank NDJSON line"""
+    async for line_no, raw in iter_lines(chunks):
+        if not raw.strip():
+            continue
+        try:
+            line = decode_line(raw)
+        except ValueError as e:
+            yield line_no, None, str(e)
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            yield line_no, record, None
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+
+def csv_record(header: List[str], values: List[str]) -> Dict[str, Any]:
+    """Map a CSV row onto video fields; empty cells are left out so model defaults apply"""
+    record = {}
+    for field, value in zip(header, values):
+        if value == '':
+            continue
+        if field in CSV_LIST_FIELDS:
+            record[field] = [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+        else:
+            record[field] = value
+    return record
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield (line, record, error) for each CSV row after the header"""
+    header = None
+    pending = ''
+    start_line = 0
+    error = None
+    async for line_no, raw in iter_lines(chunks):
+        if not pending:
+            start_line = line_no
+        try:
+            line = decode_line(raw)
+        except ValueError as e:
+            # Keep reading the row so its quotes still balance, then report it as invalid
+            error = error or (str(e) if line_no == start_line else f"{e} on line {line_no}")
+            line = raw.decode('utf-8', errors='replace')
+        pending = f"{pending}\n{line}" if pending else line
+        # A quoted field may contain newlines; wait until the quotes balance
+        if pending.count('"') % 2:
+            continue
+        row, pending = pending, ''
+        row_error, error = error, None
+        if not row.strip():
+            continue
+        values = next(csv.reader([row]))
+        if header is None:
+            header = [name.strip() for name in values]
+            if row_error is not None:
+                yield start_line, None, row_error
+            continue
+        if row_error is not None:
+            yield start_line, None, row_error
+            continue
+        yield start_line, csv_record(header, values), None
+    if pending:
+        yield start_line, None, error or "Unterminated quoted field"
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    return iter_csv(chunks) if fmt == 'csv' else iter_ndjson(chunks)
+
+async def import_records(
+    records: AsyncIterator[Record],
+    build_doc: Callable[[Dict[str, Any]], Dict[str, Any]],
+    batch_size: int = BULK_BATCH_SIZE,
+    on_batch: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+) -> Dict[str, Any]:
+    """Validate and insert records in insert_many batches.
+
+    build_doc turns a raw record into a video document and raises on
+    invalid input. on_batch is awaited with the documents of every batch
+    that was written. Returns a report with one result per record.
+    """
+    results: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    async def flush():
+        docs = [doc for _, doc in batch]
+        failed: Dict[int, str] = {}
+        try:
+            await videos_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = {error['index']: error.get('errmsg', 'write error') for error in e.details.get('writeErrors', [])}
+        except Exception as e:
+            failed = {index: str(e) for index in range(len(docs))}
+        written = []
+        for index, (line_no, doc) in enumerate(batch):
+            if index in failed:
+                results.append({'line': line_no, 'status': 'failed', 'error': failed[index]})
+            else:
+                results.append({'line': line_no, 'status': 'created', 'id': doc['id']})
+                written.append(doc)
+        batch.clear()
+        if written and on_batch is not None:
+            result = on_batch(written)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async for line_no, record, error in records:
+        if error is None:
+            try:
+                batch.append((line_no, build_doc(record)))
+            except Exception as e:
+                error = str(e)
+        if error is not None:
+            results.append({'line': line_no, 'status': 'invalid', 'error': error})
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    results.sort(key=lambda result: result['line'])
+    return {
+        'created': sum(1 for result in results if result['status'] == 'created'),
+        'invalid': sum(1 for result in results if result['status'] == 'invalid'),
+        'failed': sum(1 for result in results if result['status'] == 'failed'),
+        'results': results
+    }
+
+async def _file_chunks(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, 'rb') as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+async def _import_file(path: str, fmt: str, batch_size: int) -> Dict[str, Any]:
+    # Imported here so the module stays usable from server.py without a cycle
+    from server import on_videos_enriched, on_videos_imported, video_doc_from_record
+    from worker_bus import WORKER_BUS_ENABLED, worker_bus
+    from youtube import enrichment_queue
+
+    if WORKER_BUS_ENABLED:
+        # Running servers learn about the imported videos through the bus
+        try:
+            await worker_bus.start()
+        except Exception:
+            logger.exception('worker_bus_start_failed')
+    enrichment_queue.add_listener(on_videos_enriched)
+    enrichment_queue.start()
+    try:
+        return await import_records(
+            iter_records(_file_chunks(path), fmt), video_doc_from_record, batch_size, on_videos_imported
+        )
+    finally:
+        # Let queued YouTube lookups finish before the process exits
+        await enrichment_queue.stop(timeout=300)
+        await worker_bus.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=('ndjson', 'csv'), default=None,
+                        help='defaults to csv for .csv files, ndjson otherwise')
+    parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument('--report', help='write the per-record report to this file as NDJSON')
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.path.endswith('.csv') else 'ndjson')
+    report = asyncio.run(_import_file(args.path, fmt, args.batch_size))
+    if args.report:
+        with open(args.report, 'w') as handle:
+            for result in report['results']:
+                handle.write(json.dumps(result) + '\n')
+    print(f"created={report['created']} invalid={report['invalid']} failed={report['failed']}")
+    return 0 if not (report['invalid'] or report['failed']) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
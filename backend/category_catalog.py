@@ -0,0 +1,104 @@
+from pymongo import ReturnDocument
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import os
+import time
+
+from database import categories_collection, versions_collection
+from http_cache import make_etag
+from serialization import dumps
+
+CATEGORY_CACHE_ENABLED = os.environ.get('CATEGORY_CACHE_ENABLED', 'true').lower() == 'true'
+# How often a worker re-reads the shared version; bounds staleness if a bus event is missed
+CATEGORY_VERSION_CHECK_INTERVAL = float(os.environ.get('CATEGORY_VERSION_CHECK_INTERVAL', 5))
+
+CATEGORIES_VERSION_ID = 'categories'
+
+class CategoryCatalog:
+    """Versioned in-memory copy of the categories collection.
+
+    The version is a counter in the versions collection that every
+    category write bumps, so all workers agree on it. Each worker keeps
+    the sorted, pre-encoded list for the version it last loaded and only
+    re-reads the collection when the shared version moves. Other workers
+    hear about a bump through the worker bus and call invalidate(); the
+    periodic version check covers anything the bus misses.
+    """
+
+    def __init__(self, projection: Dict[str, int], check_interval: float = CATEGORY_VERSION_CHECK_INTERVAL):
+        self.projection = projection
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self.categories: Optional[List[Dict[str, Any]]] = None
+        self.body = b''
+        self.etag = ''
+        self.loaded_version: Optional[int] = None
+        self.checked_at = 0.0
+        self.loads = 0
+        self._lock = asyncio.Lock()
+
+    async def shared_version(self) -> int:
+        doc = await versions_collection.find_one({'_id': CATEGORIES_VERSION_ID})
+        return doc['version'] if doc else 0
+
+    async def get_version(self) -> int:
+        """Current catalog version, re-read from the database at most once per check interval"""
+        if self.version is None or time.monotonic() - self.checked_at > self.check_interval:
+            version = await self.shared_version()
+            self.checked_at = time.monotonic()
+            if version != self.version:
+                self.categories = None
+                self.version = version
+        return self.version
+
+    async def get(self, min_version: Optional[int] = None) -> Tuple[bytes, str, int]:
+        """Return (body, etag, version) of the sorted category list.
+
+        A client that has already seen a newer version than this worker's
+        (from another worker's /version) passes it as min_version, which
+        skips the check interval and re-reads the shared version.
+        """
+        if min_version is not None and self.version is not None and self.version < min_version:
+            self.invalidate()
+        await self.get_version()
+        if self.categories is None:
+            async with self._lock:
+                if self.categories is None:
+                    await self.reload()
+        return self.body, self.etag, self.version
+
+    async def reload(self):
+        # Version first: a write landing in between makes the next check reload again, never the reverse
+        version = await self.shared_version()
+        categories = await categories_collection.find({}, self.projection).sort('name', 1).to_list(length=None)
+        body = dumps(categories)
+        etag = make_etag(body)
+        if version == self.loaded_version and etag != self.etag:
+            # The collection changed without a bump (a direct write seen by the change feed)
+            version = await self._increment()
+        self.body = body
+        self.etag = etag
+        self.categories = categories
+        self.version = self.loaded_version = version
+        self.checked_at = time.monotonic()
+        self.loads += 1
+
+    async def bump(self) -> int:
+        """Record a category write: advance the shared version and drop the local copy"""
+        version = await self._increment()
+        self.invalidate()
+        return version
+
+    async def _increment(self) -> int:
+        doc = await versions_collection.find_one_and_update(
+            {'_id': CATEGORIES_VERSION_ID},
+            {'$inc': {'version': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['version']
+
+    def invalidate(self):
+        """Forget the local copy so the next read checks the version and reloads"""
+        self.categories = None
+        self.version = None
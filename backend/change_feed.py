@@ -0,0 +1,403 @@
+"""Typed change events for the videos and categories collections.
+
+In-process caches go stale when another worker, a bulk import or an
+admin writing straight to MongoDB changes a video or a category.
+ChangeFeed watches both collections and turns every change into one of
+these events for in-process listeners:
+
+    video_created     ids, documents   videos were inserted
+    video_updated     ids              video content changed, or videos were deleted
+    category_created  ids, documents   categories were inserted
+    category_updated  ids              categories changed or were deleted
+    view_delta        view_deltas      view counts grew by {video id: views};
+                      view_counts      new totals {video id: view_count}, where known
+    resync            -                events may have been missed; rebuild derived state
+
+On a replica set or sharded cluster the feed tails a change stream and
+checkpoints its resume token in the change_feed_state collection, so a
+restarted worker continues where the feed left off. A token that has
+fallen off the oplog produces a resync event. Standalone servers have no
+change streams (error 40573); there the feed polls created_at, updated_at
+and viewed_at every CHANGE_FEED_POLL_INTERVAL seconds. Polling cannot see
+deletes or direct writes that do not stamp those fields.
+
+To test the stream mode locally, start a single-node replica set:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval 'rs.initiate()'
+
+CHANGE_FEED_MODE=poll forces polling, which also works against mongomock.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pymongo.errors import OperationFailure
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import os
+import time
+
+from database import categories_collection, change_feed_state_collection, get_database, videos_collection
+from logs import logger
+
+CHANGE_FEED_ENABLED = os.environ.get('CHANGE_FEED_ENABLED', 'true').lower() == 'true'
+# auto uses a change stream where the deployment supports one and polls otherwise
+CHANGE_FEED_MODE = os.environ.get('CHANGE_FEED_MODE', 'auto').lower()
+# Workers sharing a name share one checkpoint
+CHANGE_FEED_NAME = os.environ.get('CHANGE_FEED_NAME', 'api')
+CHANGE_FEED_POLL_INTERVAL = float(os.environ.get('CHANGE_FEED_POLL_INTERVAL', 2.0))
+# Polls look back this far past the previous poll to absorb clock skew between servers
+CHANGE_FEED_POLL_OVERLAP = float(os.environ.get('CHANGE_FEED_POLL_OVERLAP', 1.0))
+# Changes arriving within this window are delivered as one event per kind
+CHANGE_FEED_BATCH_SECONDS = float(os.environ.get('CHANGE_FEED_BATCH_SECONDS', 0.2))
+CHANGE_FEED_BATCH_SIZE = int(os.environ.get('CHANGE_FEED_BATCH_SIZE', 1000))
+# A restart replays at most this much of the stream
+CHANGE_FEED_CHECKPOINT_SECONDS = float(os.environ.get('CHANGE_FEED_CHECKPOINT_SECONDS', 5.0))
+CHANGE_FEED_RETRY_SECONDS = float(os.environ.get('CHANGE_FEED_RETRY_SECONDS', 1.0))
+# Videos whose document _id and view counter state are remembered
+CHANGE_FEED_KNOWN_VIDEOS = int(os.environ.get('CHANGE_FEED_KNOWN_VIDEOS', 100000))
+
+VIDEO_CREATED = 'video_created'
+VIDEO_UPDATED = 'video_updated'
+CATEGORY_CREATED = 'category_created'
+CATEGORY_UPDATED = 'category_updated'
+VIEW_DELTA = 'view_delta'
+RESYNC = 'resync'
+
+# Fields written by view counter flushes; updates that only touch these are view events
+VIEW_FIELDS = {'view_count', 'view_count_delta', 'viewed_at'}
+
+# "The $changeStream stage is only supported on replica sets"
+CHANGE_STREAM_UNSUPPORTED = 40573
+# The resume token is no longer in the oplog, or the stream cannot be resumed
+CHANGE_STREAM_LOST = {280, 286}
+
+CHANGE_STREAM_PIPELINE = [
+    {'$match': {
+        'ns.coll': {'$in': ['videos', 'categories']},
+        'operationType': {'$in': ['insert', 'update', 'replace', 'delete']},
+    }},
+]
+
+class ChangeEvent(NamedTuple):
+    kind: str
+    ids: List[str] = []
+    documents: List[Dict[str, Any]] = []
+    view_deltas: Dict[str, int] = {}
+    view_counts: Dict[str, int] = {}
+
+Listener = Callable[[ChangeEvent], Awaitable[Any]]
+
+class ChangeBatch:
+    """Changes collected over one batch window, grouped into events"""
+
+    def __init__(self):
+        self.created: Dict[str, Dict[str, Dict[str, Any]]] = {'videos': {}, 'categories': {}}
+        self.updated: Dict[str, Dict[str, None]] = {'videos': {}, 'categories': {}}
+        self.view_deltas: Dict[str, int] = {}
+        self.view_counts: Dict[str, int] = {}
+        self.changed = set()
+
+    def add_created(self, collection: str, doc: Dict[str, Any]):
+        self.created[collection][doc['id']] = doc
+
+    def add_updated(self, collection: str, doc_id: Optional[str] = None):
+        """Record a change; without an id the event still fires, with whatever ids are known"""
+        if doc_id is not None:
+            self.updated[collection][doc_id] = None
+        self.changed.add(collection)
+
+    def add_views(self, video_id: str, views: int, view_count: Optional[int] = None):
+        if views > 0:
+            self.view_deltas[video_id] = self.view_deltas.get(video_id, 0) + views
+        if view_count is not None:
+            self.view_counts[video_id] = max(view_count, self.view_counts.get(video_id, 0))
+
+    def events(self) -> List[ChangeEvent]:
+        events = []
+        for collection, created, updated in (('videos', VIDEO_CREATED, VIDEO_UPDATED),
+                                             ('categories', CATEGORY_CREATED, CATEGORY_UPDATED)):
+            if self.created[collection]:
+                docs = self.created[collection]
+                events.append(ChangeEvent(created, list(docs), documents=list(docs.values())))
+            if collection in self.changed:
+                events.append(ChangeEvent(updated, list(self.updated[collection])))
+        if self.view_deltas or self.view_counts:
+            events.append(ChangeEvent(VIEW_DELTA, list(self.view_deltas.keys() | self.view_counts.keys()),
+                                      view_deltas=self.view_deltas, view_counts=self.view_counts))
+        return events
+
+class ChangeFeed:
+    """Change stream subscriber with a polling fallback.
+
+    Change stream events only carry the document _id, so the feed keeps a
+    bounded map of _id to video id (and of the last flushed view delta,
+    which an update omits when it is unchanged) and looks up the misses
+    in one query per batch.
+    """
+
+    def __init__(self, name: str = CHANGE_FEED_NAME, mode: str = CHANGE_FEED_MODE):
+        self.name = name
+        self.requested_mode = mode
+        self.mode: Optional[str] = None
+        self.listeners: Dict[str, List[Listener]] = {}
+        self.resume_token: Optional[Dict[str, Any]] = None
+        self.polled_until: Optional[datetime] = None
+        self.known_videos: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self.category_state: Optional[Dict[str, tuple]] = None
+        # (id, timestamp) of changes already delivered inside the poll overlap
+        self.polled: Dict[tuple, datetime] = {}
+        self.events: Dict[str, int] = {}
+        self.last_event_at: Optional[float] = None
+        self.checkpointed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, kind: str, listener: Listener):
+        self.listeners.setdefault(kind, []).append(listener)
+
+    async def start(self):
+        if self._task is not None:
+            return
+        state = await change_feed_state_collection.find_one({'_id': self.name})
+        if state is not None:
+            self.resume_token = state.get('resume_token')
+            self.polled_until = state.get('polled_until')
+        self.mode = await self._detect_mode()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.checkpoint()
+
+    async def _detect_mode(self) -> str:
+        if self.requested_mode in ('stream', 'poll'):
+            return self.requested_mode
+        try:
+            hello = await get_database().command('hello')
+        except Exception as e:
+            logger.warning('change_stream_detection_failed', fallback='poll', error=str(e))
+            return 'poll'
+        # Replica set members report setName, mongos reports isdbgrid
+        return 'stream' if 'setName' in hello or hello.get('msg') == 'isdbgrid' else 'poll'
+
+    async def _run(self):
+        while True:
+            try:
+                if self.mode == 'stream':
+                    await self._watch()
+                else:
+                    await self._poll_forever()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_UNSUPPORTED and self.requested_mode == 'auto':
+                    logger.warning('change_streams_unsupported', fallback='poll')
+                    self.mode = 'poll'
+                    continue
+                if e.code in CHANGE_STREAM_LOST:
+                    logger.warning('change_stream_lost', code=e.code, error=str(e))
+                    self.resume_token = None
+                    await self._dispatch(ChangeEvent(RESYNC))
+                    continue
+                logger.exception('change_feed_read_failed', mode=self.mode, code=e.code)
+            except Exception:
+                logger.exception('change_feed_read_failed', mode=self.mode)
+            await asyncio.sleep(CHANGE_FEED_RETRY_SECONDS)
+
+    async def _watch(self):
+        async with get_database().watch(
+            CHANGE_STREAM_PIPELINE,
+            resume_after=self.resume_token,
+            max_await_time_ms=int(CHANGE_FEED_BATCH_SECONDS * 1000)
+        ) as stream:
+            changes: List[Dict[str, Any]] = []
+            window_start = 0.0
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    if not changes:
+                        window_start = time.monotonic()
+                    changes.append(change)
+                full = len(changes) >= CHANGE_FEED_BATCH_SIZE
+                if changes and (change is None or full or time.monotonic() - window_start >= CHANGE_FEED_BATCH_SECONDS):
+                    await self._apply_changes(changes)
+                    changes = []
+                if not changes:
+                    # Only advance the token past changes that have been delivered
+                    self.resume_token = stream.resume_token
+                    await self._maybe_checkpoint()
+
+    async def _apply_changes(self, changes: List[Dict[str, Any]]):
+        inserted = {change['documentKey']['_id'] for change in changes if 'fullDocument' in change}
+        await self._resolve_videos(list({
+            change['documentKey']['_id'] for change in changes
+            if change['ns']['coll'] == 'videos' and change['operationType'] == 'update'
+            and change['documentKey']['_id'] not in self.known_videos
+            and change['documentKey']['_id'] not in inserted
+        }))
+        batch = ChangeBatch()
+        for change in changes:
+            collection = change['ns']['coll']
+            operation = change['operationType']
+            object_id = change['documentKey']['_id']
+            if operation in ('insert', 'replace'):
+                doc = change['fullDocument']
+                if collection == 'videos':
+                    self._remember(object_id, doc['id'], doc.get('view_count_delta'))
+                if operation == 'insert':
+                    batch.add_created(collection, doc)
+                else:
+                    batch.add_updated(collection, doc['id'])
+            elif operation == 'update':
+                self._apply_update(batch, collection, object_id, change['updateDescription'])
+            elif collection == 'videos' and object_id in self.known_videos:
+                batch.add_updated('videos', self.known_videos.pop(object_id)['id'])
+            elif collection == 'categories':
+                # Category events only carry the _id; listeners reload the (small) collection
+                batch.add_updated('categories')
+        await self._deliver(batch)
+
+    def _apply_update(self, batch: ChangeBatch, collection: str, object_id, description: Dict[str, Any]):
+        fields = set(description.get('updatedFields', {})) | set(description.get('removedFields', []))
+        if collection == 'categories':
+            batch.add_updated('categories')
+            return
+        known = self.known_videos.get(object_id)
+        if known is None:
+            return  # deleted before it could be looked up
+        updated = description.get('updatedFields', {})
+        if 'view_count_delta' in updated:
+            known['view_count_delta'] = updated['view_count_delta']
+        views = known['view_count_delta'] if 'viewed_at' in updated and known.get('view_count_delta') else 0
+        if views or 'view_count' in updated:
+            # Enrichment also raises view_count (by YouTube's count); that is a new total but not new views
+            batch.add_views(known['id'], views, updated.get('view_count'))
+        if fields - VIEW_FIELDS:
+            batch.add_updated('videos', known['id'])
+
+    async def _resolve_videos(self, object_ids: List[Any]):
+        if not object_ids:
+            return
+        async for doc in videos_collection.find({'_id': {'$in': object_ids}}, {'id': 1, 'view_count_delta': 1}):
+            self._remember(doc['_id'], doc['id'], doc.get('view_count_delta'))
+
+    def _remember(self, key, video_id: str, view_count_delta: Optional[int] = None, view_count: Optional[int] = None):
+        self.known_videos[key] = {'id': video_id, 'view_count_delta': view_count_delta, 'view_count': view_count}
+        self.known_videos.move_to_end(key)
+        if len(self.known_videos) > CHANGE_FEED_KNOWN_VIDEOS:
+            self.known_videos.popitem(last=False)
+
+    async def _poll_forever(self):
+        while True:
+            await self.poll()
+            await self._maybe_checkpoint()
+            await asyncio.sleep(CHANGE_FEED_POLL_INTERVAL)
+
+    async def poll(self):
+        """Deliver the changes stamped since the previous poll"""
+        started = datetime.utcnow()
+        since = self.polled_until
+        batch = ChangeBatch()
+        if since is not None:
+            since -= timedelta(seconds=CHANGE_FEED_POLL_OVERLAP)
+            self.polled = {key: stamp for key, stamp in self.polled.items() if stamp >= since}
+            async for doc in videos_collection.find({'created_at': {'$gte': since}}, {'_id': 0}):
+                if self._first_poll(doc['id'], doc['created_at']):
+                    batch.add_created('videos', doc)
+            async for doc in videos_collection.find(
+                {'updated_at': {'$gte': since}},
+                {'id': 1, 'created_at': 1, 'updated_at': 1, 'view_count': 1, 'view_count_delta': 1, 'viewed_at': 1}
+            ):
+                if doc['updated_at'] != doc['created_at'] and self._first_poll(doc['id'], doc['updated_at']):
+                    batch.add_updated('videos', doc['id'])
+                    batch.add_views(doc['id'], 0, doc.get('view_count'))
+                    known = self.known_videos.get(doc['id'])
+                    if known is not None and 'view_count' in doc:
+                        # Enrichment raises view_count by YouTube's count, which must not read as new
+                        # views below; a flush made after the update still counts as views
+                        flushed_after = doc.get('viewed_at') is not None and doc['viewed_at'] >= doc['updated_at']
+                        known['view_count'] = doc['view_count'] - ((doc.get('view_count_delta') or 0) if flushed_after else 0)
+            async for doc in videos_collection.find(
+                {'viewed_at': {'$gte': since}}, {'_id': 0, 'id': 1, 'view_count': 1, 'view_count_delta': 1}
+            ):
+                known = self.known_videos.get(doc['id'])
+                # A video seen for the first time counts its last flush, a lower bound on new views
+                views = doc['view_count'] - known['view_count'] if known else doc.get('view_count_delta') or 0
+                self._remember(doc['id'], doc['id'], doc.get('view_count_delta'), doc['view_count'])
+                batch.add_views(doc['id'], views, doc['view_count'])
+        await self._poll_categories(batch)
+        self.polled_until = started
+        await self._deliver(batch)
+
+    def _first_poll(self, doc_id: str, stamp: datetime) -> bool:
+        if (doc_id, stamp) in self.polled:
+            return False
+        self.polled[(doc_id, stamp)] = stamp
+        return True
+
+    async def _poll_categories(self, batch: ChangeBatch):
+        # Categories are few; comparing the whole collection also catches edits and deletes
+        state = {}
+        docs = {}
+        async for doc in categories_collection.find({}, {'_id': 0}):
+            state[doc['id']] = (doc.get('name'), doc.get('description'))
+            docs[doc['id']] = doc
+        if self.category_state is not None:
+            for category_id, fields in state.items():
+                previous = self.category_state.get(category_id)
+                if previous is None:
+                    batch.add_created('categories', docs[category_id])
+                elif previous != fields:
+                    batch.add_updated('categories', category_id)
+            for category_id in self.category_state.keys() - state.keys():
+                batch.add_updated('categories', category_id)
+        self.category_state = state
+
+    async def _deliver(self, batch: ChangeBatch):
+        for event in batch.events():
+            await self._dispatch(event)
+
+    async def _dispatch(self, event: ChangeEvent):
+        self.events[event.kind] = self.events.get(event.kind, 0) + 1
+        self.last_event_at = time.time()
+        for listener in self.listeners.get(event.kind, []):
+            try:
+                await listener(event)
+            except Exception:
+                logger.exception('change_event_handler_failed', kind=event.kind)
+
+    async def _maybe_checkpoint(self):
+        if time.monotonic() - self.checkpointed_at >= CHANGE_FEED_CHECKPOINT_SECONDS:
+            await self.checkpoint()
+
+    async def checkpoint(self):
+        """Save the resume position; failures only cost a longer replay after a restart"""
+        self.checkpointed_at = time.monotonic()
+        try:
+            await change_feed_state_collection.update_one(
+                {'_id': self.name},
+                {'$set': {
+                    'resume_token': self.resume_token,
+                    'polled_until': self.polled_until,
+                    'mode': self.mode,
+                    'updated_at': datetime.utcnow(),
+                }},
+                upsert=True
+            )
+        except Exception:
+            logger.exception('change_feed_checkpoint_failed', feed=self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'events': dict(self.events),
+            'last_event_at': self.last_event_at,
+            'known_videos': len(self.known_videos),
+        }
+
+change_feed = ChangeFeed()
@@ -0,0 +1,69 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+
+# Environment variables
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'sme_network')
+
+# Connection pool tuning
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+
+_client = None
+_client_pid = None
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the shared Motor client, creating it on first use.
+
+    A client inherited across fork() is never reused: its sockets and
+    monitor threads belong to the parent, so each worker builds its own.
+    pymongo only attaches command listeners (metrics, profiling) to
+    clients created after they are registered, so server.py installs
+    them at import time, before the first call.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client_pid = os.getpid()
+        _client = AsyncIOMotorClient(
+            MONGO_URL,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        )
+    return _client
+
+def get_database():
+    """Return the application database"""
+    return get_client()[DB_NAME]
+
+def close_client():
+    """Close the shared client and drop its connection pool"""
+    global _client
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+    _client = None
+
+class LazyCollection:
+    """Collection handle that resolves against the current client on every access.
+
+    The client is only created the first time a query runs, so importing
+    server.py never opens sockets (important for forked workers).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_database()[self.name], attr)
+
+videos_collection = LazyCollection('videos')
+categories_collection = LazyCollection('categories')
+# Monotonic version counters for cached collections, one document per collection
+versions_collection = LazyCollection('versions')
+# Change feed resume tokens and poll positions, see change_feed.py
+change_feed_state_collection = LazyCollection('change_feed_state')
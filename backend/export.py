@@ -0,0 +1,43 @@
+"""Streaming NDJSON export of the video catalog, used by GET /api/videos/export.
+
+Documents come off a MongoDB cursor EXPORT_BATCH_SIZE at a time and are
+written out in chunks of about EXPORT_CHUNK_BYTES. The next batch is only
+fetched once the response has taken the previous chunks, so memory stays
+at one batch plus one chunk whatever the catalog size, and a slow client
+slows the cursor down instead of filling a buffer.
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import os
+
+from database import videos_collection
+from serialization import dumps
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+EXPORT_CHUNK_BYTES = int(os.environ.get('EXPORT_CHUNK_BYTES', 64 * 1024))
+
+def export_filter(updated_since: Optional[datetime]) -> Dict[str, Any]:
+    """Videos created or edited since the given time; view counts alone do not count as edits"""
+    if updated_since is None:
+        return {}
+    # Videos stored before updated_at was stamped only carry created_at
+    return {'$or': [{'updated_at': {'$gte': updated_since}}, {'created_at': {'$gte': updated_since}}]}
+
+def export_cursor(projection: Dict[str, int], updated_since: Optional[datetime] = None,
+                  batch_size: int = EXPORT_BATCH_SIZE):
+    return videos_collection.find(export_filter(updated_since), projection, batch_size=batch_size)
+
+async def iter_export(cursor, defaults: Dict[str, Any], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Encode cursor documents as NDJSON chunks"""
+    chunk = bytearray()
+    async for doc in cursor:
+        for name, value in defaults.items():
+            if name not in doc:
+                doc[name] = value
+        chunk += dumps(doc)
+        chunk += b'\n'
+        if len(chunk) >= chunk_bytes:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
@@ -0,0 +1,253 @@
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import os
+import time
+
+from database import categories_collection
+from http_cache import make_etag
+from logs import logger
+from serialization import VIDEO_CARD_FIELDS, fields_projection
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Each worker then builds and serves its own snapshot
+    aioredis = None
+
+REDIS_URL = os.environ.get('REDIS_URL')
+FEATURED_SNAPSHOT_KEY = os.environ.get('FEATURED_SNAPSHOT_KEY', 'sme:featured')
+# Full rebuild interval; bounds drift from view counts and writes made outside the API
+FEATURED_SNAPSHOT_MAX_AGE = float(os.environ.get('FEATURED_SNAPSHOT_MAX_AGE', 300))
+
+FEATURED_VIDEOS_PER_CATEGORY = 10
+
+def featured_pipeline(
+    per_category: int = FEATURED_VIDEOS_PER_CATEGORY,
+    row_projection: Optional[Dict[str, int]] = None,
+    hero_projection: Optional[Dict[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """Aggregation over categories that yields the whole homepage in one round-trip.
+
+    Each category document pulls its latest videos through a correlated
+    $lookup and the hero video (latest non-premium) is appended with
+    $unionWith. Empty categories are kept so callers know every name.
+    Output documents are tagged with 'kind' so the caller can tell the two
+    apart. row_projection trims the category row videos and
+    hero_projection the hero; without them videos are returned whole.
+    """
+    return [
+        {'$lookup': {
+            'from': 'videos',
+            'localField': 'name',
+            'foreignField': 'category',
+            'pipeline': [
+                {'$sort': {'created_at': -1}},
+                {'$limit': per_category},
+                {'$project': row_projection} if row_projection else {'$unset': '_id'},
+            ],
+            'as': 'videos',
+        }},
+        {'$project': {'_id': 0, 'kind': 'category', 'category': '$name', 'videos': 1}},
+        {'$unionWith': {
+            'coll': 'videos',
+            'pipeline': [
+                {'$match': {'is_premium': False}},
+                {'$sort': {'created_at': -1}},
+                {'$limit': 1},
+                {'$project': hero_projection} if hero_projection else {'$unset': '_id'},
+                {'$replaceWith': {'kind': 'hero', 'video': '$$ROOT'}},
+            ],
+        }},
+    ]
+
+async def _aggregate_featured(
+    row_projection: Optional[Dict[str, int]] = None,
+    hero_projection: Optional[Dict[str, int]] = None
+) -> Tuple[List[str], Dict[str, Any]]:
+    """Run the featured pipeline, returning all category names and the payload"""
+    category_names = []
+    hero_video = None
+    featured_content = []
+
+    pipeline = featured_pipeline(row_projection=row_projection, hero_projection=hero_projection)
+    async for doc in categories_collection.aggregate(pipeline):
+        if doc['kind'] == 'hero':
+            hero_video = doc['video']
+            continue
+        category_names.append(doc['category'])
+        if doc['videos']:
+            featured_content.append({
+                'category': doc['category'],
+                'videos': doc['videos']
+            })
+
+    return category_names, {
+        'hero_video': hero_video,
+        'categories': featured_content
+    }
+
+async def load_featured_content(
+    row_projection: Optional[Dict[str, int]] = None,
+    hero_projection: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """Build the /api/featured payload with a single aggregation"""
+    _, payload = await _aggregate_featured(row_projection, hero_projection)
+    return payload
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+class FeaturedSnapshot:
+    """Precomputed /api/featured response, kept current by incremental updates.
+
+    Reads return pre-encoded JSON bytes and their ETag. New videos and
+    categories are folded into the snapshot as they are created instead of
+    re-running the aggregation. When REDIS_URL is set the snapshot is also
+    published to Redis so that other workers can pick it up. Category rows
+    carry row_fields and the hero hero_fields, so stored-only fields such
+    as view_count_delta never reach clients.
+    """
+
+    def __init__(
+        self,
+        hero_fields: Iterable[str],
+        redis_url: Optional[str] = REDIS_URL,
+        max_age: float = FEATURED_SNAPSHOT_MAX_AGE,
+        row_fields: Iterable[str] = VIDEO_CARD_FIELDS
+    ):
+        self.max_age = max_age
+        self.hero_fields = list(hero_fields)
+        self.row_fields = list(row_fields)
+        self.redis = aioredis.from_url(redis_url) if (redis_url and aioredis) else None
+        self.category_names: List[str] = []
+        self.payload: Optional[Dict[str, Any]] = None
+        self.body = b''
+        self.etag = ''
+        self.built_at = 0.0
+        # Bumped by invalidate() so a rebuild that raced with a change is not kept
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> Tuple[bytes, str]:
+        """Return (body, etag), rebuilding only when missing or expired"""
+        if self.redis is not None:
+            await self._sync_from_redis()
+        if self.payload is None or time.monotonic() - self.built_at > self.max_age:
+            async with self._lock:
+                if self.payload is None or time.monotonic() - self.built_at > self.max_age:
+                    return await self.rebuild()
+        return self.body, self.etag
+
+    async def rebuild(self) -> Tuple[bytes, str]:
+        """Recompute the snapshot from the database and return its (body, etag).
+
+        If invalidate() ran meanwhile, the result may predate that change:
+        it still answers the read that asked for it but is not kept.
+        """
+        generation = self._generation
+        category_names, payload = await _aggregate_featured(
+            fields_projection(self.row_fields), fields_projection(self.hero_fields)
+        )
+        payload = jsonable_encoder(payload)
+        if generation != self._generation:
+            body = _encode(payload)
+            return body, make_etag(body)
+        self.category_names = category_names
+        await self._publish(payload)
+        return self.body, self.etag
+
+    async def invalidate(self, shared: bool = True):
+        """Drop the snapshot so the next read rebuilds it; shared=False leaves Redis alone"""
+        self._generation += 1
+        self.payload = None
+        if shared and self.redis is not None:
+            try:
+                await self.redis.delete(FEATURED_SNAPSHOT_KEY)
+            except Exception as e:
+                logger.warning('featured_snapshot_redis_failed', operation='delete', error=str(e))
+
+    def contains(self, video_ids: Iterable[str]) -> bool:
+        """Whether any of the videos is shown in the snapshot"""
+        if self.payload is None:
+            return False
+        shown = {video['id'] for entry in self.payload['categories'] for video in entry['videos']}
+        if self.payload['hero_video']:
+            shown.add(self.payload['hero_video']['id'])
+        return not shown.isdisjoint(video_ids)
+
+    async def apply_video(self, video_doc: Dict[str, Any]):
+        """Fold a newly created video into the snapshot; videos already in it are skipped"""
+        async with self._lock:
+            if self.payload is None or self.contains([video_doc['id']]):
+                return
+            video_doc = jsonable_encoder({k: v for k, v in video_doc.items() if k != '_id'})
+            hero = {field: video_doc[field] for field in self.hero_fields if field in video_doc}
+            video = {field: video_doc[field] for field in self.row_fields if field in video_doc}
+            payload = {
+                'hero_video': self.payload['hero_video'],
+                'categories': list(self.payload['categories'])
+            }
+            if not video_doc['is_premium']:
+                payload['hero_video'] = hero
+
+            if video['category'] in self.category_names:
+                for index, entry in enumerate(payload['categories']):
+                    if entry['category'] == video['category']:
+                        videos = [video] + entry['videos'][:FEATURED_VIDEOS_PER_CATEGORY - 1]
+                        payload['categories'][index] = {'category': entry['category'], 'videos': videos}
+                        break
+                else:
+                    payload['categories'] = self._ordered(
+                        payload['categories'] + [{'category': video['category'], 'videos': [video]}]
+                    )
+            await self._publish(payload)
+
+    async def apply_category(self, category_doc: Dict[str, Any]):
+        """Register a new category; it appears once it has videos"""
+        async with self._lock:
+            if self.payload is not None and category_doc['name'] not in self.category_names:
+                self.category_names.append(category_doc['name'])
+                await self._publish(self.payload)
+
+    def _ordered(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        position = {name: index for index, name in enumerate(self.category_names)}
+        return sorted(entries, key=lambda entry: position[entry['category']])
+
+    async def _publish(self, payload: Dict[str, Any]):
+        generation = self._generation
+        self.payload = payload
+        self.body = _encode(payload)
+        self.etag = make_etag(self.body)
+        self.built_at = time.monotonic()
+        if self.redis is not None:
+            try:
+                await self.redis.hset(FEATURED_SNAPSHOT_KEY, mapping={
+                    'etag': self.etag,
+                    'body': self.body,
+                    'category_names': json.dumps(self.category_names),
+                })
+                await self.redis.expire(FEATURED_SNAPSHOT_KEY, max(1, int(self.max_age)))
+                if generation != self._generation:
+                    # invalidate() ran during the write and its delete may have landed first
+                    await self.redis.delete(FEATURED_SNAPSHOT_KEY)
+            except Exception as e:
+                logger.warning('featured_snapshot_redis_failed', operation='publish', error=str(e))
+
+    async def _sync_from_redis(self):
+        """Adopt a snapshot published by another worker, if it differs from ours"""
+        try:
+            etag = await self.redis.hget(FEATURED_SNAPSHOT_KEY, 'etag')
+            if etag is None or etag.decode() == self.etag:
+                return
+            body, category_names = await self.redis.hmget(FEATURED_SNAPSHOT_KEY, 'body', 'category_names')
+        except Exception as e:
+            logger.warning('featured_snapshot_redis_failed', operation='read', error=str(e))
+            return
+        if body is None:
+            return
+        self.body = body
+        self.etag = etag.decode()
+        self.payload = json.loads(body)
+        self.category_names = json.loads(category_names or '[]')
+        self.built_at = time.monotonic()
@@ -0,0 +1,273 @@
+from fastapi import Request
+from typing import List, NamedTuple, Optional, Pattern, Tuple
+import gzip
+import hashlib
+import os
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+# Never carry a body, so there is nothing to compress even with a minimum size of 0
+NO_BODY_STATUSES = (204, 304)
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+# Compressed representations get their own ETag suffix, as Apache's mod_deflate does
+ETAG_ENCODING_SUFFIXES = ('-gzip"', '-br"')
+
+class CachePolicy(NamedTuple):
+    cache_control: str
+    etag: bool = False  # hash the body into an ETag and answer If-None-Match with 304
+    # Cache-Control for requests naming a content version with ?v=, used only when the
+    # response's version_header says it holds that version, so its body cannot change
+    versioned: Optional[str] = None
+    version_header: Optional[str] = None
+
+# Per-route HTTP caching, by method and path template; first match wins.
+# Anything backed by mutable data is no-cache: browsers revalidate every time
+# and get a 304 while the ETag still matches, so a new video or view count
+# shows up on the next request instead of after a max-age. nginx does not
+# store no-cache responses; it only caches the versioned category lists.
+CACHE_POLICIES: List[Tuple[str, str, CachePolicy]] = [
+    ('GET', '/api/featured', CachePolicy('no-cache', etag=True)),
+    ('GET', '/api/trending', CachePolicy('no-cache', etag=True)),
+    ('GET', '/api/categories/version', CachePolicy('no-cache')),
+    ('GET', '/api/categories', CachePolicy('no-cache', etag=True, versioned='public, max-age=300',
+                                           version_header='X-Categories-Version')),
+    ('GET', '/api/search/suggest', CachePolicy('no-cache', etag=True)),
+    ('GET', '/api/search', CachePolicy('no-cache', etag=True)),
+    ('GET', '/api/videos/export', CachePolicy('no-store')),
+    ('GET', '/api/videos/{video_id}', CachePolicy('no-cache', etag=True)),
+    ('GET', '/api/videos', CachePolicy('no-cache', etag=True)),
+    ('GET', '/', CachePolicy('no-cache')),
+]
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _strip_encoding(etag: str) -> str:
+    for suffix in ETAG_ENCODING_SUFFIXES:
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def _if_none_match(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [_strip_encoding(value.strip()) for value in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match header covers the given ETag"""
+    return _if_none_match(request.headers.get('if-none-match'), etag)
+
+def _query_version(query_string: bytes) -> Optional[bytes]:
+    for param in query_string.split(b'&'):
+        if param.startswith(b'v=') and len(param) > 2:
+            return param[2:]
+    return None
+
+def _template_pattern(template: str) -> Pattern:
+    return re.compile('^' + re.sub(r'\\\{[^/]+?\\\}', '[^/]+', re.escape(template)) + '$')
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+def _replace_header(headers: List[Tuple[bytes, bytes]], name: bytes, value: Optional[bytes]):
+    headers[:] = [(key, existing) for key, existing in headers if key.lower() != name]
+    if value is not None:
+        headers.append((name, value))
+
+class HTTPCacheMiddleware:
+    """Applies CACHE_POLICIES: Cache-Control on every matching response, and
+    body-hash ETags with 304 handling where the policy asks for it.
+
+    Routes that already set an ETag (e.g. the featured snapshot's content
+    version) keep it. Streaming responses only get Cache-Control.
+    """
+
+    def __init__(self, app, policies: List[Tuple[str, str, CachePolicy]] = CACHE_POLICIES):
+        self.app = app
+        self.policies = [(method, _template_pattern(path), policy) for method, path, policy in policies]
+
+    def policy_for(self, method: str, path: str) -> Optional[CachePolicy]:
+        if method == 'HEAD':
+            method = 'GET'
+        for policy_method, pattern, policy in self.policies:
+            if policy_method == method and pattern.match(path):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        policy = self.policy_for(scope['method'], scope['path'])
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        requested_version = _query_version(scope.get('query_string', b'')) if policy.versioned else None
+        if_none_match = None
+        for key, value in scope['headers']:
+            if key == b'if-none-match':
+                if_none_match = value.decode('latin-1')
+        start_message = None
+
+        async def send_with_cache(message):
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                cache_control = policy.cache_control
+                if requested_version is not None:
+                    served_version = _header(headers, policy.version_header.lower().encode())
+                    if served_version == requested_version:
+                        cache_control = policy.versioned
+                if message['status'] in (200, 304) and _header(headers, b'cache-control') is None:
+                    headers.append((b'cache-control', cache_control.encode()))
+                message = dict(message, headers=headers)
+                if not policy.etag or message['status'] != 200 or _header(headers, b'etag') is not None:
+                    await send(message)
+                else:
+                    # Hold the start until the body is known so the ETag can be added
+                    start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            if message.get('more_body', False):
+                await send(start)
+                await send(message)
+                return
+
+            headers = start['headers']
+            etag = make_etag(message.get('body', b''))
+            if _if_none_match(if_none_match, etag):
+                headers = [(key, value) for key, value in headers if key.lower() != b'content-length']
+                headers.append((b'etag', etag.encode()))
+                await send(dict(start, status=304, headers=headers))
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            headers.append((b'etag', etag.encode()))
+            await send(dict(start, headers=headers))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache)
+
+class CompressionMiddleware:
+    """Brotli (when installed) or gzip for responses over COMPRESSION_MIN_SIZE.
+
+    Whole bodies are compressed in one go; streaming bodies are compressed
+    chunk by chunk. Responses that already carry a Content-Encoding, and
+    204/304 responses, pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    @staticmethod
+    def negotiate(accept_encoding: str) -> Optional[str]:
+        accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        accept_encoding = ''
+        for key, value in scope['headers']:
+            if key == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+        encoding = self.negotiate(accept_encoding)
+        start_message = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                vary = _header(headers, b'vary')
+                if vary is None or b'accept-encoding' not in vary.lower():
+                    _replace_header(headers, b'vary', vary + b', Accept-Encoding' if vary else b'Accept-Encoding')
+                message = dict(message, headers=headers)
+                if (encoding is None or message['status'] in NO_BODY_STATUSES
+                        or _header(headers, b'content-encoding') is not None):
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if compressor is not None:
+                body = compressor.compress(message.get('body', b''))
+                if not message.get('more_body', False):
+                    body += compressor.flush()
+                await send(dict(message, body=body))
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = start['headers']
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if not more_body and len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            _replace_header(headers, b'content-encoding', encoding.encode())
+            etag = _header(headers, b'etag')
+            if etag is not None and etag.endswith(b'"') and not etag.startswith(b'W/'):
+                _replace_header(headers, b'etag', etag[:-1] + f'-{encoding}"'.encode())
+            if more_body:
+                _replace_header(headers, b'content-length', None)
+                compressor = self._compressor(encoding)
+                await send(start)
+                await send(dict(message, body=compressor.compress(body)))
+                return
+            compressed = self._compress(encoding, body)
+            _replace_header(headers, b'content-length', str(len(compressed)).encode())
+            await send(start)
+            await send(dict(message, body=compressed))
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compress(encoding: str, body: bytes) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+    @staticmethod
+    def _compressor(encoding: str):
+        if encoding == 'br':
+            return _BrotliStream(brotli.Compressor(quality=BROTLI_QUALITY))
+        # wbits=31 writes a gzip header and trailer
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+class _BrotliStream:
+    """Adapts brotli.Compressor to the compress/flush interface of zlib objects"""
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def flush(self) -> bytes:
+        return self.compressor.finish()
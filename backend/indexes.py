@@ -0,0 +1,147 @@
+"""Declarative index manifest for the videos and categories collections.
+
+Applied idempotently at startup by ensure_indexes(). Run as a script to
+explain the query shape of every route and report the ones that still
+scan the collection or sort in memory:
+
+    python indexes.py [--apply] [--mongo-url URL] [--db-name NAME]
+"""
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from typing import Any, Dict, List, Tuple
+import argparse
+import sys
+
+from database import DB_NAME, MONGO_URL, categories_collection, videos_collection
+from logs import logger
+from pagination import VIDEO_SORT
+from search import TEXT_INDEX_LANGUAGE, TEXT_INDEX_NAME, TEXT_INDEX_WEIGHTS
+
+# The list indexes end in the (created_at, id) page order so filtered lists and
+# cursor pages are served in index order without an in-memory sort. The
+# view_count, updated_at and viewed_at indexes serve single-key range scans
+# (ranking seed, change feed polling) and do not follow the page order.
+INDEX_MANIFEST: Dict[str, List[IndexModel]] = {
+    'videos': [
+        # get_video, increment_view_count
+        IndexModel([('id', ASCENDING)], name='videos_id', unique=True),
+        # get_videos without filters, search in regex mode
+        IndexModel([('created_at', DESCENDING), ('id', DESCENDING)], name='videos_created_at'),
+        # get_videos?category=, featured per-category lookup
+        IndexModel([('category', ASCENDING), ('created_at', DESCENDING), ('id', DESCENDING)],
+                   name='videos_category_created_at'),
+        # get_videos?is_premium=, featured hero video
+        IndexModel([('is_premium', ASCENDING), ('created_at', DESCENDING), ('id', DESCENDING)],
+                   name='videos_premium_created_at'),
+        # get_videos?is_live=
+        IndexModel([('is_live', ASCENDING), ('created_at', DESCENDING), ('id', DESCENDING)],
+                   name='videos_live_created_at'),
+        # most-viewed ranking seed (trending.Rankings.seed)
+        IndexModel([('view_count', DESCENDING)], name='videos_view_count'),
+        # change feed polling (standalone servers only)
+        IndexModel([('updated_at', DESCENDING)], name='videos_updated_at'),
+        IndexModel([('viewed_at', DESCENDING)], name='videos_viewed_at'),
+        # enrichment resumed at startup; only pending videos are indexed
+        IndexModel([('enrichment_status', ASCENDING)], name='videos_enrichment_pending',
+                   partialFilterExpression={'enrichment_status': 'pending'}),
+        # search in text mode
+        IndexModel([(field, TEXT) for field in TEXT_INDEX_WEIGHTS], name=TEXT_INDEX_NAME,
+                   weights=TEXT_INDEX_WEIGHTS, default_language=TEXT_INDEX_LANGUAGE),
+    ],
+    'categories': [
+        IndexModel([('id', ASCENDING)], name='categories_id', unique=True),
+        # get_categories, featured lookup driver
+        IndexModel([('name', ASCENDING)], name='categories_name'),
+    ],
+}
+
+# Representative query shapes issued by each route: (route, collection, filter, sort)
+ROUTE_QUERIES: List[Tuple[str, str, Dict[str, Any], List[Tuple[str, int]]]] = [
+    ('GET /api/videos', 'videos', {}, VIDEO_SORT),
+    ('GET /api/videos?category=', 'videos', {'category': 'Business'}, VIDEO_SORT),
+    ('GET /api/videos?is_premium=', 'videos', {'is_premium': True}, VIDEO_SORT),
+    ('GET /api/videos?is_live=', 'videos', {'is_live': True}, VIDEO_SORT),
+    ('GET /api/videos/{id}', 'videos', {'id': 'video-id'}, []),
+    ('PUT /api/videos/{id}/view', 'videos', {'id': 'video-id'}, []),
+    ('GET /api/featured (category rows)', 'videos', {'category': 'Business'}, [('created_at', -1)]),
+    ('GET /api/featured (hero)', 'videos', {'is_premium': False}, [('created_at', -1)]),
+    ('GET /api/search?mode=text', 'videos', {'$text': {'$search': 'business'}}, []),
+    ('GET /api/categories', 'categories', {}, [('name', 1)]),
+    ('most-viewed seed', 'videos', {}, [('view_count', -1)]),
+    ('change feed poll (updates)', 'videos', {'updated_at': {'$gte': datetime(2024, 1, 1)}}, []),
+    ('change feed poll (views)', 'videos', {'viewed_at': {'$gte': datetime(2024, 1, 1)}}, []),
+    ('enrichment resume', 'videos', {'enrichment_status': 'pending'}, []),
+]
+
+async def ensure_indexes() -> List[str]:
+    """Create every index in the manifest; existing identical indexes are left alone.
+
+    Indexes are created one at a time, so one that conflicts with an
+    existing index (a second text index, or the same keys under another
+    name) is logged and skipped without holding back the others. Returns
+    the names of the indexes that could not be created.
+    """
+    collections = {'videos': videos_collection, 'categories': categories_collection}
+    failed = []
+    for name, models in INDEX_MANIFEST.items():
+        for model in models:
+            try:
+                await collections[name].create_indexes([model])
+            except Exception as e:
+                index = model.document['name']
+                logger.warning('index_create_failed', collection=name, index=index, error=str(e))
+                failed.append(index)
+    return failed
+
+def plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of an explain winningPlan"""
+    stages = [plan.get('stage')]
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        stages += plan_stages(child)
+    return [stage for stage in stages if stage]
+
+def report(db) -> int:
+    """Explain every route query shape and print which ones are unindexed"""
+    unindexed = 0
+    for route, collection, query, sort in ROUTE_QUERIES:
+        cursor = db[collection].find(query).limit(20)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = plan_stages(cursor.explain()['queryPlanner']['winningPlan'])
+        problems = []
+        if 'COLLSCAN' in stages:
+            problems.append('collection scan')
+        if 'SORT' in stages:
+            problems.append('in-memory sort')
+        if problems:
+            unindexed += 1
+        status = 'UNINDEXED (' + ', '.join(problems) + ')' if problems else 'ok'
+        print(f"{route:<36} {' > '.join(stages):<40} {status}")
+    return unindexed
+
+def main():
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-url', default=MONGO_URL)
+    parser.add_argument('--db-name', default=DB_NAME)
+    parser.add_argument('--apply', action='store_true', help='create the manifest indexes before reporting')
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_url)[args.db_name]
+    if args.apply:
+        for name, models in INDEX_MANIFEST.items():
+            for model in models:
+                try:
+                    db[name].create_indexes([model])
+                except Exception as e:
+                    print(f"could not create {name}.{model.document['name']}: {e}")
+    unindexed = report(db)
+    print(f"\n{unindexed} of {len(ROUTE_QUERIES)} route queries unindexed")
+    return 1 if unindexed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
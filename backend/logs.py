@@ -0,0 +1,60 @@
+"""Structured logging shared by the API and its background tasks.
+
+Events are JSON objects, rendered by structlog when it is installed and
+printed one per line otherwise. Events logged while a request is being
+handled carry that request's trace_id, set by ProfilingMiddleware from
+the X-Request-ID header or generated, so background errors such as a
+failed Redis write can be tied back to the request that caused them.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+import json
+import traceback
+
+try:
+    import structlog
+except ImportError:  # logs fall back to one JSON object per line on stdout
+    structlog = None
+
+current_trace_id: ContextVar[Optional[str]] = ContextVar('current_trace_id', default=None)
+
+def add_trace_id(logger, method_name: str, event_dict):
+    trace_id = current_trace_id.get()
+    if trace_id is not None:
+        event_dict.setdefault('trace_id', trace_id)
+    return event_dict
+
+def configure_logging():
+    if structlog is not None:
+        structlog.configure(processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt='iso'),
+            add_trace_id,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(default=str),
+        ])
+
+class _PrintLogger:
+    def _log(self, level: str, event: str, **fields):
+        add_trace_id(self, level, fields)
+        print(json.dumps({'event': event, 'level': level, 'timestamp': datetime.utcnow().isoformat(), **fields},
+                         default=str))
+
+    def info(self, event: str, **fields):
+        self._log('info', event, **fields)
+
+    def warning(self, event: str, **fields):
+        self._log('warning', event, **fields)
+
+    def error(self, event: str, **fields):
+        self._log('error', event, **fields)
+
+    def exception(self, event: str, **fields):
+        """Log at error level with the traceback of the exception being handled"""
+        self._log('error', event, exception=traceback.format_exc(), **fields)
+
+def get_logger():
+    return structlog.get_logger('sme') if structlog is not None else _PrintLogger()
+
+logger = get_logger()
@@ -0,0 +1,177 @@
+"""Prometheus metrics: HTTP routes, MongoDB commands and YouTube API calls.
+
+Served at /metrics. Under the multi-worker launcher every worker writes
+to PROMETHEUS_MULTIPROC_DIR and /metrics aggregates all of them.
+"""
+from contextvars import ContextVar
+from pymongo import monitoring
+from typing import Dict, Optional, Tuple
+import os
+import time
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+    )
+except ImportError:  # metrics are optional; every hook below becomes a no-op
+    multiprocess = None
+    Counter = None
+
+METRICS_ENABLED = Counter is not None and os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+# Requests that match no route share one label so stray paths cannot blow up cardinality
+UNMATCHED_ROUTE = 'unmatched'
+
+# Buckets in seconds; Mongo calls are expected to be an order of magnitude faster than requests
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+if METRICS_ENABLED:
+    HTTP_REQUESTS = Counter(
+        'http_requests_total', 'HTTP requests by route and status code', ['method', 'route', 'status']
+    )
+    HTTP_DURATION = Histogram(
+        'http_request_duration_seconds', 'HTTP request latency by route', ['method', 'route'], buckets=HTTP_BUCKETS
+    )
+    HTTP_IN_PROGRESS = Gauge(
+        'http_requests_in_progress', 'HTTP requests being handled', ['method'], multiprocess_mode='livesum'
+    )
+    HANDLER_EXCEPTIONS = Counter(
+        'http_handler_exceptions_total', 'Exceptions turned into 500 responses, by type', ['route', 'exception']
+    )
+    MONGO_DURATION = Histogram(
+        'mongo_command_duration_seconds', 'MongoDB command latency', ['collection', 'command'], buckets=MONGO_BUCKETS
+    )
+    MONGO_FAILURES = Counter(
+        'mongo_command_failures_total', 'MongoDB commands that failed', ['collection', 'command']
+    )
+    YOUTUBE_CALLS = Counter(
+        'youtube_api_calls_total', 'YouTube videos.list calls, each retry counted', ['outcome']
+    )
+    YOUTUBE_DURATION = Histogram(
+        'youtube_api_call_duration_seconds', 'YouTube videos.list latency', buckets=HTTP_BUCKETS
+    )
+    YOUTUBE_VIDEOS = Counter(
+        'youtube_api_videos_requested_total', 'Video ids sent to videos.list'
+    )
+    ENRICHED_VIDEOS = Counter(
+        'youtube_enrichment_videos_total', 'Videos processed by the enrichment queue', ['status']
+    )
+
+def route_label(scope) -> str:
+    """Path template of the route that handled the request, e.g. /api/videos/{video_id}.
+
+    FastAPI's router stores the matched route in the scope, so this is
+    only known once the request has been routed.
+    """
+    route = scope.get('route')
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+# Scope of the request being handled, for metrics recorded deeper in the call stack
+current_scope: ContextVar[dict] = ContextVar('current_scope', default={})
+
+class MetricsMiddleware:
+    """Per-route latency and status-code metrics, and in-flight requests by method.
+
+    Labelled series are cached per (method, route, status) so a request
+    costs no label lookups once its combination has been seen.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_progress: Dict[str, object] = {}
+        self._series: Dict[Tuple[str, str, int], Tuple[object, object]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        method = scope['method']
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        current_scope.set(scope)
+        in_progress = self._in_progress.get(method)
+        if in_progress is None:
+            in_progress = self._in_progress[method] = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = route_label(scope)
+            series = self._series.get((method, route, status))
+            if series is None:
+                series = self._series[(method, route, status)] = (
+                    HTTP_DURATION.labels(method, route), HTTP_REQUESTS.labels(method, route, str(status))
+                )
+            series[0].observe(elapsed)
+            series[1].inc()
+
+def current_route() -> str:
+    return route_label(current_scope.get())
+
+def record_exception(error: Exception):
+    if METRICS_ENABLED:
+        HANDLER_EXCEPTIONS.labels(current_route(), type(error).__name__).inc()
+
+def record_youtube_call(outcome: str, seconds: float, video_count: int):
+    if METRICS_ENABLED:
+        YOUTUBE_CALLS.labels(outcome).inc()
+        YOUTUBE_DURATION.observe(seconds)
+        YOUTUBE_VIDEOS.inc(video_count)
+
+def record_enrichment(status: str, count: int = 1):
+    if METRICS_ENABLED and count:
+        ENRICHED_VIDEOS.labels(status).inc(count)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command by collection and command name.
+
+    The collection is only known from the started event, so it is kept
+    per in-flight request until the matching succeeded/failed event.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            # getMore names its collection separately; admin commands have none
+            target = event.command.get('collection', '')
+        self._collections[(event.connection_id, event.request_id)] = target or event.database_name
+
+    def _collection(self, event) -> str:
+        return self._collections.pop((event.connection_id, event.request_id), '')
+
+    def succeeded(self, event):
+        MONGO_DURATION.labels(self._collection(event), event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collection(event)
+        MONGO_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_FAILURES.labels(collection, event.command_name).inc()
+
+mongo_command_metrics: Optional[MongoCommandMetrics] = None
+
+def install_mongo_metrics():
+    """Time and count MongoDB commands by collection"""
+    global mongo_command_metrics
+    if METRICS_ENABLED and mongo_command_metrics is None:
+        mongo_command_metrics = MongoCommandMetrics()
+        monitoring.register(mongo_command_metrics)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition-format payload for every worker (multiprocess) or this process"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+
+# Newest first, with the public id as a unique tiebreaker so every position is well defined
+VIDEO_SORT: List[Tuple[str, int]] = [('created_at', -1), ('id', -1)]
+
+DATETIME_KEYS = {'created_at'}
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(doc: Dict[str, Any], sort: List[Tuple[str, int]]) -> str:
+    """Opaque cursor pointing just after doc in the given sort order"""
+    values = {}
+    for key, _ in sort:
+        value = doc[key]
+        values[key] = value.isoformat() if isinstance(value, datetime) else value
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]]) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor for the same sort order"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        decoded = {}
+        for key, _ in sort:
+            value = values[key]
+            decoded[key] = datetime.fromisoformat(value) if key in DATETIME_KEYS else value
+        return decoded
+    except Exception:
+        raise InvalidCursor("Invalid pagination cursor")
+
+def keyset_filter(values: Dict[str, Any], sort: List[Tuple[str, int]]) -> Dict[str, Any]:
+    """Match documents strictly after the cursor position.
+
+    For sort keys (a, b, c) this is: a past, or a equal and b past, or
+    a and b equal and c past -- which compound indexes on the sort keys
+    can answer without walking earlier documents.
+    """
+    clauses = []
+    for position, (key, direction) in enumerate(sort):
+        clause = {prev_key: values[prev_key] for prev_key, _ in sort[:position]}
+        clause[key] = {'$lt' if direction < 0 else '$gt': values[key]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
+def next_cursor(docs: List[Dict[str, Any]], limit: int, sort: List[Tuple[str, int]]) -> Optional[str]:
+    """Cursor for the following page, or None when this page was the last"""
+    if len(docs) < limit or not docs:
+        return None
+    return encode_cursor(docs[-1], sort)
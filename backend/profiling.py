@@ -0,0 +1,246 @@
+"""Request profiling and slow-request logging.
+
+ProfilingMiddleware does three independent things:
+
+- When PROFILING_ENABLED, a sampled fraction of requests (or any request
+  carrying an X-Profile header) runs under pyinstrument, and the result
+  is written to PROFILE_DIR as a speedscope flamegraph file.
+- Every request gets a trace id (its X-Request-ID, or a generated one)
+  that logs.logger adds to each event logged while handling it.
+- Every request's MongoDB commands are collected through a command
+  listener. Requests slower than SLOW_REQUEST_MS are logged as one
+  structured JSON event with those commands, and commands slower than
+  SLOW_QUERY_MS get an explain() plan summary.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+from pymongo import monitoring
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+
+from database import get_database
+from indexes import plan_stages
+from logs import current_trace_id, logger
+from metrics import route_label
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # profiling is unavailable without pyinstrument; slow-request logs still work
+    Profiler = None
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01))
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.001))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/sme-profiles')
+
+SLOW_REQUEST_LOG_ENABLED = os.environ.get('SLOW_REQUEST_LOG_ENABLED', 'true').lower() == 'true'
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+EXPLAIN_SLOW_QUERIES = os.environ.get('EXPLAIN_SLOW_QUERIES', 'true').lower() == 'true'
+# Bounds the size of one log event for requests that issue many commands
+MAX_LOGGED_COMMANDS = int(os.environ.get('MAX_LOGGED_COMMANDS', 50))
+# Longer X-Request-ID values from clients are cut so they cannot bloat every log line
+MAX_TRACE_ID_LENGTH = 128
+
+# Commands explain() accepts and that read data
+EXPLAINABLE_COMMANDS = {'find', 'aggregate', 'count', 'distinct'}
+# Driver bookkeeping fields that must not be sent back inside an explain
+COMMAND_META_FIELDS = {'lsid', '$clusterTime', '$db', '$readPreference', 'txnNumber', 'signature'}
+
+class RequestTrace:
+    """MongoDB commands issued while handling one request"""
+
+    def __init__(self):
+        self.commands: List[Dict[str, Any]] = []
+        self.pending: Dict[Any, Dict[str, Any]] = {}
+
+    @property
+    def mongo_ms(self) -> float:
+        return sum(command['duration_ms'] for command in self.commands)
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar('current_trace', default=None)
+
+class RequestCommandLog(monitoring.CommandListener):
+    """Appends each command to the trace of the request that issued it.
+
+    Motor runs the driver in a thread pool but copies the caller's
+    context, so the request's trace is visible here.
+    """
+
+    def started(self, event):
+        trace = current_trace.get()
+        if trace is None:
+            return
+        target = event.command.get(event.command_name)
+        command = {
+            'command': event.command_name,
+            'collection': target if isinstance(target, str) else event.command.get('collection', ''),
+        }
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            command['spec'] = {key: value for key, value in event.command.items() if key not in COMMAND_META_FIELDS}
+        trace.pending[(event.connection_id, event.request_id)] = command
+
+    def _finish(self, event, ok: bool):
+        trace = current_trace.get()
+        if trace is None:
+            return
+        command = trace.pending.pop((event.connection_id, event.request_id), None)
+        if command is not None:
+            command['duration_ms'] = event.duration_micros / 1000
+            command['ok'] = ok
+            trace.commands.append(command)
+
+    def succeeded(self, event):
+        self._finish(event, True)
+
+    def failed(self, event):
+        self._finish(event, False)
+
+request_command_log: Optional[RequestCommandLog] = None
+
+def install_request_command_log():
+    """Record each request's MongoDB commands for the slow-request log"""
+    global request_command_log
+    if SLOW_REQUEST_LOG_ENABLED and request_command_log is None:
+        request_command_log = RequestCommandLog()
+        monitoring.register(request_command_log)
+
+def _plan_indexes(plan: Dict[str, Any]) -> List[str]:
+    names = [plan['indexName']] if 'indexName' in plan else []
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            names += _plan_indexes(plan[key])
+    for child in plan.get('inputStages', []):
+        names += _plan_indexes(child)
+    return names
+
+def _winning_plan(explain: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if 'queryPlanner' in explain:
+        return explain['queryPlanner']['winningPlan']
+    # Aggregations report the plan of their initial $cursor stage
+    for stage in explain.get('stages', []):
+        if '$cursor' in stage:
+            return stage['$cursor']['queryPlanner']['winningPlan']
+    return None
+
+async def explain_summary(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan stages and indexes for a captured command"""
+    try:
+        explain = await get_database().command({'explain': spec, 'verbosity': 'queryPlanner'})
+    except Exception as e:
+        return {'error': str(e)}
+    plan = _winning_plan(explain)
+    if plan is None:
+        return {'stages': []}
+    stages = plan_stages(plan)
+    return {
+        'stages': stages,
+        'indexes': sorted(set(_plan_indexes(plan))),
+        'collection_scan': 'COLLSCAN' in stages,
+        'in_memory_sort': 'SORT' in stages,
+    }
+
+async def log_slow_request(scope, status: int, duration_ms: float, trace: RequestTrace):
+    current_trace.set(None)  # explain() calls below are not part of the request
+    commands = []
+    for command in trace.commands[:MAX_LOGGED_COMMANDS]:
+        spec = command.pop('spec', None)
+        if EXPLAIN_SLOW_QUERIES and spec is not None and command['duration_ms'] >= SLOW_QUERY_MS:
+            command['explain'] = await explain_summary(spec)
+        commands.append(command)
+    logger.warning(
+        'slow_request',
+        method=scope['method'],
+        route=route_label(scope),
+        path=scope['path'],
+        query=scope.get('query_string', b'').decode('latin-1'),
+        status=status,
+        duration_ms=round(duration_ms, 2),
+        mongo_ms=round(trace.mongo_ms, 2),
+        mongo_commands=len(trace.commands),
+        commands=commands,
+    )
+
+def request_trace_id(scope) -> str:
+    """The caller's X-Request-ID, so logs line up with the proxy's, or a fresh id"""
+    for key, value in scope['headers']:
+        if key == b'x-request-id' and value:
+            return value.decode('latin-1')[:MAX_TRACE_ID_LENGTH]
+    return uuid.uuid4().hex
+
+def _profile_path(scope) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', route_label(scope)).strip('_') or 'root'
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    return os.path.join(PROFILE_DIR, f"{stamp}-{scope['method']}-{slug}.speedscope.json")
+
+class ProfilingMiddleware:
+    """Sampled pyinstrument profiles plus structured slow-request logs"""
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.profiling = PROFILING_ENABLED and Profiler is not None
+        # pyinstrument profiles one task at a time per thread
+        self._active = False
+        self._background: set = set()
+
+    def _should_profile(self, scope) -> bool:
+        if not self.profiling or self._active:
+            return False
+        if any(key == b'x-profile' for key, _ in scope['headers']):
+            return True
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        current_trace_id.set(request_trace_id(scope))
+        if not SLOW_REQUEST_LOG_ENABLED and not self.profiling:
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        trace = RequestTrace() if SLOW_REQUEST_LOG_ENABLED else None
+        current_trace.set(trace)
+        profiler = None
+        if self._should_profile(scope):
+            self._active = True
+            profiler = Profiler(interval=PROFILE_INTERVAL, async_mode='enabled')
+            profiler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if profiler is not None:
+                profiler.stop()
+                self._active = False
+                self._write_profile(scope, profiler, duration_ms)
+            if trace is not None and duration_ms >= SLOW_REQUEST_MS:
+                # Explain plans are fetched after the response has gone out
+                task = asyncio.create_task(log_slow_request(scope, status, duration_ms, trace))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+
+    def _write_profile(self, scope, profiler, duration_ms: float):
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = _profile_path(scope)
+            with open(path, 'w') as handle:
+                handle.write(profiler.output(SpeedscopeRenderer()))
+            logger.info('request_profiled', method=scope['method'], path=scope['path'],
+                        duration_ms=round(duration_ms, 2), profile=path)
+        except Exception as e:
+            logger.error('profile_write_failed', path=scope['path'], error=str(e))
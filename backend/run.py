@@ -0,0 +1,57 @@
+"""Production launcher for the API.
+
+Runs server:app under uvicorn with WEB_CONCURRENCY worker processes
+(default: the CPUs available to this process, at most 4).
+Each worker imports the app on its own and opens its own MongoDB
+client on first use, so nothing network-bound is shared across fork.
+On SIGTERM workers stop accepting connections and finish in-flight
+requests for up to GRACEFUL_TIMEOUT seconds before shutting down.
+With several workers, Prometheus metrics are shared through
+PROMETHEUS_MULTIPROC_DIR (a fresh temporary directory unless set).
+
+    python run.py --workers 4 --port 8001
+"""
+import argparse
+import os
+import tempfile
+
+import uvicorn
+
+def available_cpus() -> int:
+    """CPUs this process may run on, which respects affinity and cpusets unlike os.cpu_count()"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Each worker has its own Mongo pool, caches and poll loops, so cap the default
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', min(available_cpus(), 4)))
+HOST = os.environ.get('HOST', '0.0.0.0')
+PORT = int(os.environ.get('PORT', 8001))
+GRACEFUL_TIMEOUT = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+KEEPALIVE_TIMEOUT = int(os.environ.get('KEEPALIVE_TIMEOUT', 5))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=WEB_CONCURRENCY)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--graceful-timeout', type=int, default=GRACEFUL_TIMEOUT)
+    args = parser.parse_args()
+
+    if args.workers > 1 and 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        # Must be set before the workers import prometheus_client
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='sme-metrics-')
+
+    uvicorn.run(
+        'server:app',
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+from pymongo.errors import OperationFailure
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import re
+import time
+
+from database import videos_collection
+from logs import logger
+from pagination import VIDEO_SORT, decode_cursor, keyset_filter, next_cursor
+
+SEARCH_MODES = ('text', 'regex')
+DEFAULT_SEARCH_MODE = os.environ.get('SEARCH_MODE', 'text')
+
+TEXT_INDEX_NAME = 'videos_text_search'
+TEXT_INDEX_LANGUAGE = os.environ.get('SEARCH_LANGUAGE', 'english')
+# Relative field weights for relevance ranking; a title hit counts ten times a description hit
+TEXT_INDEX_WEIGHTS = {
+    'title': 10,
+    'tags': 5,
+    'category': 3,
+    'description': 1,
+}
+
+TOTAL_MODES = ('exact', 'estimated', 'none')
+DEFAULT_TOTAL_MODE = os.environ.get('SEARCH_TOTAL_MODE', 'estimated')
+# Estimated totals: how long a count is reused, how many queries are remembered,
+# and where counting stops (totals at the cap are reported as estimates)
+SEARCH_COUNT_TTL = float(os.environ.get('SEARCH_COUNT_TTL', 60))
+SEARCH_COUNT_CACHE_SIZE = int(os.environ.get('SEARCH_COUNT_CACHE_SIZE', 10000))
+SEARCH_COUNT_LIMIT = int(os.environ.get('SEARCH_COUNT_LIMIT', 10000))
+
+def mode_pattern(modes: Tuple[str, ...]) -> str:
+    """Query parameter pattern accepting exactly the given modes"""
+    return '^(' + '|'.join(modes) + ')$'
+
+for _name, _default, _modes in (('SEARCH_MODE', DEFAULT_SEARCH_MODE, SEARCH_MODES),
+                                ('SEARCH_TOTAL_MODE', DEFAULT_TOTAL_MODE, TOTAL_MODES)):
+    if _default not in _modes:
+        raise ValueError(f"{_name} must be one of {', '.join(_modes)}, got {_default!r}")
+
+# Relevance first, then the default newest-first order as tiebreakers
+TEXT_SORT = [('score', -1)] + VIDEO_SORT
+
+# MongoDB error code when a $text query runs without a text index
+INDEX_NOT_FOUND = 27
+
+def regex_query(q: str) -> Dict[str, Any]:
+    """Legacy case-insensitive substring match; the user string is escaped, not run as a pattern"""
+    pattern = re.escape(q)
+    return {
+        '$or': [
+            {'title': {'$regex': pattern, '$options': 'i'}},
+            {'description': {'$regex': pattern, '$options': 'i'}},
+            {'category': {'$regex': pattern, '$options': 'i'}},
+            {'tags': {'$regex': pattern, '$options': 'i'}}
+        ]
+    }
+
+def text_query(q: str) -> Dict[str, Any]:
+    """Stemmed full-text match against the weighted text index"""
+    return {'$text': {'$search': q}}
+
+def normalize_query(q: str) -> str:
+    """Case- and whitespace-insensitive form of a search string; both modes ignore case anyway"""
+    return ' '.join(q.lower().split())
+
+async def find_videos(
+    q: str,
+    mode: str,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Optional[str]]:
+    """Run a search and return (documents, match query, next cursor).
+
+    Text mode ranks by relevance (then recency); regex mode keeps the old
+    newest-first ordering. Text mode falls back to regex when the text
+    index is missing. When a cursor is given it replaces skip. The match
+    query is returned so the caller can count it with count_matches.
+    projection defaults to every field except _id.
+    """
+    projection = projection or {'_id': 0}
+    q = normalize_query(q)
+    if mode == 'text':
+        try:
+            return await _run_text(q, skip, limit, cursor, projection)
+        except OperationFailure as e:
+            if e.code != INDEX_NOT_FOUND:
+                raise
+            logger.warning('text_index_missing', fallback='regex', error=str(e))
+
+    query = regex_query(q)
+    page_query = query
+    if cursor:
+        page_query = {'$and': [query, keyset_filter(decode_cursor(cursor, VIDEO_SORT), VIDEO_SORT)]}
+        skip = 0
+    docs = await videos_collection.find(page_query, projection).sort(VIDEO_SORT).skip(skip).limit(limit).to_list(length=limit)
+    return docs, query, next_cursor(docs, limit, VIDEO_SORT)
+
+def _is_inclusion(projection: Dict[str, int]) -> bool:
+    return any(value for key, value in projection.items() if key != '_id')
+
+async def _run_text(q: str, skip: int, limit: int, cursor: Optional[str], projection: Dict[str, int]):
+    """Relevance-ranked page; the score is materialized so it can take part in the keyset"""
+    query = text_query(q)
+    pipeline = [
+        {'$match': query},
+        {'$addFields': {'score': {'$meta': 'textScore'}}},
+    ]
+    if cursor:
+        pipeline.append({'$match': keyset_filter(decode_cursor(cursor, TEXT_SORT), TEXT_SORT)})
+        skip = 0
+    pipeline += [
+        {'$sort': dict(TEXT_SORT)},
+        {'$skip': skip},
+        {'$limit': limit},
+        # The score is needed for the next cursor; it is dropped below
+        {'$project': dict(projection, score=1) if _is_inclusion(projection) else projection},
+    ]
+    docs = await videos_collection.aggregate(pipeline).to_list(length=limit)
+    cursor_out = next_cursor(docs, limit, TEXT_SORT)
+    for doc in docs:
+        doc.pop('score', None)
+    return docs, query, cursor_out
+
+class CountCache:
+    """Short-lived cache of search match counts keyed by the normalized query"""
+
+    def __init__(self, ttl: float = SEARCH_COUNT_TTL, max_entries: int = SEARCH_COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int, bool]] = {}
+
+    def get(self, key: str) -> Optional[Tuple[int, bool]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, total, exact = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return total, exact
+
+    def set(self, key: str, total: int, exact: bool):
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest entry; dicts keep insertion order
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl, total, exact)
+
+count_cache = CountCache()
+
+async def count_matches(
+    query: Dict[str, Any],
+    total_mode: str,
+    returned: int,
+    limit: int,
+    skip: Optional[int]
+) -> Tuple[Optional[int], bool]:
+    """Return (total, exact) for a search according to total_mode.
+
+    'exact' always counts, 'estimated' reuses a cached count for
+    SEARCH_COUNT_TTL seconds and stops counting at SEARCH_COUNT_LIMIT, and
+    'none' skips counting. A short offset page gives the exact total for
+    free in every mode. skip is None for cursor pages.
+    """
+    if skip is not None and returned < limit and (returned or not skip):
+        return skip + returned, True
+    if total_mode == 'none':
+        return None, False
+    if total_mode == 'exact':
+        return await videos_collection.count_documents(query), True
+
+    key = repr(query)
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached[0], False
+    total = await videos_collection.count_documents(query, limit=SEARCH_COUNT_LIMIT)
+    exact = total < SEARCH_COUNT_LIMIT
+    count_cache.set(key, total, exact)
+    return total, exact
@@ -0,0 +1,91 @@
+"""Fast read path: project documents to a model's fields and encode them directly.
+
+Documents come back from MongoDB already shaped like the response model
+(no _id, only the model's fields), so instead of building a Pydantic
+object per document and having FastAPI validate it again, missing
+defaults are filled in and the result is encoded straight to JSON.
+"""
+from datetime import datetime
+from fastapi import Response
+from pydantic import BaseModel
+from typing import Any, Dict, Iterable, List, Optional, Type
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+FAST_RESPONSES = os.environ.get('FAST_RESPONSES', 'true').lower() == 'true'
+
+# Default sparse fieldset for list endpoints: what a video card on the homepage renders
+VIDEO_CARD_FIELDS = ('id', 'title', 'thumbnail', 'category', 'duration', 'is_premium', 'is_live', 'created_at')
+# Always returned, whatever was asked for: identity and the cursor sort keys
+REQUIRED_VIDEO_FIELDS = ('id', 'created_at')
+
+class InvalidFields(ValueError):
+    pass
+
+def select_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default: Iterable[str],
+    required: Iterable[str] = REQUIRED_VIDEO_FIELDS
+) -> List[str]:
+    """Resolve a ?fields= value: None means default, 'all' means every allowed field"""
+    allowed = list(allowed)
+    if fields is None:
+        selected = list(default)
+    elif fields.strip() in ('all', '*'):
+        selected = allowed
+    else:
+        selected = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+        unknown = [name for name in selected if name not in allowed]
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+    missing = [name for name in required if name not in selected]
+    return missing + selected
+
+def fields_projection(fields: Iterable[str]) -> Dict[str, int]:
+    """MongoDB projection returning exactly the given fields"""
+    projection = {'_id': 0}
+    projection.update({name: 1 for name in fields})
+    return projection
+
+def projection_for(model: Type[BaseModel]) -> Dict[str, int]:
+    """MongoDB projection returning exactly the model's fields"""
+    return fields_projection(model.model_fields)
+
+def defaults_for(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Default values of the model's optional fields"""
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    }
+
+def apply_defaults(docs: List[Dict[str, Any]], defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fill fields absent from older documents, as model construction would"""
+    for doc in docs:
+        for name, value in defaults.items():
+            if name not in doc:
+                doc[name] = value
+    return docs
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(',', ':'), default=_default).encode()
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson; content must already match the response model"""
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,18 +1,42 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-import os
 import uuid
-import re
-import requests
 from datetime import datetime
 
-# Environment variables
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-DB_NAME = os.environ.get('DB_NAME', 'sme_network')
-YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY')
+from bulk_import import import_records, iter_records
+from category_catalog import CATEGORY_CACHE_ENABLED, CategoryCatalog
+from change_feed import (
+    CATEGORY_CREATED, CATEGORY_UPDATED, CHANGE_FEED_ENABLED, RESYNC, VIDEO_CREATED, VIDEO_UPDATED, VIEW_DELTA,
+    ChangeEvent, change_feed
+)
+from database import videos_collection, categories_collection, close_client, get_client
+from export import export_cursor, iter_export
+from featured import FeaturedSnapshot, load_featured_content
+from http_cache import CompressionMiddleware, HTTPCacheMiddleware, etag_matches
+from indexes import ensure_indexes
+from metrics import (
+    METRICS_ENABLED, MetricsMiddleware, current_route, install_mongo_metrics, record_exception, render_metrics
+)
+from serialization import (
+    FAST_RESPONSES, VIDEO_CARD_FIELDS, FastJSONResponse, InvalidFields,
+    apply_defaults, defaults_for, fields_projection, projection_for, select_fields
+)
+from search import (
+    DEFAULT_SEARCH_MODE, DEFAULT_TOTAL_MODE, SEARCH_MODES, TOTAL_MODES, count_matches, find_videos, mode_pattern
+)
+from pagination import VIDEO_SORT, InvalidCursor, decode_cursor, keyset_filter, next_cursor
+from logs import configure_logging, logger
+from profiling import ProfilingMiddleware, install_request_command_log
+from suggest import SUGGEST_INDEX_ENABLED, suggest_index
+from trending import TRENDING_ENABLED, rankings
+from youtube import YOUTUBE_API_KEY, enrichment_queue
+from video_cache import VIDEO_BATCH_GET_MAX_IDS, VIDEO_CACHE_ENABLED, VideoCache, load_videos
+from video_urls import classify_url
+from view_counter import VIEW_COUNTER_ENABLED, view_counter
+from worker_bus import WORKER_BUS_ENABLED, worker_bus
 
 # Initialize FastAPI
 app = FastAPI(title="SME Network API", description="Video on Demand Service API")
@@ -24,13 +48,160 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Categories-Version", "X-Export-Started-At"],
 )
 
-# MongoDB connection
-client = MongoClient(MONGO_URL)
-db = client[DB_NAME]
-videos_collection = db.videos
-categories_collection = db.categories
+# HTTP caching (per-route Cache-Control and ETags, see http_cache.CACHE_POLICIES) inside compression
+app.add_middleware(HTTPCacheMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# Sampled profiling and slow-request logs (with each request's Mongo commands)
+configure_logging()
+app.add_middleware(ProfilingMiddleware)
+install_request_command_log()
+
+# Prometheus metrics outermost, so latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+install_mongo_metrics()
+
+# Set once startup has finished; /api/ready reports it to the launcher and load balancer
+app.state.ready = False
+
+# MongoDB connection (pooled, created lazily by database.get_client in each worker)
+@app.on_event("startup")
+async def startup_database():
+    try:
+        await ensure_indexes()
+    except Exception:
+        logger.exception('startup_failed', step='indexes')
+    if SUGGEST_INDEX_ENABLED:
+        try:
+            await suggest_index.build()
+        except Exception:
+            logger.exception('startup_failed', step='suggest_index')
+    if VIEW_COUNTER_ENABLED:
+        view_counter.start()
+    if TRENDING_ENABLED:
+        try:
+            await rankings.seed()
+        except Exception:
+            logger.exception('startup_failed', step='rankings')
+        rankings.start()
+    enrichment_queue.add_listener(on_videos_enriched)
+    enrichment_queue.start()
+    try:
+        await enrichment_queue.resume_pending()
+    except Exception:
+        logger.exception('startup_failed', step='resume_enrichment')
+    if CHANGE_FEED_ENABLED:
+        change_feed.subscribe(VIDEO_CREATED, on_feed_videos_created)
+        change_feed.subscribe(VIDEO_UPDATED, on_feed_videos_updated)
+        change_feed.subscribe(CATEGORY_CREATED, on_feed_categories_created)
+        change_feed.subscribe(CATEGORY_UPDATED, on_feed_categories_updated)
+        change_feed.subscribe(RESYNC, on_feed_resync)
+        if TRENDING_ENABLED:
+            change_feed.subscribe(VIEW_DELTA, on_feed_views)
+        try:
+            await change_feed.start()
+        except Exception:
+            logger.exception('startup_failed', step='change_feed')
+    # A change stream already delivers other workers' writes; polling is too slow to replace the bus
+    if WORKER_BUS_ENABLED and change_feed.mode != 'stream':
+        worker_bus.subscribe('videos_created', on_remote_videos_created)
+        worker_bus.subscribe('videos_changed', on_remote_videos_changed)
+        worker_bus.subscribe('categories_changed', on_remote_categories_changed)
+        try:
+            await worker_bus.start()
+        except Exception:
+            logger.exception('startup_failed', step='worker_bus')
+    app.state.ready = True
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    app.state.ready = False
+    await change_feed.stop()
+    await worker_bus.stop()
+    await enrichment_queue.stop()
+    await rankings.stop()
+    if VIEW_COUNTER_ENABLED:
+        await view_counter.stop()
+    close_client()
+
+async def on_videos_enriched(video_ids: List[str]):
+    """Refresh derived views once YouTube metadata has replaced the submitted fields"""
+    await featured_snapshot.invalidate()
+    if VIDEO_CACHE_ENABLED:
+        await video_cache.invalidate(video_ids)
+    await reindex_suggestions(video_ids)
+    await worker_bus.publish('videos_changed', video_ids)
+
+async def reindex_suggestions(video_ids: List[str]):
+    if SUGGEST_INDEX_ENABLED:
+        missing = set(video_ids)
+        async for doc in videos_collection.find({'id': {'$in': video_ids}}, {'_id': 0}):
+            suggest_index.add(doc)
+            missing.discard(doc['id'])
+        # Ids that no longer match a document were deleted
+        for video_id in missing:
+            suggest_index.remove(video_id)
+
+# Another worker changed the data; shared tiers (Redis) were already updated by that worker
+async def on_remote_videos_created(video_ids: List[str]):
+    await featured_snapshot.invalidate(shared=False)
+    await reindex_suggestions(video_ids)
+    if VIEW_COUNTER_ENABLED:
+        for video_id in video_ids:
+            view_counter.remember(video_id)
+
+async def on_remote_videos_changed(video_ids: List[str]):
+    await featured_snapshot.invalidate(shared=False)
+    if VIDEO_CACHE_ENABLED:
+        await video_cache.invalidate(video_ids, shared=False)
+    await reindex_suggestions(video_ids)
+
+async def on_remote_categories_changed(category_ids: List[str]):
+    await featured_snapshot.invalidate(shared=False)
+    category_catalog.invalidate()
+
+# Changes seen on the change feed, made by any worker, import or direct database write.
+# This worker has usually applied its own changes already, so every handler is idempotent.
+async def on_feed_videos_created(event: ChangeEvent):
+    if len(event.documents) == 1:
+        await featured_snapshot.apply_video(event.documents[0])
+    else:
+        await featured_snapshot.invalidate()
+    for doc in event.documents:
+        if SUGGEST_INDEX_ENABLED:
+            suggest_index.add(doc)
+        if VIEW_COUNTER_ENABLED:
+            view_counter.remember(doc['id'])
+
+async def on_feed_videos_updated(event: ChangeEvent):
+    if featured_snapshot.contains(event.ids):
+        await featured_snapshot.invalidate()
+    if VIDEO_CACHE_ENABLED:
+        await video_cache.invalidate(event.ids)
+    await reindex_suggestions(event.ids)
+
+async def on_feed_categories_created(event: ChangeEvent):
+    for doc in event.documents:
+        await featured_snapshot.apply_category(doc)
+    category_catalog.invalidate()
+
+async def on_feed_categories_updated(event: ChangeEvent):
+    await featured_snapshot.invalidate()
+    category_catalog.invalidate()
+
+async def on_feed_views(event: ChangeEvent):
+    rankings.record_views(event.view_deltas, event.view_counts)
+
+async def on_feed_resync(event: ChangeEvent):
+    await featured_snapshot.invalidate()
+    if VIDEO_CACHE_ENABLED:
+        video_cache.clear()
+    category_catalog.invalidate()
+    if SUGGEST_INDEX_ENABLED:
+        await suggest_index.build()
 
 # Pydantic models
 class VideoBase(BaseModel):
@@ -50,6 +221,32 @@ class Video(VideoBase):
     video_id: Optional[str] = None
     created_at: datetime
     view_count: int = 0
+    embed_url: Optional[str] = None
+    enrichment_status: Optional[str] = None  # 'pending', 'done' or 'failed' for YouTube videos
+
+class VideoCard(BaseModel):
+    """A video in a list: id and created_at plus the fields picked with ?fields=.
+
+    Without ?fields= only the card fields (VIDEO_CARD_FIELDS) are sent;
+    ?fields=all sends every Video field. Fields that were not picked are
+    left out of the response, not sent as null.
+    """
+    id: str
+    created_at: datetime
+    title: Optional[str] = None
+    description: Optional[str] = None
+    url: Optional[str] = None
+    thumbnail: Optional[str] = None
+    category: Optional[str] = None
+    tags: Optional[List[str]] = None
+    duration: Optional[str] = None
+    is_premium: Optional[bool] = None
+    is_live: Optional[bool] = None
+    video_type: Optional[str] = None
+    video_id: Optional[str] = None
+    view_count: Optional[int] = None
+    embed_url: Optional[str] = None
+    enrichment_status: Optional[str] = None
 
 class Category(BaseModel):
     id: str
@@ -57,128 +254,225 @@ class Category(BaseModel):
     description: str
     created_at: datetime
 
+# Read-path projections and defaults for the fast serialization mode
+VIDEO_FIELDS = list(Video.model_fields)
+VIDEO_PROJECTION = projection_for(Video)
+VIDEO_DEFAULTS = defaults_for(Video)
+CATEGORY_PROJECTION = projection_for(Category)
+
+# Read-through cache for GET /api/videos/{video_id}
+video_cache = VideoCache(VIDEO_PROJECTION)
+
+# Precomputed GET /api/featured response; the hero carries the public video fields
+featured_snapshot = FeaturedSnapshot(hero_fields=Video.model_fields)
+
+# Versioned cache for GET /api/categories
+category_catalog = CategoryCatalog(CATEGORY_PROJECTION)
+
 class SearchResponse(BaseModel):
-    videos: List[Video]
-    total: int
+    videos: List[VideoCard]
+    total: Optional[int]
+    total_exact: bool = True  # False when total is a cached or capped estimate
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
-# Utility functions
-def extract_video_info(url: str) -> Dict[str, Any]:
-    """Extract video type and ID from URL"""
-    youtube_pattern = r'(?:youtube\.com/watch\?v=|youtu\.be/)([^&\n?#]+)'
-    rumble_pattern = r'rumble\.com/(?:embed/)?([^/?]+)'
-    
-    youtube_match = re.search(youtube_pattern, url)
-    rumble_match = re.search(rumble_pattern, url)
-    
-    if youtube_match:
-        return {
-            'type': 'youtube',
-            'video_id': youtube_match.group(1),
-            'embed_url': f'https://www.youtube.com/embed/{youtube_match.group(1)}'
-        }
-    elif rumble_match:
-        return {
-            'type': 'rumble',
-            'video_id': rumble_match.group(1),
-            'embed_url': f'https://rumble.com/embed/{rumble_match.group(1)}/'
-        }
-    else:
-        return {
-            'type': 'direct',
-            'video_id': None,
-            'embed_url': url
-        }
+class BulkImportResult(BaseModel):
+    line: int
+    status: str  # 'created', 'invalid' or 'failed'
+    id: Optional[str] = None
+    error: Optional[str] = None
 
-def get_youtube_metadata(video_id: str) -> Dict[str, Any]:
-    """Fetch YouTube video metadata"""
-    if not YOUTUBE_API_KEY:
-        return {}
-    
+class BulkImportResponse(BaseModel):
+    created: int
+    invalid: int
+    failed: int
+    results: List[BulkImportResult]
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=VIDEO_BATCH_GET_MAX_IDS)
+
+class BatchGetResult(BaseModel):
+    id: str
+    found: bool
+    video: Optional[Dict[str, Any]] = None
+
+class BatchGetResponse(BaseModel):
+    found: int
+    missing: int
+    results: List[BatchGetResult]
+
+class SuggestedVideo(BaseModel):
+    id: str
+    title: str
+    category: str
+
+class SuggestResponse(BaseModel):
+    query: str
+    terms: List[str]
+    videos: List[SuggestedVideo]
+
+def video_fields(fields: Optional[str]) -> List[str]:
+    """Resolve ?fields= for a video list; the default is the card fieldset"""
     try:
-        url = f"https://www.googleapis.com/youtube/v3/videos"
-        params = {
-            'id': video_id,
-            'part': 'snippet,contentDetails,statistics',
-            'key': YOUTUBE_API_KEY
-        }
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        if data.get('items'):
-            item = data['items'][0]
-            snippet = item['snippet']
-            content_details = item['contentDetails']
-            statistics = item.get('statistics', {})
-            
-            return {
-                'title': snippet['title'],
-                'description': snippet['description'],
-                'thumbnail': snippet['thumbnails']['high']['url'],
-                'duration': content_details['duration'],
-                'view_count': int(statistics.get('viewCount', 0))
-            }
-    except Exception as e:
-        print(f"Error fetching YouTube metadata: {e}")
-    
-    return {}
+        return select_fields(fields, VIDEO_FIELDS, VIDEO_CARD_FIELDS)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def encode_videos(docs: List[Dict[str, Any]], selected: List[str]) -> List[Dict[str, Any]]:
+    """Fill defaults for the selected fields of projected video documents"""
+    return apply_defaults(docs, {name: value for name, value in VIDEO_DEFAULTS.items() if name in selected})
+
+def is_full_fieldset(selected: List[str]) -> bool:
+    return len(selected) == len(VIDEO_FIELDS)
+
+async def ranked_videos(
+    ids: List[str], query: Dict[str, Any], projection: Dict[str, int], skip: int, limit: int
+) -> List[Dict[str, Any]]:
+    """One page of a ranking, in rank order; filters apply within the ranked ids"""
+    if not query:
+        ids = ids[skip:skip + limit]
+        skip = 0
+    docs = await videos_collection.find({**query, 'id': {'$in': ids}}, projection).to_list(length=None)
+    position = {video_id: index for index, video_id in enumerate(ids)}
+    docs.sort(key=lambda doc: position[doc['id']])
+    return docs[skip:skip + limit]
 
 # API Routes
 @app.get("/")
 async def root():
     return {"message": "SME Network API", "status": "running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint, served on the backend port only (nginx proxies /api)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+def server_error(e: Exception) -> HTTPException:
+    """Count and log an unexpected failure in a handler; returns the 500 to raise"""
+    record_exception(e)
+    logger.error('handler_error', route=current_route(), exception=type(e).__name__, error=str(e))
+    return HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/health")
+async def health():
+    """Liveness: the worker process is up and serving requests"""
+    return {"status": "ok"}
+
+@app.get("/api/ready")
+async def ready():
+    """Readiness: startup has finished and MongoDB answers a ping"""
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Starting up")
+    try:
+        await get_client().admin.command('ping')
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+    return {"status": "ready"}
+
+def build_video_doc(video: VideoBase) -> Dict[str, Any]:
+    """Create the stored document for a submitted video"""
+    # Extract video information
+    video_info = classify_url(video.url)
+    
+    # YouTube metadata is filled in later by the enrichment queue
+    enrich = bool(YOUTUBE_API_KEY and video_info['type'] == 'youtube' and video_info['video_id'])
+    now = datetime.utcnow()
+    
+    return {
+        'id': str(uuid.uuid4()),
+        'title': video.title,
+        'description': video.description,
+        'url': video.url,
+        'thumbnail': video.thumbnail,
+        'category': video.category,
+        'tags': video.tags,
+        'duration': video.duration,
+        'is_premium': video.is_premium,
+        'is_live': video.is_live,
+        'video_type': video_info['type'],
+        'video_id': video_info['video_id'],
+        'embed_url': video_info['embed_url'],
+        'created_at': now,
+        'updated_at': now,
+        'view_count': 0,
+        'enrichment_status': 'pending' if enrich else None
+    }
+
+def video_doc_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a raw import record against VideoBase and build its document"""
+    return build_video_doc(VideoBase(**record))
+
+def on_video_stored(video_doc: Dict[str, Any]):
+    """Update in-process indexes and queue enrichment for a newly stored video"""
+    if SUGGEST_INDEX_ENABLED:
+        suggest_index.add(video_doc)
+    if VIEW_COUNTER_ENABLED:
+        view_counter.remember(video_doc['id'])
+    if video_doc['enrichment_status'] == 'pending':
+        enrichment_queue.enqueue(video_doc['id'], video_doc['video_id'])
+
+async def on_videos_imported(video_docs: List[Dict[str, Any]]):
+    """Bulk counterpart of on_video_stored; the featured snapshot is rebuilt once per batch"""
+    for video_doc in video_docs:
+        on_video_stored(video_doc)
+    await featured_snapshot.invalidate()
+    await worker_bus.publish('videos_created', [video_doc['id'] for video_doc in video_docs])
+
 @app.post("/api/videos", response_model=Video)
 async def create_video(video: VideoBase):
     """Create a new video"""
     try:
-        # Extract video information
-        video_info = extract_video_info(video.url)
-        
-        # Get metadata for YouTube videos
-        metadata = {}
-        if video_info['type'] == 'youtube' and video_info['video_id']:
-            metadata = get_youtube_metadata(video_info['video_id'])
-        
-        # Create video document
-        video_doc = {
-            'id': str(uuid.uuid4()),
-            'title': metadata.get('title', video.title),
-            'description': metadata.get('description', video.description),
-            'url': video.url,
-            'thumbnail': metadata.get('thumbnail', video.thumbnail),
-            'category': video.category,
-            'tags': video.tags,
-            'duration': metadata.get('duration', video.duration),
-            'is_premium': video.is_premium,
-            'is_live': video.is_live,
-            'video_type': video_info['type'],
-            'video_id': video_info['video_id'],
-            'embed_url': video_info['embed_url'],
-            'created_at': datetime.utcnow(),
-            'view_count': metadata.get('view_count', 0)
-        }
+        video_doc = build_video_doc(video)
         
         # Insert into database
-        result = videos_collection.insert_one(video_doc)
+        result = await videos_collection.insert_one(video_doc)
         if result.inserted_id:
+            await featured_snapshot.apply_video(video_doc)
+            on_video_stored(video_doc)
+            await worker_bus.publish('videos_created', [video_doc['id']])
             return Video(**video_doc)
         else:
             raise HTTPException(status_code=500, detail="Failed to create video")
             
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
 
-@app.get("/api/videos", response_model=List[Video])
+@app.post("/api/videos/bulk", response_model=BulkImportResponse)
+async def bulk_import_videos(request: Request, format: Optional[str] = Query(None, pattern='^(ndjson|csv)$')):
+    """Import many videos from an NDJSON or CSV request body"""
+    fmt = format or ('csv' if 'csv' in request.headers.get('content-type', '') else 'ndjson')
+    try:
+        return await import_records(
+            iter_records(request.stream(), fmt), video_doc_from_record, on_batch=on_videos_imported
+        )
+    except Exception as e:
+        raise server_error(e)
+
+@app.get("/api/videos", response_model=List[VideoCard])
 async def get_videos(
+    response: Response,
     category: Optional[str] = None,
     is_premium: Optional[bool] = None,
     is_live: Optional[bool] = None,
     limit: int = Query(20, le=100),
-    skip: int = Query(0, ge=0)
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: str = Query('latest', pattern='^(latest|popular)$')
 ):
     """Get videos with optional filtering"""
+    selected = video_fields(fields)
+    if sort == 'popular' and (cursor or not TRENDING_ENABLED):
+        raise HTTPException(status_code=400, detail="sort=popular needs rankings enabled and pages with skip, not cursor")
+    try:
+        position = decode_cursor(cursor, VIDEO_SORT) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Build query
         query = {}
@@ -189,90 +483,178 @@ async def get_videos(
         if is_live is not None:
             query['is_live'] = is_live
         
+        if position:
+            query = {'$and': [query, keyset_filter(position, VIDEO_SORT)]} if query else keyset_filter(position, VIDEO_SORT)
+            skip = 0
+        
         # Execute query
-        cursor = videos_collection.find(query).skip(skip).limit(limit).sort('created_at', -1)
-        videos = []
+        projection = fields_projection(selected)
+        if sort == 'popular':
+            docs = await ranked_videos(rankings.popular_ids(), query, projection, skip, limit)
+        else:
+            docs = await videos_collection.find(query, projection).skip(skip).limit(limit).sort(VIDEO_SORT).to_list(length=limit)
         
-        for doc in cursor:
-            del doc['_id']  # Remove MongoDB ObjectId
-            videos.append(Video(**doc))
+        cursor_out = next_cursor(docs, limit, VIDEO_SORT) if sort == 'latest' else None
+        headers = {'X-Next-Cursor': cursor_out} if cursor_out else {}
+        if FAST_RESPONSES or not is_full_fieldset(selected):
+            return FastJSONResponse(encode_videos(docs, selected), headers=headers)
         
-        return videos
+        response.headers.update(headers)
+        return [Video(**doc) for doc in docs]
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
+
+@app.get("/api/videos/export")
+async def export_videos(updated_since: Optional[datetime] = None, fields: Optional[str] = None):
+    """Stream the catalog as NDJSON, one video per line"""
+    selected = video_fields(fields or 'all')
+    started_at = datetime.utcnow()
+    cursor = export_cursor(fields_projection(selected), updated_since)
+    defaults = {name: value for name, value in VIDEO_DEFAULTS.items() if name in selected}
+    return StreamingResponse(
+        iter_export(cursor, defaults),
+        media_type='application/x-ndjson',
+        headers={
+            'X-Export-Started-At': started_at.isoformat() + 'Z',
+            'Content-Disposition': 'attachment; filename="videos.ndjson"',
+        }
+    )
+
+@app.post("/api/videos/batch-get", response_model=BatchGetResponse)
+async def batch_get_videos(request: BatchGetRequest, fields: Optional[str] = None):
+    """Look up many videos at once, in the order requested"""
+    selected = video_fields(fields or 'all')
+    try:
+        if VIDEO_CACHE_ENABLED:
+            docs = await video_cache.get_many(request.ids)
+        else:
+            docs = await load_videos(list(dict.fromkeys(request.ids)), VIDEO_PROJECTION)
+        videos = {
+            video_id: {name: doc[name] for name in selected if name in doc}
+            for video_id, doc in zip(docs, apply_defaults(list(docs.values()), VIDEO_DEFAULTS))
+        }
+        results = [{'id': video_id, 'found': video_id in videos, 'video': videos.get(video_id)} for video_id in request.ids]
+        found = sum(1 for result in results if result['found'])
+        return FastJSONResponse({'found': found, 'missing': len(results) - found, 'results': results})
+        
+    except Exception as e:
+        raise server_error(e)
 
 @app.get("/api/videos/{video_id}", response_model=Video)
 async def get_video(video_id: str):
     """Get a specific video by ID"""
     try:
-        video_doc = videos_collection.find_one({'id': video_id})
+        if VIDEO_CACHE_ENABLED:
+            video_doc = await video_cache.get(video_id)
+        else:
+            video_doc = await videos_collection.find_one({'id': video_id}, VIDEO_PROJECTION)
         if not video_doc:
             raise HTTPException(status_code=404, detail="Video not found")
         
-        del video_doc['_id']
+        if FAST_RESPONSES:
+            return FastJSONResponse(apply_defaults([video_doc], VIDEO_DEFAULTS)[0])
         return Video(**video_doc)
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit, miss and eviction counters of the in-process caches"""
+    return {
+        'videos': video_cache.stats() if VIDEO_CACHE_ENABLED else None,
+        'change_feed': change_feed.stats() if CHANGE_FEED_ENABLED else None,
+        'rankings': rankings.stats() if TRENDING_ENABLED else None,
+    }
 
 @app.get("/api/search", response_model=SearchResponse)
 async def search_videos(
     q: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
-    per_page: int = Query(20, le=100)
+    per_page: int = Query(20, le=100),
+    mode: str = Query(DEFAULT_SEARCH_MODE, pattern=mode_pattern(SEARCH_MODES)),
+    cursor: Optional[str] = None,
+    total_mode: str = Query(DEFAULT_TOTAL_MODE, pattern=mode_pattern(TOTAL_MODES)),
+    fields: Optional[str] = None
 ):
     """Search videos by title, description, tags, or category"""
+    selected = video_fields(fields)
     try:
-        # Build search query
-        search_query = {
-            '$or': [
-                {'title': {'$regex': q, '$options': 'i'}},
-                {'description': {'$regex': q, '$options': 'i'}},
-                {'category': {'$regex': q, '$options': 'i'}},
-                {'tags': {'$regex': q, '$options': 'i'}}
-            ]
-        }
-        
         # Calculate pagination
         skip = (page - 1) * per_page
         
         # Execute search
-        cursor = videos_collection.find(search_query).skip(skip).limit(per_page).sort('created_at', -1)
-        total = videos_collection.count_documents(search_query)
+        docs, match_query, cursor_out = await find_videos(q, mode, skip, per_page, cursor, fields_projection(selected))
+        total, total_exact = await count_matches(
+            match_query, total_mode, len(docs), per_page, None if cursor else skip
+        )
         
-        videos = []
-        for doc in cursor:
-            del doc['_id']
-            videos.append(Video(**doc))
+        if FAST_RESPONSES or not is_full_fieldset(selected):
+            return FastJSONResponse({
+                'videos': encode_videos(docs, selected),
+                'total': total,
+                'total_exact': total_exact,
+                'page': page,
+                'per_page': per_page,
+                'next_cursor': cursor_out
+            })
         
         return SearchResponse(
-            videos=videos,
+            videos=[Video(**doc).model_dump() for doc in docs],
             total=total,
+            total_exact=total_exact,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            next_cursor=cursor_out
         )
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
+
+@app.get("/api/search/suggest", response_model=SuggestResponse)
+async def suggest_videos(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Prefix autocomplete over video titles, tags and categories"""
+    if not SUGGEST_INDEX_ENABLED or not suggest_index.ready:
+        raise HTTPException(status_code=503, detail="Suggest index not available")
+    return SuggestResponse(query=q, **suggest_index.suggest(q, limit))
 
 @app.get("/api/categories", response_model=List[Category])
-async def get_categories():
-    """Get all categories"""
+async def get_categories(request: Request, v: Optional[int] = None):
+    """Get all categories; ?v= names the version the client expects"""
     try:
-        cursor = categories_collection.find().sort('name', 1)
-        categories = []
+        if CATEGORY_CACHE_ENABLED:
+            body, etag, version = await category_catalog.get(min_version=v)
+            headers = {'ETag': etag, 'X-Categories-Version': str(version)}
+            if etag_matches(request, etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type='application/json', headers=headers)
         
-        for doc in cursor:
-            del doc['_id']
-            categories.append(Category(**doc))
+        docs = await categories_collection.find({}, CATEGORY_PROJECTION).sort('name', 1).to_list(length=None)
         
-        return categories
+        if FAST_RESPONSES:
+            return FastJSONResponse(docs)
+        return [Category(**doc) for doc in docs]
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
+
+@app.get("/api/categories/version")
+async def get_categories_version():
+    """Version of the category list; clients refetch /api/categories only when it changes"""
+    if not CATEGORY_CACHE_ENABLED:
+        raise HTTPException(status_code=404, detail="Category cache disabled")
+    try:
+        return {"version": await category_catalog.get_version()}
+    except Exception as e:
+        raise server_error(e)
 
 class CategoryCreate(BaseModel):
     name: str
@@ -291,73 +673,87 @@ async def create_category(category: CategoryCreate):
             'created_at': datetime.utcnow()
         }
         
-        result = categories_collection.insert_one(category_doc)
+        result = await categories_collection.insert_one(category_doc)
         if result.inserted_id:
+            await featured_snapshot.apply_category(category_doc)
+            if CATEGORY_CACHE_ENABLED:
+                await category_catalog.bump()
+            await worker_bus.publish('categories_changed', [category_doc['id']])
             return Category(**category_doc)
         else:
             raise HTTPException(status_code=500, detail="Failed to create category")
             
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
 
 @app.get("/api/featured")
-async def get_featured_content():
+async def get_featured_content(request: Request, fields: Optional[str] = None):
     """Get featured content for homepage"""
+    selected = video_fields(fields)
     try:
-        # Get latest videos by category
-        categories = list(categories_collection.find())
-        featured_content = []
+        if fields is not None:
+            return FastJSONResponse(await load_featured_content(fields_projection(selected), VIDEO_PROJECTION))
         
-        for category in categories:
-            videos = list(videos_collection.find(
-                {'category': category['name']}
-            ).limit(10).sort('created_at', -1))
-            
-            # Remove MongoDB ObjectId
-            for video in videos:
-                del video['_id']
-            
-            if videos:
-                featured_content.append({
-                    'category': category['name'],
-                    'videos': videos
-                })
-        
-        # Get hero video (latest non-premium video)
-        hero_video = videos_collection.find_one(
-            {'is_premium': False},
-            sort=[('created_at', -1)]
-        )
+        body, etag = await featured_snapshot.get()
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={'ETag': etag})
+        return Response(content=body, media_type='application/json', headers={'ETag': etag})
         
-        if hero_video:
-            del hero_video['_id']
-        
-        return {
-            'hero_video': hero_video,
-            'categories': featured_content
-        }
+    except Exception as e:
+        raise server_error(e)
+
+@app.get("/api/trending", response_model=List[VideoCard])
+async def get_trending(
+    limit: int = Query(20, le=100),
+    skip: int = Query(0, ge=0),
+    category: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Videos with the most recent views"""
+    if not TRENDING_ENABLED:
+        raise HTTPException(status_code=404, detail="Trending disabled")
+    selected = video_fields(fields)
+    try:
+        query = {'category': category} if category else {}
+        docs = await ranked_videos(rankings.trending_ids(), query, fields_projection(selected), skip, limit)
+        if FAST_RESPONSES or not is_full_fieldset(selected):
+            return FastJSONResponse(encode_videos(docs, selected))
+        return [Video(**doc) for doc in docs]
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
+
+def record_local_view(video_id: str):
+    # With the change feed, rankings hear about every worker's views from it instead
+    if TRENDING_ENABLED and not CHANGE_FEED_ENABLED:
+        rankings.record_local_view(video_id)
 
 @app.put("/api/videos/{video_id}/view")
 async def increment_view_count(video_id: str):
     """Increment view count for a video"""
     try:
-        result = videos_collection.update_one(
+        if VIEW_COUNTER_ENABLED:
+            if not await view_counter.exists(video_id):
+                raise HTTPException(status_code=404, detail="Video not found")
+            view_counter.record(video_id)
+            record_local_view(video_id)
+            return {"message": "View count incremented"}
+        
+        result = await videos_collection.update_one(
             {'id': video_id},
-            {'$inc': {'view_count': 1}}
+            {'$inc': {'view_count': 1}, '$set': {'view_count_delta': 1, 'viewed_at': datetime.utcnow()}}
         )
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Video not found")
         
+        record_local_view(video_id)
         return {"message": "View count incremented"}
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise server_error(e)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,132 @@
+from bisect import bisect_left, insort
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+import os
+import re
+import sys
+
+from database import videos_collection
+
+SUGGEST_INDEX_ENABLED = os.environ.get('SUGGEST_INDEX_ENABLED', 'true').lower() == 'true'
+# Upper bound on prefix completions scanned per request, keeps short prefixes cheap
+SUGGEST_MAX_PREFIX_TERMS = int(os.environ.get('SUGGEST_MAX_PREFIX_TERMS', 200))
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class SuggestIndex:
+    """In-memory inverted index over video titles, tags and categories.
+
+    Terms are kept in a sorted list so that a prefix lookup is a bisect
+    followed by a short forward scan; postings map each term to the ids of
+    the videos that contain it. The terms each video was indexed under are
+    remembered so a re-index or removal can take its old postings out.
+    """
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.postings: Dict[str, Set[str]] = {}
+        self.videos: Dict[str, Tuple[str, str]] = {}
+        self.video_terms: Dict[str, FrozenSet[str]] = {}
+        self.ready = False
+
+    def __len__(self):
+        return len(self.videos)
+
+    def add(self, doc: Dict[str, Any]):
+        """Index (or re-index) one video document"""
+        video_id = doc['id']
+        text = ' '.join([doc['title'], doc['category']] + list(doc.get('tags') or []))
+        tokens = frozenset(sys.intern(token) for token in tokenize(text))
+        self._remove_postings(video_id, self.video_terms.get(video_id, frozenset()) - tokens)
+        self.videos[video_id] = (doc['title'], doc['category'])
+        self.video_terms[video_id] = tokens
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = set()
+                insort(self.terms, token)
+            postings.add(video_id)
+
+    def remove(self, video_id: str):
+        """Drop a video from the index; unknown ids are ignored"""
+        self._remove_postings(video_id, self.video_terms.pop(video_id, frozenset()))
+        self.videos.pop(video_id, None)
+
+    def _remove_postings(self, video_id: str, tokens: Iterable[str]):
+        for token in tokens:
+            postings = self.postings[token]
+            postings.discard(video_id)
+            if not postings:
+                del self.postings[token]
+                del self.terms[bisect_left(self.terms, token)]
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]):
+        for doc in docs:
+            self.add(doc)
+
+    async def build(self):
+        """Load every video from the database, replacing the current contents"""
+        index = SuggestIndex()
+        async for doc in videos_collection.find({}, {'_id': 0, 'id': 1, 'title': 1, 'category': 1, 'tags': 1}):
+            index.add(doc)
+        self.terms, self.postings = index.terms, index.postings
+        self.videos, self.video_terms = index.videos, index.video_terms
+        self.ready = True
+
+    def complete(self, prefix: str) -> List[str]:
+        """Indexed terms that start with prefix, in lexical order"""
+        matches = []
+        index = bisect_left(self.terms, prefix)
+        while index < len(self.terms) and len(matches) < SUGGEST_MAX_PREFIX_TERMS:
+            term = self.terms[index]
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+            index += 1
+        return matches
+
+    def suggest(self, q: str, limit: int = 10) -> Dict[str, Any]:
+        """Complete the last word of q; earlier words must match whole terms"""
+        tokens = tokenize(q)
+        if not tokens:
+            return {'terms': [], 'videos': []}
+        *words, prefix = tokens
+
+        candidates = None
+        for word in words:
+            postings = self.postings.get(word, set())
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return {'terms': [], 'videos': []}
+
+        terms = []
+        video_ids: List[str] = []
+        seen = set()
+        for term in self.complete(prefix):
+            postings = self.postings[term]
+            if candidates is not None:
+                postings = postings & candidates
+            if not postings:
+                continue
+            if len(terms) < limit:
+                terms.append(' '.join(words + [term]))
+            for video_id in postings:
+                if len(video_ids) >= limit:
+                    break
+                if video_id not in seen:
+                    seen.add(video_id)
+                    video_ids.append(video_id)
+            if len(terms) >= limit and len(video_ids) >= limit:
+                break
+
+        return {
+            'terms': terms,
+            'videos': [
+                {'id': video_id, 'title': self.videos[video_id][0], 'category': self.videos[video_id][1]}
+                for video_id in video_ids
+            ]
+        }
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,205 @@
+"""Trending and most-viewed rankings, maintained incrementally from view events.
+
+Both rankings only ever see scores go up: a video's all-time view count
+never decreases, and trending uses forward decay, where a view at time t
+adds exp((t - landmark) / tau) instead of every older score shrinking.
+With scores that only grow, the top K is kept exactly by checking the
+one video whose score changed against the lowest member, so serving a
+ranking costs O(K) whatever the catalog size.
+
+Rankings are fed by the change feed's view_delta events, which cover
+views recorded by every worker. The most-viewed ranking is seeded from
+the view_count index at startup and re-seeded every
+TRENDING_RESEED_SECONDS, which also drops deleted videos. Trending state
+lives in process memory and starts empty after a restart; until it has
+enough videos it is padded with the most-viewed ranking.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import math
+import os
+import time
+
+from database import videos_collection
+from logs import logger
+
+TRENDING_ENABLED = os.environ.get('TRENDING_ENABLED', 'true').lower() == 'true'
+# Size of each ranking, the deepest page /api/trending and ?sort=popular can serve
+TRENDING_TOP_K = int(os.environ.get('TRENDING_TOP_K', 500))
+# A view counts half as much for trending after this long
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+TRENDING_RESEED_SECONDS = float(os.environ.get('TRENDING_RESEED_SECONDS', 300))
+# Videos with a trending score kept in memory; the weakest are pruned beyond this
+TRENDING_MAX_TRACKED = int(os.environ.get('TRENDING_MAX_TRACKED', 200000))
+
+# Rescale forward-decayed scores before their weights grow past this exponent
+MAX_DECAY_EXPONENT = 50.0
+
+class TopK:
+    """Exact top K of scores that never decrease"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.scores: Dict[str, float] = {}
+        self._floor: Optional[str] = None
+        self._ranked: Optional[List[Tuple[str, float]]] = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, key: str):
+        return key in self.scores
+
+    def update(self, key: str, score: float):
+        """Offer a key's new score; a score below its previous one is ignored"""
+        if key in self.scores:
+            if score <= self.scores[key]:
+                return
+            self.scores[key] = score
+            if key == self._floor:
+                self._floor = min(self.scores, key=self.scores.get)
+        elif len(self.scores) < self.k:
+            self.scores[key] = score
+            if self._floor is None or score < self.scores[self._floor]:
+                self._floor = key
+        elif score > self.scores[self._floor]:
+            del self.scores[self._floor]
+            self.scores[key] = score
+            self._floor = min(self.scores, key=self.scores.get)
+        else:
+            return
+        self._ranked = None
+
+    def ranked(self) -> List[Tuple[str, float]]:
+        """(key, score) pairs, highest first; cached until the next change"""
+        if self._ranked is None:
+            self._ranked = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+        return self._ranked
+
+    def rescale(self, factor: float):
+        self.scores = {key: score * factor for key, score in self.scores.items()}
+        self._ranked = None
+
+    def reset(self, scores: Iterable[Tuple[str, float]]):
+        self.scores = {}
+        self._floor = None
+        self._ranked = None
+        for key, score in scores:
+            self.update(key, score)
+
+class TrendingScores:
+    """Exponentially decayed view counts, using forward decay"""
+
+    def __init__(self, k: int = TRENDING_TOP_K, half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+                 max_tracked: int = TRENDING_MAX_TRACKED):
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self.max_tracked = max_tracked
+        self.landmark = time.time()
+        self.scores: Dict[str, float] = {}
+        self.top = TopK(k)
+
+    def record(self, video_id: str, views: int, at: Optional[float] = None):
+        at = time.time() if at is None else at
+        exponent = (at - self.landmark) / self.tau
+        if exponent > MAX_DECAY_EXPONENT:
+            self.renormalize(at)
+            exponent = 0.0
+        score = self.scores.get(video_id, 0.0) + views * math.exp(exponent)
+        self.scores[video_id] = score
+        self.top.update(video_id, score)
+        if len(self.scores) > self.max_tracked:
+            self.prune()
+
+    def renormalize(self, at: float):
+        """Move the landmark to at; relative order and the top K are unchanged"""
+        factor = math.exp(-(at - self.landmark) / self.tau)
+        self.scores = {video_id: score * factor for video_id, score in self.scores.items()}
+        self.top.rescale(factor)
+        self.landmark = at
+
+    def prune(self):
+        """Forget the weakest half of the tracked videos that are not in the top K"""
+        candidates = sorted((score, video_id) for video_id, score in self.scores.items() if video_id not in self.top)
+        for _, video_id in candidates[:len(candidates) // 2]:
+            del self.scores[video_id]
+
+    def current(self, score: float) -> float:
+        """A stored score expressed as views-equivalent at the current time"""
+        return score * math.exp(-(time.time() - self.landmark) / self.tau)
+
+class Rankings:
+    """The trending and most-viewed rankings served by the API"""
+
+    def __init__(self, k: int = TRENDING_TOP_K, reseed_seconds: float = TRENDING_RESEED_SECONDS):
+        self.k = k
+        self.reseed_seconds = reseed_seconds
+        self.trending = TrendingScores(k)
+        self.popular = TopK(k)
+        self.view_events = 0
+        self.seeded_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def seed(self):
+        """Load the most-viewed videos through the view_count index"""
+        cursor = videos_collection.find({}, {'_id': 0, 'id': 1, 'view_count': 1}).sort('view_count', -1).limit(self.k)
+        self.popular.reset([(doc['id'], doc.get('view_count') or 0) async for doc in cursor])
+        self.seeded_at = time.time()
+
+    def record_views(self, view_deltas: Dict[str, int], view_counts: Dict[str, int]):
+        """Apply new views and, where known, new view count totals"""
+        now = time.time()
+        for video_id, views in view_deltas.items():
+            self.trending.record(video_id, views, now)
+        for video_id, view_count in view_counts.items():
+            self.popular.update(video_id, view_count)
+        self.view_events += 1
+
+    def record_local_view(self, video_id: str):
+        """A view seen only by this worker (no change feed); totals are only known for ranked videos"""
+        self.trending.record(video_id, 1)
+        if video_id in self.popular:
+            self.popular.update(video_id, self.popular.scores[video_id] + 1)
+
+    def trending_ids(self) -> List[str]:
+        ids = [video_id for video_id, _ in self.trending.top.ranked()]
+        if len(ids) < self.k:
+            seen = set(ids)
+            ids += [video_id for video_id, _ in self.popular.ranked() if video_id not in seen][:self.k - len(ids)]
+        return ids
+
+    def popular_ids(self) -> List[str]:
+        return [video_id for video_id, _ in self.popular.ranked()]
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reseed_seconds)
+            try:
+                await self.seed()
+            except Exception:
+                logger.exception('trending_reseed_failed')
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        top = self.trending.top.ranked()
+        return {
+            'trending_tracked': len(self.trending.scores),
+            'trending_ranked': len(top),
+            'top_trending_score': round(self.trending.current(top[0][1]), 2) if top else None,
+            'popular_ranked': len(self.popular),
+            'view_events': self.view_events,
+            'seeded_at': self.seeded_at,
+        }
+
+rankings = Rankings()
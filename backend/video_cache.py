@@ -0,0 +1,290 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import os
+import time
+
+from database import videos_collection
+from logs import logger
+from serialization import dumps
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # No shared tier then; each worker reads through its own LRU
+    aioredis = None
+
+VIDEO_CACHE_ENABLED = os.environ.get('VIDEO_CACHE_ENABLED', 'true').lower() == 'true'
+VIDEO_CACHE_SIZE = int(os.environ.get('VIDEO_CACHE_SIZE', 10000))
+# In-process entries expire quickly so workers converge even without Redis
+VIDEO_CACHE_TTL = float(os.environ.get('VIDEO_CACHE_TTL', 30))
+VIDEO_CACHE_REDIS_TTL = int(os.environ.get('VIDEO_CACHE_REDIS_TTL', 300))
+# View counts change on every view, so they are cached apart from the document
+VIDEO_CACHE_VIEW_COUNT_TTL = float(os.environ.get('VIDEO_CACHE_VIEW_COUNT_TTL', 5))
+VIDEO_CACHE_KEY_PREFIX = os.environ.get('VIDEO_CACHE_KEY_PREFIX', 'sme:video:')
+# Most ids one POST /api/videos/batch-get may ask for
+VIDEO_BATCH_GET_MAX_IDS = int(os.environ.get('VIDEO_BATCH_GET_MAX_IDS', 500))
+REDIS_URL = os.environ.get('REDIS_URL')
+
+class LRUCache:
+    """Bounded LRU with a per-entry TTL; counts hits, misses and evictions"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+async def load_video(video_id: str, projection: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    return await videos_collection.find_one({'id': video_id}, projection)
+
+async def load_videos(video_ids: List[str], projection: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+    """Videos by id in one $in query; missing ids are absent from the result"""
+    docs = await videos_collection.find({'id': {'$in': video_ids}}, dict(projection, id=1)).to_list(length=None)
+    return {doc['id']: doc for doc in docs}
+
+class VideoCache:
+    """Two-tier read-through cache for single-video lookups.
+
+    Tier one is an in-process LRU with a short TTL; tier two, when
+    REDIS_URL is set, is shared by all workers. Documents are cached
+    without view_count, which is cached on its own with a much shorter
+    TTL so that views never invalidate the document. Concurrent misses
+    for the same id share one database read. Missing ids are not cached,
+    so only writes that change an existing video need to call
+    invalidate().
+    """
+
+    def __init__(
+        self,
+        projection: Dict[str, int],
+        max_entries: int = VIDEO_CACHE_SIZE,
+        ttl: float = VIDEO_CACHE_TTL,
+        redis_url: Optional[str] = REDIS_URL,
+        redis_ttl: int = VIDEO_CACHE_REDIS_TTL,
+        view_count_ttl: float = VIDEO_CACHE_VIEW_COUNT_TTL
+    ):
+        self.projection = {name: value for name, value in projection.items() if name != 'view_count'}
+        self.local = LRUCache(max_entries, ttl)
+        self.view_counts = LRUCache(max_entries, view_count_ttl)
+        self.redis = aioredis.from_url(redis_url) if (redis_url and aioredis) else None
+        self.redis_ttl = redis_ttl
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.loads = 0
+        self.invalidations = 0
+        # Bumped by invalidate() so a read that raced with a write is not cached
+        self._generation = 0
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return the video document with its view count, or None if it does not exist"""
+        doc = self.local.get(video_id)
+        if doc is None:
+            doc = await self._load_shared(video_id)
+            if doc is None:
+                return None
+        view_count = self.view_counts.get(video_id)
+        if view_count is None:
+            # Only after a Redis hit, an expired count or a load raced by an invalidation;
+            # a database load caches the count along with the document
+            counted = await videos_collection.find_one({'id': video_id}, {'_id': 0, 'view_count': 1})
+            view_count = (counted or {}).get('view_count', 0)
+            self.view_counts.set(video_id, view_count)
+        return dict(doc, view_count=view_count)
+
+    async def get_many(self, video_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Batch counterpart of get(): found videos by id, at most one query per tier"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for video_id in dict.fromkeys(video_ids):
+            doc = self.local.get(video_id)
+            if doc is None:
+                missing.append(video_id)
+            else:
+                found[video_id] = doc
+
+        if missing and self.redis is not None:
+            shared = await self._redis_get_many(missing)
+            self.redis_hits += len(shared)
+            self.redis_misses += len(missing) - len(shared)
+            for video_id, doc in shared.items():
+                self.local.set(video_id, doc)
+            found.update(shared)
+            missing = [video_id for video_id in missing if video_id not in shared]
+
+        view_counts: Dict[str, int] = {}
+        if missing:
+            # The view count comes along with the documents loaded here
+            self.loads += 1
+            generation = self._generation
+            loaded = await load_videos(missing, dict(self.projection, view_count=1))
+            for video_id, doc in loaded.items():
+                view_counts[video_id] = doc.pop('view_count', 0)
+            if generation == self._generation:
+                for video_id, doc in loaded.items():
+                    self.local.set(video_id, doc)
+                    self.view_counts.set(video_id, view_counts[video_id])
+                if self.redis is not None and loaded:
+                    await self._redis_set_many(loaded)
+            found.update(loaded)
+
+        stale = []
+        for video_id in found:
+            if video_id not in view_counts:
+                view_count = self.view_counts.get(video_id)
+                if view_count is None:
+                    stale.append(video_id)
+                else:
+                    view_counts[video_id] = view_count
+        if stale:
+            async for counted in videos_collection.find({'id': {'$in': stale}}, {'_id': 0, 'id': 1, 'view_count': 1}):
+                view_counts[counted['id']] = counted.get('view_count', 0)
+                self.view_counts.set(counted['id'], view_counts[counted['id']])
+        return {video_id: dict(doc, view_count=view_counts.get(video_id, 0)) for video_id, doc in found.items()}
+
+    async def _load_shared(self, video_id: str) -> Optional[Dict[str, Any]]:
+        # Single flight: concurrent misses for a hot id wait on the first one
+        pending = self._loading.get(video_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._loading[video_id] = future
+        try:
+            doc = await self._load(video_id)
+            future.set_result(doc)
+            return doc
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._loading[video_id]
+
+    async def _load(self, video_id: str) -> Optional[Dict[str, Any]]:
+        if self.redis is not None:
+            doc = await self._redis_get(video_id)
+            if doc is not None:
+                self.redis_hits += 1
+                self.local.set(video_id, doc)
+                return doc
+            self.redis_misses += 1
+
+        self.loads += 1
+        generation = self._generation
+        # The view count comes along with the document, as in get_many
+        doc = await load_video(video_id, dict(self.projection, view_count=1))
+        if doc is None:
+            return None
+        view_count = doc.pop('view_count', 0)
+        if generation != self._generation:
+            return doc
+        self.view_counts.set(video_id, view_count)
+        self.local.set(video_id, doc)
+        if self.redis is not None:
+            await self._redis_set(video_id, doc)
+        return doc
+
+    async def invalidate(self, video_ids: Iterable[str], shared: bool = True):
+        """Drop videos from both tiers after they were changed; shared=False only clears this process"""
+        video_ids = list(video_ids)
+        self._generation += 1
+        for video_id in video_ids:
+            self.local.discard(video_id)
+            self.view_counts.discard(video_id)
+        self.invalidations += len(video_ids)
+        if shared and self.redis is not None and video_ids:
+            try:
+                await self.redis.delete(*[VIDEO_CACHE_KEY_PREFIX + video_id for video_id in video_ids])
+            except Exception as e:
+                logger.warning('video_cache_redis_failed', operation='delete', videos=len(video_ids), error=str(e))
+
+    def clear(self):
+        """Drop every video cached in this process"""
+        self._generation += 1
+        self.local.clear()
+        self.view_counts.clear()
+
+    async def _redis_get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            body = await self.redis.get(VIDEO_CACHE_KEY_PREFIX + video_id)
+        except Exception as e:
+            logger.warning('video_cache_redis_failed', operation='get', video_id=video_id, error=str(e))
+            return None
+        return json.loads(body) if body is not None else None
+
+    async def _redis_get_many(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            bodies = await self.redis.mget([VIDEO_CACHE_KEY_PREFIX + video_id for video_id in video_ids])
+        except Exception as e:
+            logger.warning('video_cache_redis_failed', operation='mget', videos=len(video_ids), error=str(e))
+            return {}
+        return {video_id: json.loads(body) for video_id, body in zip(video_ids, bodies) if body is not None}
+
+    async def _redis_set_many(self, docs: Dict[str, Dict[str, Any]]):
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for video_id, doc in docs.items():
+                    pipe.set(VIDEO_CACHE_KEY_PREFIX + video_id, dumps(doc), ex=self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning('video_cache_redis_failed', operation='set_many', videos=len(docs), error=str(e))
+
+    async def _redis_set(self, video_id: str, doc: Dict[str, Any]):
+        try:
+            await self.redis.set(VIDEO_CACHE_KEY_PREFIX + video_id, dumps(doc), ex=self.redis_ttl)
+        except Exception as e:
+            logger.warning('video_cache_redis_failed', operation='set', video_id=video_id, error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            'entries': len(self.local),
+            'hits': self.local.hits,
+            'misses': self.local.misses,
+            'evictions': self.local.evictions,
+            'expirations': self.local.expirations,
+            'loads': self.loads,
+            'invalidations': self.invalidations,
+            'view_count_hits': self.view_counts.hits,
+            'view_count_misses': self.view_counts.misses,
+        }
+        if self.redis is not None:
+            stats.update(redis_hits=self.redis_hits, redis_misses=self.redis_misses)
+        return stats
@@ -0,0 +1,79 @@
+"""Table-driven classification of video URLs by provider.
+
+The host is parsed once and looked up in a dict, first as given and then
+by each parent domain, so a provider registered for youtube.com also
+serves www., m. and music.youtube.com. Only the matching provider's
+precompiled pattern then runs against the rest of the URL. Add a
+provider with register_provider().
+"""
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern
+import re
+
+class Provider(NamedTuple):
+    name: str
+    pattern: Pattern
+    embed_url: Callable[[str], str]
+
+# Optional scheme, optional user:password@, then the host and an optional port
+_URL_HOST = re.compile(r'(?:[A-Za-z][A-Za-z0-9+.-]*:)?//(?:[^/?#@]*@)?([^/?#:]+)(?::\d*)?')
+
+_providers_by_host: Dict[str, Provider] = {}
+
+def register_provider(name: str, hosts: Iterable[str], pattern: str, embed_template: str):
+    """Register a provider for hosts and their subdomains.
+
+    pattern runs against the URL after the host and must capture the video id.
+    """
+    provider = Provider(name, re.compile(pattern), embed_template.format)
+    for host in hosts:
+        _providers_by_host[host.lower()] = provider
+
+register_provider(
+    'youtube', ['youtube.com'], r'/watch\?v=([^&\n?#]+)',
+    'https://www.youtube.com/embed/{}'
+)
+register_provider(
+    'youtube', ['youtu.be'], r'/([^&\n?#]+)',
+    'https://www.youtube.com/embed/{}'
+)
+register_provider(
+    'rumble', ['rumble.com'], r'/(?:embed/)?([^/?]+)',
+    'https://rumble.com/embed/{}/'
+)
+
+def provider_for_host(host: str) -> Optional[Provider]:
+    """The provider registered for host or its closest parent domain"""
+    host = host.lower()
+    while True:
+        provider = _providers_by_host.get(host)
+        if provider is not None:
+            return provider
+        _, dot, host = host.partition('.')
+        if not dot:
+            return None
+
+def classify_url(url: str) -> Dict[str, Any]:
+    """Extract video type and ID from URL"""
+    # Scheme-less URLs such as "youtu.be/abc" are read as if they started with //
+    match = _URL_HOST.match(url) or _URL_HOST.match('//' + url)
+    if match is not None:
+        provider = provider_for_host(match.group(1))
+        if provider is not None:
+            # Match in place after the host instead of slicing the URL
+            id_match = provider.pattern.match(match.string, match.end())
+            if id_match:
+                video_id = id_match.group(1)
+                return {
+                    'type': provider.name,
+                    'video_id': video_id,
+                    'embed_url': provider.embed_url(video_id)
+                }
+    return {
+        'type': 'direct',
+        'video_id': None,
+        'embed_url': url
+    }
+
+def classify_urls(urls: Iterable[str]) -> List[Dict[str, Any]]:
+    """Classify many URLs, e.g. for bulk ingestion"""
+    return [classify_url(url) for url in urls]
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from datetime import datetime
+from pymongo import UpdateOne
+from typing import Dict, Optional
+import asyncio
+import os
+
+from database import videos_collection
+from logs import logger
+
+VIEW_COUNTER_ENABLED = os.environ.get('VIEW_COUNTER_ENABLED', 'true').lower() == 'true'
+# A flush happens every interval or once this many views are pending, whichever comes first.
+# Together they bound how many views a crash can lose.
+VIEW_FLUSH_INTERVAL_MS = int(os.environ.get('VIEW_FLUSH_INTERVAL_MS', 1000))
+VIEW_FLUSH_MAX_EVENTS = int(os.environ.get('VIEW_FLUSH_MAX_EVENTS', 5000))
+# How many video ids are remembered as existing, so repeat views skip the lookup
+VIEW_KNOWN_IDS_SIZE = int(os.environ.get('VIEW_KNOWN_IDS_SIZE', 100000))
+
+class ViewCounter:
+    """Write-behind aggregator for view counts.
+
+    Views are summed per video in memory and written as one unordered
+    bulk_write of $inc updates. Counts that fail to write are merged back
+    and retried on the next flush.
+    """
+
+    def __init__(
+        self,
+        interval_ms: int = VIEW_FLUSH_INTERVAL_MS,
+        max_events: int = VIEW_FLUSH_MAX_EVENTS,
+        known_ids_size: int = VIEW_KNOWN_IDS_SIZE
+    ):
+        self.interval = interval_ms / 1000.0
+        self.max_events = max_events
+        self.known_ids_size = known_ids_size
+        self.pending: Dict[str, int] = {}
+        self.pending_events = 0
+        self.known_ids: "OrderedDict[str, None]" = OrderedDict()
+        self.flushes = 0
+        self.flushed_events = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    async def exists(self, video_id: str) -> bool:
+        """Check a video exists, remembering positive answers"""
+        if video_id in self.known_ids:
+            self.known_ids.move_to_end(video_id)
+            return True
+        if not await videos_collection.find_one({'id': video_id}, {'_id': 1}):
+            return False
+        self.remember(video_id)
+        return True
+
+    def remember(self, video_id: str):
+        self.known_ids[video_id] = None
+        if len(self.known_ids) > self.known_ids_size:
+            self.known_ids.popitem(last=False)
+
+    def record(self, video_id: str, count: int = 1):
+        """Queue a view; triggers an early flush when the batch is full"""
+        self.pending[video_id] = self.pending.get(video_id, 0) + count
+        self.pending_events += count
+        if self.pending_events >= self.max_events and (self._flushing is None or self._flushing.done()):
+            self._flushing = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Write all pending counts; returns the number of documents updated"""
+        if not self.pending:
+            return 0
+        batch, events = self.pending, self.pending_events
+        self.pending, self.pending_events = {}, 0
+        now = datetime.utcnow()
+        try:
+            # view_count_delta and viewed_at let the change feed report how many views each write added
+            await videos_collection.bulk_write(
+                [UpdateOne({'id': video_id}, {'$inc': {'view_count': count},
+                                              '$set': {'view_count_delta': count, 'viewed_at': now}})
+                 for video_id, count in batch.items()],
+                ordered=False
+            )
+        except Exception as e:
+            logger.warning('view_count_flush_failed', videos=len(batch), views=events, error=str(e))
+            for video_id, count in batch.items():
+                self.pending[video_id] = self.pending.get(video_id, 0) + count
+            self.pending_events += events
+            return 0
+        self.flushes += 1
+        self.flushed_events += events
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+        await self.flush()
+
+view_counter = ViewCounter()
@@ -0,0 +1,108 @@
+"""Cross-worker notifications over a capped MongoDB collection.
+
+Each worker keeps in-process state (featured snapshot, video cache,
+suggest index, known view ids) that a write in another worker can make
+stale. Whoever makes a change publishes an event; every other worker
+tails the collection and applies the same invalidation locally.
+"""
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import os
+import time
+import uuid
+
+from database import get_database
+from logs import logger
+
+WORKER_BUS_ENABLED = os.environ.get('WORKER_BUS_ENABLED', 'true').lower() == 'true'
+WORKER_BUS_COLLECTION = os.environ.get('WORKER_BUS_COLLECTION', 'worker_events')
+WORKER_BUS_SIZE_BYTES = int(os.environ.get('WORKER_BUS_SIZE_BYTES', 16 * 1024 * 1024))
+# Pause before re-opening the tailable cursor after it dies or errors
+WORKER_BUS_RETRY_SECONDS = float(os.environ.get('WORKER_BUS_RETRY_SECONDS', 1.0))
+
+Handler = Callable[[List[str]], Awaitable[Any]]
+
+class WorkerBus:
+    """Publish/subscribe between worker processes.
+
+    Events are {kind, ids} documents in a capped collection, read back
+    through a tailable cursor. A worker skips its own events: it already
+    applied the change when it made it.
+    """
+
+    def __init__(self, collection: str = WORKER_BUS_COLLECTION, size_bytes: int = WORKER_BUS_SIZE_BYTES):
+        self.collection_name = collection
+        self.size_bytes = size_bytes
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, List[Handler]] = {}
+        self.received = 0
+        self.published = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return get_database()[self.collection_name]
+
+    def subscribe(self, kind: str, handler: Handler):
+        self.handlers.setdefault(kind, []).append(handler)
+
+    async def publish(self, kind: str, ids: List[str] = ()):
+        """Tell the other workers about a change; failures only cost staleness"""
+        if self._task is None:
+            return
+        try:
+            await self.collection.insert_one({
+                'kind': kind, 'ids': list(ids), 'origin': self.worker_id, 'at': time.time()
+            })
+            self.published += 1
+        except Exception as e:
+            logger.warning('worker_event_publish_failed', kind=kind, ids=len(ids), error=str(e))
+
+    async def start(self):
+        if self._task is not None:
+            return
+        try:
+            await get_database().create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass  # created by another worker
+        # Gives the tailable cursor a document to start from on a fresh collection
+        await self.collection.insert_one({'kind': 'worker_started', 'ids': [], 'origin': self.worker_id, 'at': time.time()})
+        self._task = asyncio.create_task(self._run(time.time()))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, since: float):
+        while True:
+            try:
+                cursor = self.collection.find(
+                    {'at': {'$gte': since}, 'origin': {'$ne': self.worker_id}},
+                    cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                while cursor.alive:
+                    async for event in cursor:
+                        since = max(since, event['at'])
+                        await self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('worker_bus_read_failed', worker_id=self.worker_id)
+            await asyncio.sleep(WORKER_BUS_RETRY_SECONDS)
+
+    async def _dispatch(self, event: Dict[str, Any]):
+        self.received += 1
+        for handler in self.handlers.get(event['kind'], []):
+            try:
+                await handler(event['ids'])
+            except Exception:
+                logger.exception('worker_event_handler_failed', kind=event['kind'], origin=event.get('origin'))
+
+worker_bus = WorkerBus()
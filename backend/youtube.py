@@ -0,0 +1,232 @@
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import os
+import requests
+import time
+
+from database import videos_collection
+from logs import logger
+from metrics import record_enrichment, record_youtube_call
+
+YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY')
+# Point at a stub server (benchmarks/youtube_stub.py) to run without network access
+YOUTUBE_API_URL = os.environ.get('YOUTUBE_API_URL', 'https://www.googleapis.com/youtube/v3/videos')
+YOUTUBE_TIMEOUT = float(os.environ.get('YOUTUBE_TIMEOUT', 5))
+YOUTUBE_MAX_ATTEMPTS = int(os.environ.get('YOUTUBE_MAX_ATTEMPTS', 4))
+YOUTUBE_POOL_SIZE = int(os.environ.get('YOUTUBE_POOL_SIZE', 10))
+# videos.list accepts at most 50 ids per call
+YOUTUBE_BATCH_SIZE = 50
+
+YOUTUBE_CACHE_TTL = float(os.environ.get('YOUTUBE_CACHE_TTL', 24 * 3600))
+YOUTUBE_CACHE_SIZE = int(os.environ.get('YOUTUBE_CACHE_SIZE', 50000))
+ENRICHMENT_WORKERS = int(os.environ.get('ENRICHMENT_WORKERS', 2))
+# Pending videos re-queued at startup, left behind by a restart or a crash
+ENRICHMENT_RESUME_LIMIT = int(os.environ.get('ENRICHMENT_RESUME_LIMIT', 10000))
+
+class RetryableYouTubeError(Exception):
+    """Transient API failure (rate limit, server error) worth retrying"""
+
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=YOUTUBE_POOL_SIZE))
+_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=YOUTUBE_POOL_SIZE))
+
+def parse_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a videos.list item onto our video fields"""
+    snippet = item['snippet']
+    content_details = item['contentDetails']
+    statistics = item.get('statistics', {})
+
+    return {
+        'title': snippet['title'],
+        'description': snippet['description'],
+        'thumbnail': snippet['thumbnails']['high']['url'],
+        'duration': content_details['duration'],
+        'view_count': int(statistics.get('viewCount', 0))
+    }
+
+@retry(
+    retry=retry_if_exception_type((RetryableYouTubeError, requests.ConnectionError, requests.Timeout)),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    stop=stop_after_attempt(YOUTUBE_MAX_ATTEMPTS),
+    reraise=True,
+)
+def _videos_list(video_ids: List[str]) -> List[Dict[str, Any]]:
+    start = time.perf_counter()
+    try:
+        response = _session.get(
+            YOUTUBE_API_URL,
+            params={
+                'id': ','.join(video_ids),
+                'part': 'snippet,contentDetails,statistics',
+                'key': YOUTUBE_API_KEY
+            },
+            timeout=YOUTUBE_TIMEOUT
+        )
+    except (requests.ConnectionError, requests.Timeout):
+        record_youtube_call('network_error', time.perf_counter() - start, len(video_ids))
+        raise
+    if response.status_code == 429 or response.status_code >= 500:
+        record_youtube_call('retryable', time.perf_counter() - start, len(video_ids))
+        raise RetryableYouTubeError(f"YouTube API returned {response.status_code}")
+    record_youtube_call('ok' if response.ok else 'error', time.perf_counter() - start, len(video_ids))
+    response.raise_for_status()
+    return response.json().get('items', [])
+
+class MetadataCache:
+    """Bounded TTL cache of parsed metadata keyed by YouTube video id"""
+
+    def __init__(self, ttl: float = YOUTUBE_CACHE_TTL, max_entries: int = YOUTUBE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(video_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, video_id: str, metadata: Dict[str, Any]):
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[video_id] = (time.monotonic() + self.ttl, metadata)
+
+metadata_cache = MetadataCache()
+
+def fetch_metadata_batch(video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch metadata for many videos, 50 ids per API call, serving cached ids from memory.
+
+    Ids YouTube does not know are simply absent from the result. Raises
+    after retries are exhausted.
+    """
+    if not YOUTUBE_API_KEY:
+        return {}
+
+    results = {}
+    missing = []
+    for video_id in dict.fromkeys(video_ids):
+        cached = metadata_cache.get(video_id)
+        if cached is not None:
+            results[video_id] = cached
+        else:
+            missing.append(video_id)
+
+    for start in range(0, len(missing), YOUTUBE_BATCH_SIZE):
+        for item in _videos_list(missing[start:start + YOUTUBE_BATCH_SIZE]):
+            metadata = parse_item(item)
+            metadata_cache.set(item['id'], metadata)
+            results[item['id']] = metadata
+    return results
+
+class EnrichmentQueue:
+    """Background workers that fill in YouTube metadata after a video is stored.
+
+    Each worker takes a job and drains up to a full videos.list batch of
+    further queued jobs, so a burst of new videos costs one API call per
+    50. Documents move from enrichment_status 'pending' to 'done' or
+    'failed'. Listeners are called with the ids of enriched videos.
+
+    The queue lives in process memory, so jobs still queued when a worker
+    stops are lost; their documents stay 'pending' and resume_pending()
+    queues them again at the next startup. Results are only written to
+    documents that are still pending, so a video enriched twice (by two
+    workers resuming the same backlog) keeps the first result.
+    """
+
+    def __init__(self, workers: int = ENRICHMENT_WORKERS):
+        self.workers = workers
+        self.queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+        self.listeners: List[Callable[[List[str]], Any]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_listener(self, listener: Callable[[List[str]], Any]):
+        self.listeners.append(listener)
+
+    def enqueue(self, doc_id: str, youtube_id: str):
+        self.queue.put_nowait((doc_id, youtube_id))
+
+    async def resume_pending(self, limit: int = ENRICHMENT_RESUME_LIMIT) -> int:
+        """Queue up to limit videos still waiting for metadata; returns how many were queued"""
+        if not YOUTUBE_API_KEY or limit <= 0:
+            return 0
+        queued = 0
+        cursor = videos_collection.find(
+            {'enrichment_status': 'pending'}, {'_id': 0, 'id': 1, 'video_id': 1}, batch_size=YOUTUBE_BATCH_SIZE * 10
+        ).limit(limit)
+        async for doc in cursor:
+            if doc.get('video_id'):
+                self.enqueue(doc['id'], doc['video_id'])
+                queued += 1
+        return queued
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Give queued jobs a chance to finish, then stop the workers"""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            # Still pending in the database; resume_pending() picks them up on the next start
+            logger.warning('enrichment_queue_stopped', pending=self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            jobs = [await self.queue.get()]
+            while len(jobs) < YOUTUBE_BATCH_SIZE and not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+            try:
+                await self.enrich(jobs)
+            except Exception:
+                logger.exception('enrichment_failed', videos=len(jobs))
+            finally:
+                for _ in jobs:
+                    self.queue.task_done()
+
+    async def enrich(self, jobs: List[Tuple[str, str]]):
+        """Fetch metadata for (doc id, YouTube id) pairs and write it back"""
+        try:
+            found = await asyncio.to_thread(fetch_metadata_batch, [youtube_id for _, youtube_id in jobs])
+        except Exception:
+            logger.exception('youtube_metadata_fetch_failed', videos=len(jobs))
+            found = None
+
+        enriched = []
+        failed = 0
+        for doc_id, youtube_id in jobs:
+            metadata = found.get(youtube_id) if found is not None else None
+            if metadata is None:
+                result = await videos_collection.update_one(
+                    {'id': doc_id, 'enrichment_status': 'pending'},
+                    {'$set': {'enrichment_status': 'failed', 'updated_at': datetime.utcnow()}}
+                )
+                failed += result.modified_count
+                continue
+            fields = {key: value for key, value in metadata.items() if key != 'view_count'}
+            fields['enrichment_status'] = 'done'
+            fields['updated_at'] = datetime.utcnow()
+            result = await videos_collection.update_one(
+                {'id': doc_id, 'enrichment_status': 'pending'},
+                # YouTube's count is the starting point; views recorded here since creation are kept
+                {'$set': fields, '$inc': {'view_count': metadata['view_count']}}
+            )
+            if result.modified_count:
+                enriched.append(doc_id)
+
+        record_enrichment('done', len(enriched))
+        record_enrichment('failed', failed)
+        if enriched:
+            for listener in self.listeners:
+                result = listener(enriched)
+                if asyncio.iscoroutine(result):
+                    await result
+
+enrichment_queue = EnrichmentQueue()
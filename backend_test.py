@@ -5,6 +5,13 @@ import uuid
 import time
 from datetime import datetime
 
+# Fields of the backend's Video response model; fast-path responses must match exactly
+VIDEO_FIELDS = {
+    'id', 'title', 'description', 'url', 'thumbnail', 'category', 'tags', 'duration',
+    'is_premium', 'is_live', 'video_type', 'video_id', 'created_at', 'view_count',
+    'embed_url', 'enrichment_status'
+}
+
 class SMENetworkAPITester:
     def __init__(self, base_url):
         self.base_url = base_url
@@ -85,6 +92,16 @@ class SMENetworkAPITester:
         )
         return success, response
 
+    def test_categories_version(self):
+        """Test getting the category catalog version"""
+        success, response = self.run_test(
+            "Get Categories Version",
+            "GET",
+            "api/categories/version",
+            200
+        )
+        return success, response.get('version') if success else None
+
     def test_create_video(self, video_data):
         """Test creating a video"""
         success, response = self.run_test(
@@ -99,9 +116,11 @@ class SMENetworkAPITester:
             return True, response
         return False, {}
 
-    def test_get_videos(self, category=None, is_premium=None, is_live=None):
+    def test_get_videos(self, category=None, is_premium=None, is_live=None, fields=None):
         """Test getting videos with optional filters"""
         params = {}
+        if fields:
+            params['fields'] = fields
         if category:
             params['category'] = category
         if is_premium is not None:
@@ -129,14 +148,35 @@ class SMENetworkAPITester:
         )
         return success, response
 
-    def test_search_videos(self, query):
+    def test_batch_get_videos(self, video_ids):
+        """Test looking up several videos at once, with one unknown id"""
+        ids = list(video_ids) + ["missing-video-id"]
+        success, response = self.run_test(
+            "Batch Get Videos",
+            "POST",
+            "api/videos/batch-get",
+            200,
+            data={"ids": ids}
+        )
+        if success:
+            returned = [result['id'] for result in response.get('results', [])]
+            if returned == ids and response['results'][-1]['found'] is False:
+                print(f"✅ Results in request order, {response['found']} found, {response['missing']} missing")
+            else:
+                print(f"❌ Unexpected batch results: {returned}")
+        return success, response
+
+    def test_search_videos(self, query, fields=None):
         """Test searching for videos"""
+        params = {"q": query}
+        if fields:
+            params['fields'] = fields
         success, response = self.run_test(
             f"Search Videos for: {query}",
             "GET",
             "api/search",
             200,
-            params={"q": query}
+            params=params
         )
         return success, response
 
@@ -160,6 +200,51 @@ class SMENetworkAPITester:
         )
         return success, response
 
+    def wait_for_view_count(self, video_id, initial_views, timeout=15):
+        """Poll the video until its view count passes initial_views.
+
+        View counts are eventually consistent: views are buffered and
+        flushed in batches, and the video cache keeps a view count for a
+        few seconds, so a read straight after PUT /view can miss it.
+        """
+        deadline = time.time() + timeout
+        views = initial_views
+        while time.time() < deadline:
+            response = requests.get(f"{self.base_url}/api/videos/{video_id}")
+            if response.status_code == 200:
+                views = response.json().get('view_count', 0)
+                if views > initial_views:
+                    break
+            time.sleep(0.5)
+        return views
+
+    def test_video_fields(self, name, videos):
+        """Test that serialized videos match the Video model field for field"""
+        self.tests_run += 1
+        print(f"\n🔍 Testing {name}...")
+        
+        problems = []
+        for video in videos:
+            if set(video) != VIDEO_FIELDS:
+                problems.append(f"{video.get('id')}: fields differ by {sorted(set(video) ^ VIDEO_FIELDS)}")
+                continue
+            try:
+                datetime.fromisoformat(video['created_at'])
+            except (TypeError, ValueError):
+                problems.append(f"{video['id']}: created_at {video['created_at']!r} is not ISO 8601")
+            if not isinstance(video['tags'], list) or not isinstance(video['view_count'], int):
+                problems.append(f"{video['id']}: tags/view_count have the wrong type")
+        
+        if problems:
+            print(f"❌ Failed - {len(problems)} videos do not match the model")
+            for problem in problems[:5]:
+                print(f"   {problem}")
+            return False
+        
+        self.tests_passed += 1
+        print(f"✅ Passed - {len(videos)} videos match the model")
+        return True
+
     def test_video_url_parsing(self, urls):
         """Test video URL parsing for different types"""
         results = []
@@ -220,9 +305,16 @@ def main():
     if not business_exists:
         tester.test_create_category("Business", "Business and entrepreneurship content")
     
-    # Create a unique test category
+    # Create a unique test category; the catalog version must move
+    _, version_before = tester.test_categories_version()
     test_category_name = f"Test Category {uuid.uuid4().hex[:8]}"
     tester.test_create_category(test_category_name, "Test category for API testing")
+    _, version_after = tester.test_categories_version()
+    if version_before is not None and version_after is not None:
+        if version_after > version_before:
+            print(f"✅ Categories version moved from {version_before} to {version_after}")
+        else:
+            print(f"❌ Categories version did not change: {version_before} -> {version_after}")
     
     # Test videos
     print("\n--- Testing Videos ---")
@@ -252,12 +344,17 @@ def main():
         
         # Test getting video by ID
         tester.test_get_video_by_id(video_id)
+        tester.test_batch_get_videos(tester.created_video_ids)
         
         # Test getting videos by category
-        tester.test_get_videos(category="Business")
+        success, videos = tester.test_get_videos(category="Business", fields="all")
+        if success:
+            tester.test_video_fields("Video List Matches Model", videos)
         
         # Test search functionality
-        tester.test_search_videos("Business")
+        success, results = tester.test_search_videos("Business", fields="all")
+        if success:
+            tester.test_video_fields("Search Results Match Model", results.get('videos', []))
         tester.test_search_videos("strategy")
         
         # Test featured content
@@ -267,14 +364,12 @@ def main():
         tester.test_increment_view_count(video_id)
         
         # Verify view count was incremented
-        success, updated_video = tester.test_get_video_by_id(video_id)
-        if success:
-            initial_views = video_response.get('view_count', 0)
-            updated_views = updated_video.get('view_count', 0)
-            if updated_views > initial_views:
-                print(f"✅ View count successfully incremented from {initial_views} to {updated_views}")
-            else:
-                print(f"❌ View count not incremented: {initial_views} -> {updated_views}")
+        initial_views = video_response.get('view_count', 0)
+        updated_views = tester.wait_for_view_count(video_id, initial_views)
+        if updated_views > initial_views:
+            print(f"✅ View count successfully incremented from {initial_views} to {updated_views}")
+        else:
+            print(f"❌ View count not incremented: {initial_views} -> {updated_views}")
     
     # Print results
     print("\n" + "=" * 50)
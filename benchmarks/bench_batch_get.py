@@ -0,0 +1,75 @@
+"""POST /api/videos/batch-get against N sequential GET /api/videos/{id}.
+
+Runs server.app in process (against MongoDB, or mongomock with
+--in-memory) over a seeded catalog. For each batch size, fetches the
+same random ids both ways, with a cold video cache (cleared before every
+round) and a warm one, and reports the median time per round.
+
+Usage: python benchmarks/bench_batch_get.py --videos 10000 --sizes 10,50,200 --rounds 20
+       python benchmarks/bench_batch_get.py --in-memory --videos 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from catalog import seed
+from common import configure_database, percentile
+
+async def sequential(client: httpx.AsyncClient, ids):
+    for video_id in ids:
+        response = await client.get(f'/api/videos/{video_id}')
+        response.raise_for_status()
+
+async def batched(client: httpx.AsyncClient, ids):
+    response = await client.post('/api/videos/batch-get', json={'ids': ids})
+    response.raise_for_status()
+    assert response.json()['found'] == len(ids)
+
+async def time_rounds(client, fetch, rounds, rng, all_ids, size, clear):
+    samples = []
+    for _ in range(rounds):
+        ids = rng.sample(all_ids, size)
+        if clear is not None:
+            clear()
+        else:
+            await fetch(client, ids)  # warm the cache with this round's ids
+        start = time.perf_counter()
+        await fetch(client, ids)
+        samples.append(time.perf_counter() - start)
+    return percentile(samples, 50) * 1000
+
+async def run(args):
+    import server
+
+    all_ids = await seed(args.videos)
+    await server.startup_database()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url='http://bench', timeout=60)
+    print(f"{'ids':>5} {'cache':>5} {'sequential':>12} {'batch-get':>12} {'speedup':>8}")
+    try:
+        for size in (int(value) for value in args.sizes.split(',')):
+            for label, clear in (('cold', server.video_cache.clear), ('warm', None)):
+                one_by_one = await time_rounds(client, sequential, args.rounds, random.Random(size), all_ids, size, clear)
+                batch = await time_rounds(client, batched, args.rounds, random.Random(size), all_ids, size, clear)
+                print(f"{size:>5} {label:>5} {one_by_one:>10.2f}ms {batch:>10.2f}ms {one_by_one / batch:>7.1f}x")
+    finally:
+        await client.aclose()
+        await server.shutdown_database()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--in-memory', action='store_true')
+    parser.add_argument('--videos', type=int, default=10000)
+    parser.add_argument('--sizes', default='10,50,200')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    configure_database(args.mongo_url, args.db_name, args.in_memory)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
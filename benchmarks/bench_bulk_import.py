@@ -0,0 +1,59 @@
+"""Throughput of POST /api/videos/bulk versus one POST /api/videos per row.
+
+Streams --rows synthetic NDJSON records (100k by default) through the bulk
+endpoint, then times --single-rows individual creates and extrapolates.
+
+Usage: python benchmarks/bench_bulk_import.py --base-url http://localhost:8001 --rows 100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+import requests
+
+from catalog import synthetic_video
+from common import DEFAULT_BASE_URL
+
+FIELDS = ('title', 'description', 'url', 'thumbnail', 'category', 'tags', 'is_premium', 'is_live')
+
+def records(count: int):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    for n in range(count):
+        video = synthetic_video(rng, now, n)
+        yield {field: video[field] for field in FIELDS}
+
+def ndjson_body(count: int):
+    for record in records(count):
+        yield (json.dumps(record) + '\n').encode()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--single-rows', type=int, default=500)
+    args = parser.parse_args()
+    base_url = args.base_url.rstrip('/')
+
+    start = time.perf_counter()
+    response = requests.post(f"{base_url}/api/videos/bulk", data=ndjson_body(args.rows),
+                             headers={'Content-Type': 'application/x-ndjson'})
+    response.raise_for_status()
+    bulk_elapsed = time.perf_counter() - start
+    report = response.json()
+    print(f"bulk:   {args.rows} rows in {bulk_elapsed:.1f}s ({args.rows / bulk_elapsed:.0f} rows/s), "
+          f"created={report['created']} invalid={report['invalid']} failed={report['failed']}")
+
+    session = requests.Session()
+    start = time.perf_counter()
+    for record in records(args.single_rows):
+        session.post(f"{base_url}/api/videos", json=record).raise_for_status()
+    single_elapsed = time.perf_counter() - start
+    rate = args.single_rows / single_elapsed
+    print(f"single: {args.single_rows} rows in {single_elapsed:.1f}s ({rate:.0f} rows/s), "
+          f"~{args.rows / rate:.0f}s projected for {args.rows} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Write-to-event latency of the change feed.
+
+Starts a ChangeFeed, then writes straight to the collections (the way an
+admin or another service would) and measures how long each write takes
+to reach a listener: inserts as video_created, title edits as
+video_updated and view counter style $inc writes as view_delta.
+
+Against a replica set the feed uses a change stream; against a standalone
+server or --in-memory (mongomock) it polls, and latency is dominated by
+CHANGE_FEED_POLL_INTERVAL. For a local replica set see change_feed.py.
+
+Usage: python benchmarks/bench_change_feed.py --mongo-url mongodb://localhost:27017/?replicaSet=rs0 \
+           --writes 200
+       python benchmarks/bench_change_feed.py --in-memory --writes 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from common import configure_database, print_row, summarize
+
+async def measure(args):
+    from change_feed import VIDEO_CREATED, VIDEO_UPDATED, VIEW_DELTA, ChangeFeed
+    from database import videos_collection
+
+    feed = ChangeFeed(name='bench')
+    pending = {}
+
+    def listener(key_of):
+        async def on_event(event):
+            arrived = time.perf_counter()
+            for video_id in event.ids:
+                written = pending.pop((key_of, video_id), None)
+                if written is not None:
+                    samples[key_of].append(arrived - written)
+        return on_event
+
+    samples = {VIDEO_CREATED: [], VIDEO_UPDATED: [], VIEW_DELTA: []}
+    for kind in samples:
+        feed.subscribe(kind, listener(kind))
+    await videos_collection.delete_many({'bench_change_feed': True})
+    await feed.start()
+    # Let polling take its first snapshot
+    await asyncio.sleep(0.5)
+
+    try:
+        for _ in range(args.writes):
+            video_id = str(uuid.uuid4())
+            now = datetime.utcnow()
+            pending[(VIDEO_CREATED, video_id)] = time.perf_counter()
+            await videos_collection.insert_one({
+                'id': video_id, 'title': 'Change feed benchmark', 'category': 'Business', 'tags': [],
+                'is_premium': False, 'view_count': 0, 'created_at': now, 'updated_at': now,
+                'bench_change_feed': True,
+            })
+            await asyncio.sleep(args.gap)
+            pending[(VIDEO_UPDATED, video_id)] = time.perf_counter()
+            await videos_collection.update_one(
+                {'id': video_id}, {'$set': {'title': 'Edited', 'updated_at': datetime.utcnow()}}
+            )
+            await asyncio.sleep(args.gap)
+            pending[(VIEW_DELTA, video_id)] = time.perf_counter()
+            await videos_collection.update_one(
+                {'id': video_id},
+                {'$inc': {'view_count': 1}, '$set': {'view_count_delta': 1, 'viewed_at': datetime.utcnow()}}
+            )
+            await asyncio.sleep(args.gap)
+        deadline = time.perf_counter() + args.timeout
+        while pending and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+    finally:
+        mode = feed.mode
+        await feed.stop()
+        await videos_collection.delete_many({'bench_change_feed': True})
+    return mode, samples, len(pending)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--in-memory', action='store_true')
+    parser.add_argument('--writes', type=int, default=100, help='videos inserted, edited and viewed')
+    parser.add_argument('--gap', type=float, default=0.01, help='seconds between writes')
+    parser.add_argument('--timeout', type=float, default=10.0, help='seconds to wait for the last events')
+    args = parser.parse_args()
+
+    configure_database(args.mongo_url, args.db_name, args.in_memory)
+
+    mode, samples, missed = asyncio.run(measure(args))
+    print(f"mode: {mode}")
+    for kind, latencies in samples.items():
+        print_row(kind, summarize(latencies))
+    if missed:
+        print(f"{missed} writes produced no event within {args.timeout}s")
+
+if __name__ == "__main__":
+    main()
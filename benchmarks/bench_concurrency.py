@@ -0,0 +1,49 @@
+"""Measure how API throughput scales with client concurrency.
+
+Usage: python benchmarks/bench_concurrency.py --base-url http://localhost:8001 \
+           --path /api/videos --levels 1,2,4,8,16,32,64 --requests 500
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from common import DEFAULT_BASE_URL, print_row, summarize
+
+_local = threading.local()
+
+def _session() -> requests.Session:
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
+def _timed_get(url: str) -> float:
+    start = time.perf_counter()
+    response = _session().get(url)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+def run_level(url: str, concurrency: int, total_requests: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        samples = list(pool.map(lambda _: _timed_get(url), range(total_requests)))
+        elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--path', default='/api/videos')
+    parser.add_argument('--levels', default='1,2,4,8,16,32,64')
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    url = args.base_url.rstrip('/') + args.path
+    print(f"Concurrency benchmark against {url}")
+    for level in [int(value) for value in args.levels.split(',')]:
+        print_row(f"concurrency={level}", run_level(url, level, args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Throughput and server memory of GET /api/videos/export.
+
+Seeds --videos synthetic videos (1M by default; skip with --no-seed to
+reuse a seeded database), starts backend/run.py with one worker against
+that database and streams the export, plain and gzip-encoded, reading it
+as fast as the client can. Reports documents/s, MB/s on the wire and the
+server's peak RSS, sampled from /proc while the export runs, next to its
+RSS before the export started. Linux only.
+
+Usage: python benchmarks/bench_export.py --mongo-url mongodb://localhost:27017 --videos 1000000
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+import requests
+
+from bench_workers import wait_ready
+from catalog import seed
+from common import BACKEND_DIR, configure_database
+
+def rss_mb(pid: int) -> float:
+    with open(f'/proc/{pid}/status') as handle:
+        for line in handle:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def prepare(args) -> int:
+    """Seed unless --no-seed; returns how many videos the benchmark database holds"""
+    from database import close_client, videos_collection
+
+    if not args.no_seed:
+        await seed(args.videos, batch_size=10000, progress=True)
+    count = await videos_collection.count_documents({})
+    close_client()
+    return count
+
+def stream_export(base_url: str, pid: int, encoding: str) -> dict:
+    peak = rss_mb(pid)
+    baseline = peak
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, rss_mb(pid))
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    lines = 0
+    wire_bytes = 0
+    decoder = zlib.decompressobj(31) if encoding == 'gzip' else None
+    start = time.perf_counter()
+    with requests.get(f"{base_url}/api/videos/export", headers={'Accept-Encoding': encoding},
+                      stream=True, timeout=60) as response:
+        response.raise_for_status()
+        # Raw reads keep the bytes as sent, so wire_bytes is the transferred size
+        for chunk in response.raw.stream(1 << 16, decode_content=False):
+            wire_bytes += len(chunk)
+            lines += (decoder.decompress(chunk) if decoder else chunk).count(b'\n')
+        elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    return {
+        'docs_per_s': lines / elapsed,
+        'mb_per_s': wire_bytes / elapsed / 1e6,
+        'wire_mb': wire_bytes / 1e6,
+        'seconds': elapsed,
+        'documents': lines,
+        'rss_before_mb': baseline,
+        'rss_peak_mb': peak,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--videos', type=int, default=1000000)
+    parser.add_argument('--no-seed', action='store_true')
+    parser.add_argument('--port', type=int, default=8012)
+    parser.add_argument('--ready-timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    configure_database(args.mongo_url, args.db_name)
+    expected = asyncio.run(prepare(args))
+
+    # The server inherits MONGO_URL and DB_NAME, so it exports the catalog seeded above
+    env = dict(os.environ, WEB_CONCURRENCY='1', SUGGEST_INDEX_ENABLED='false', YOUTUBE_API_KEY='')
+    base_url = f"http://127.0.0.1:{args.port}"
+    process = subprocess.Popen(
+        [sys.executable, 'run.py', '--workers', '1', '--host', '127.0.0.1', '--port', str(args.port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(base_url, process, args.ready_timeout)
+        for encoding in ('identity', 'gzip'):
+            result = stream_export(base_url, process.pid, encoding)
+            if result['documents'] != expected:
+                raise SystemExit(f"{encoding} export returned {result['documents']} documents, "
+                                 f"but {args.db_name} holds {expected}; the server is on another database")
+            print(f"{encoding:<9} " + "  ".join(f"{key}={value:.1f}" for key, value in result.items()))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare the per-category featured loop with the single aggregation.
+
+Seeds a scratch database with a growing number of categories and times both
+ways of building the /api/featured payload.
+
+Usage: python benchmarks/bench_featured.py --mongo-url mongodb://localhost:27017 \
+           --categories 5,20,50,100,200 --videos-per-category 30
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from common import print_row, summarize, time_calls
+from featured import FEATURED_VIDEOS_PER_CATEGORY, featured_pipeline
+
+def seed(db, category_count: int, videos_per_category: int):
+    db.videos.drop()
+    db.categories.drop()
+    now = datetime.utcnow()
+    db.categories.insert_many([
+        {'id': str(uuid.uuid4()), 'name': f'Category {c}', 'description': '', 'created_at': now}
+        for c in range(category_count)
+    ])
+    db.videos.insert_many([
+        {
+            'id': str(uuid.uuid4()),
+            'title': f'Video {c}-{v}',
+            'description': 'Benchmark video',
+            'url': 'https://example.com/video.mp4',
+            'thumbnail': 'https://via.placeholder.com/300x200',
+            'category': f'Category {c}',
+            'tags': [],
+            'is_premium': v % 3 == 0,
+            'is_live': False,
+            'video_type': 'direct',
+            'created_at': now - timedelta(minutes=v),
+            'view_count': 0,
+        }
+        for c in range(category_count) for v in range(videos_per_category)
+    ])
+    db.videos.create_index([('category', 1), ('created_at', -1)])
+    db.videos.create_index([('is_premium', 1), ('created_at', -1)])
+
+def per_category_loop(db):
+    featured = []
+    for category in db.categories.find():
+        videos = list(db.videos.find({'category': category['name']}, {'_id': 0})
+                      .limit(FEATURED_VIDEOS_PER_CATEGORY).sort('created_at', -1))
+        if videos:
+            featured.append({'category': category['name'], 'videos': videos})
+    hero = db.videos.find_one({'is_premium': False}, {'_id': 0}, sort=[('created_at', -1)])
+    return {'hero_video': hero, 'categories': featured}
+
+def single_aggregation(db):
+    return list(db.categories.aggregate(featured_pipeline()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--categories', default='5,20,50,100,200')
+    parser.add_argument('--videos-per-category', type=int, default=30)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_url)[args.db_name]
+    for count in [int(value) for value in args.categories.split(',')]:
+        seed(db, count, args.videos_per_category)
+        print_row(f"loop categories={count}",
+                  summarize(time_calls(lambda: per_category_loop(db), args.iterations)))
+        print_row(f"aggregate categories={count}",
+                  summarize(time_calls(lambda: single_aggregation(db), args.iterations)))
+    db.client.drop_database(args.db_name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Per-request cost of the Prometheus instrumentation.
+
+Runs in process, no server or database needed. Times a FastAPI router
+with the API's path templates and trivial endpoints, with and without
+MetricsMiddleware, and the MongoDB command listener's started/succeeded
+pair, then reports the added microseconds per request and per command.
+
+Usage: python benchmarks/bench_metrics_overhead.py --iterations 50000
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from common import percentile
+
+import metrics
+
+PATHS = ['/api/videos', '/api/videos/abc123', '/api/search', '/api/featured', '/api/videos/abc123/view']
+
+def build_router() -> APIRouter:
+    router = APIRouter()
+
+    async def endpoint():
+        return Response(b'{}', media_type='application/json')
+
+    for path in ('/api/videos', '/api/videos/bulk', '/api/videos/{video_id}', '/api/search',
+                 '/api/search/suggest', '/api/categories', '/api/featured'):
+        router.add_api_route(path, endpoint, methods=['GET'])
+    router.add_api_route('/api/videos/{video_id}/view', endpoint, methods=['PUT'])
+    return router
+
+async def _receive():
+    return {'type': 'http.request', 'body': b''}
+
+async def _send(message):
+    pass
+
+def _scope(path: str) -> dict:
+    method = 'PUT' if path.endswith('/view') else 'GET'
+    return {'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': b'', 'headers': []}
+
+async def time_asgi(handler, iterations: int):
+    scopes = [_scope(PATHS[n % len(PATHS)]) for n in range(iterations)]
+    samples = []
+    for scope in scopes:
+        start = time.perf_counter()
+        await handler(dict(scope), _receive, _send)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def time_listener(iterations: int):
+    listener = metrics.MongoCommandMetrics()
+    samples = []
+    for n in range(iterations):
+        started = SimpleNamespace(command_name='find', command={'find': 'videos'}, connection_id=('db', 27017),
+                                  request_id=n, database_name='sme_network')
+        succeeded = SimpleNamespace(command_name='find', connection_id=('db', 27017), request_id=n, duration_micros=350)
+        start = time.perf_counter()
+        listener.started(started)
+        listener.succeeded(succeeded)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def report(label: str, samples):
+    print(f"{label:<28} mean={sum(samples) / len(samples) * 1e6:.2f}us  "
+          f"p50={percentile(samples, 50) * 1e6:.2f}us  p99={percentile(samples, 99) * 1e6:.2f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50000)
+    args = parser.parse_args()
+
+    if not metrics.METRICS_ENABLED:
+        raise SystemExit("prometheus_client is not installed or METRICS_ENABLED=false")
+
+    router = build_router()
+    instrumented = metrics.MetricsMiddleware(router)
+    asyncio.run(time_asgi(instrumented, 2000))  # create label children before timing
+    bare = asyncio.run(time_asgi(router, args.iterations))
+    timed = asyncio.run(time_asgi(instrumented, args.iterations))
+    report('router only', bare)
+    report('router + MetricsMiddleware', timed)
+    overhead = (sum(timed) - sum(bare)) / args.iterations
+    print(f"HTTP instrumentation overhead: {overhead * 1e6:.2f}us per request")
+    report('Mongo listener per command', time_listener(args.iterations))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Offset (skip) vs keyset (cursor) paging through a large collection.
+
+Seeds --videos documents (1M by default), then times fetching a page at
+increasing depths with both strategies.
+
+Usage: python benchmarks/bench_pagination.py --mongo-url mongodb://localhost:27017 --videos 1000000
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from common import print_row, summarize, time_calls
+from pagination import VIDEO_SORT, keyset_filter
+
+def seed(db, count: int, batch_size: int = 10000):
+    db.videos.drop()
+    now = datetime.utcnow()
+    for start in range(0, count, batch_size):
+        db.videos.insert_many([
+            {
+                'id': str(uuid.uuid4()),
+                'title': f'Video {n}',
+                'category': 'Business',
+                # Several videos per millisecond so the id tiebreaker matters
+                'created_at': now - timedelta(milliseconds=n // 4),
+                'view_count': 0,
+            }
+            for n in range(start, min(count, start + batch_size))
+        ])
+    db.videos.create_index(VIDEO_SORT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--videos', type=int, default=1000000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--depths', default='0,1000,10000,100000,500000,990000')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_url)[args.db_name]
+    print(f"Seeding {args.videos} videos...")
+    seed(db, args.videos)
+
+    for depth in [int(value) for value in args.depths.split(',')]:
+        # The cursor a client would hold after paging to this depth
+        anchor = None
+        if depth:
+            anchor = db.videos.find({}, {'_id': 0}).sort(VIDEO_SORT).skip(depth - 1).limit(1).next()
+
+        def offset_page():
+            return list(db.videos.find({}, {'_id': 0}).sort(VIDEO_SORT).skip(depth).limit(args.page_size))
+
+        def keyset_page():
+            query = keyset_filter(anchor, VIDEO_SORT) if anchor else {}
+            return list(db.videos.find(query, {'_id': 0}).sort(VIDEO_SORT).limit(args.page_size))
+
+        assert offset_page() == keyset_page()
+        print_row(f"skip depth={depth}", summarize(time_calls(offset_page, args.iterations)))
+        print_row(f"cursor depth={depth}", summarize(time_calls(keyset_page, args.iterations)))
+    db.client.drop_database(args.db_name)
+
+if __name__ == "__main__":
+    main()
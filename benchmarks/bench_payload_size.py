@@ -0,0 +1,106 @@
+"""Payload size of list endpoints with the card fieldset vs every field.
+
+Runs against a running server, or with --in-memory against server.app in
+process over a freshly seeded mongomock catalog (no database needed;
+search uses the regex mode). mongomock cannot run the /api/featured
+pipeline, so in memory the featured row is measured on a snapshot payload
+built from the same synthetic videos and encoded as FeaturedSnapshot
+encodes it.
+
+Usage: python benchmarks/bench_payload_size.py --base-url http://localhost:8001
+       python benchmarks/bench_payload_size.py --in-memory --videos 500
+"""
+import argparse
+import asyncio
+import gzip
+import random
+from datetime import datetime
+
+import httpx
+
+from catalog import CATEGORIES, seed, synthetic_video
+from common import DEFAULT_BASE_URL, configure_database
+
+ENDPOINTS = (
+    ('/api/featured', {}),
+    ('/api/videos', {'limit': 100}),
+    ('/api/search', {'q': 'business', 'per_page': 100}),
+)
+# Endpoints mongomock cannot serve; measured on a synthetic payload instead
+IN_MEMORY_UNSUPPORTED = {'/api/featured'}
+
+async def sizes(client: httpx.AsyncClient, path: str, params) -> tuple:
+    response = await client.get(path, params=params)
+    response.raise_for_status()
+    return len(response.content), len(gzip.compress(response.content))
+
+def featured_sizes(count: int) -> tuple:
+    """Encoded size of a synthetic featured snapshot with whole row videos vs card fields"""
+    from fastapi.encoders import jsonable_encoder
+
+    from featured import FEATURED_VIDEOS_PER_CATEGORY, _encode
+    from serialization import VIDEO_CARD_FIELDS
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    videos = [synthetic_video(rng, now, n) for n in range(count)]  # newest first
+    hero = next(video for video in videos if not video['is_premium'])
+
+    def encoded(row_fields) -> bytes:
+        rows = []
+        for name in CATEGORIES:
+            latest = [video for video in videos if video['category'] == name][:FEATURED_VIDEOS_PER_CATEGORY]
+            if latest:
+                rows.append({'category': name, 'videos': [
+                    {field: value for field, value in video.items() if row_fields is None or field in row_fields}
+                    for video in latest
+                ]})
+        return _encode(jsonable_encoder({'hero_video': hero, 'categories': rows}))
+
+    full, card = encoded(None), encoded(VIDEO_CARD_FIELDS)
+    return len(full), len(gzip.compress(full)), len(card), len(gzip.compress(card))
+
+def print_sizes(label: str, full: int, full_gz: int, card: int, card_gz: int):
+    print(f"{label:<16} {full:>12} {card:>12} {1 - card / full:>7.0%} {full_gz:>10} {card_gz:>10}")
+
+async def measure(client: httpx.AsyncClient, in_memory: bool, videos: int = 0):
+    print(f"{'endpoint':<16} {'all fields':>12} {'card fields':>12} {'saved':>7} {'gzip all':>10} {'gzip card':>10}")
+    for path, params in ENDPOINTS:
+        if in_memory and path in IN_MEMORY_UNSUPPORTED:
+            full, full_gz, card, card_gz = featured_sizes(videos)
+            print_sizes(f'{path}*', full, full_gz, card, card_gz)
+            continue
+        if in_memory and path == '/api/search':
+            params = dict(params, mode='regex')
+        full, full_gz = await sizes(client, path, dict(params, fields='all'))
+        card, card_gz = await sizes(client, path, params)
+        print_sizes(path, full, full_gz, card, card_gz)
+    if in_memory:
+        print('* synthetic snapshot payload, not an HTTP response')
+
+async def run(args):
+    if not args.in_memory:
+        async with httpx.AsyncClient(base_url=args.base_url.rstrip('/'), timeout=30) as client:
+            await measure(client, False)
+        return
+
+    import server
+
+    await seed(args.videos)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=30) as client:
+        await measure(client, True, args.videos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--in-memory', action='store_true')
+    parser.add_argument('--videos', type=int, default=500, help='catalog size seeded for --in-memory')
+    args = parser.parse_args()
+
+    if args.in_memory:
+        configure_database('mongodb://localhost:27017', 'sme_network_bench', in_memory=True)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Latency percentiles for regex vs text-index search on a synthetic catalog.
+
+Usage: python benchmarks/bench_search.py --mongo-url mongodb://localhost:27017 --videos 100000
+"""
+import argparse
+import random
+from datetime import datetime
+
+from pymongo import MongoClient
+
+from catalog import WORDS, synthetic_video
+from common import print_row, summarize, time_calls
+from search import TEXT_INDEX_LANGUAGE, TEXT_INDEX_NAME, TEXT_INDEX_WEIGHTS, regex_query, text_query
+
+def seed(db, count: int, batch_size: int = 5000):
+    db.videos.drop()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    for start in range(0, count, batch_size):
+        db.videos.insert_many([synthetic_video(rng, now, n) for n in range(start, min(count, start + batch_size))])
+    db.videos.create_index(
+        [(field, 'text') for field in TEXT_INDEX_WEIGHTS],
+        name=TEXT_INDEX_NAME,
+        weights=TEXT_INDEX_WEIGHTS,
+        default_language=TEXT_INDEX_LANGUAGE,
+    )
+    db.videos.create_index([('created_at', -1)])
+
+def regex_search(db, q: str, per_page: int):
+    query = regex_query(q)
+    list(db.videos.find(query, {'_id': 0}).sort('created_at', -1).limit(per_page))
+    db.videos.count_documents(query)
+
+def text_search(db, q: str, per_page: int):
+    query = text_query(q)
+    list(db.videos.find(query, {'_id': 0, 'score': {'$meta': 'textScore'}})
+         .sort([('score', {'$meta': 'textScore'}), ('created_at', -1)]).limit(per_page))
+    db.videos.count_documents(query)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--videos', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=20)
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_url)[args.db_name]
+    print(f"Seeding {args.videos} videos...")
+    seed(db, args.videos)
+
+    rng = random.Random(7)
+    for label, search in (('regex', regex_search), ('text', text_search)):
+        samples = time_calls(lambda: search(db, rng.choice(WORDS), args.per_page), args.iterations)
+        print_row(f"{label} videos={args.videos}", summarize(samples))
+    db.client.drop_database(args.db_name)
+
+if __name__ == "__main__":
+    main()
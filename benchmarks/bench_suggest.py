@@ -0,0 +1,46 @@
+"""Memory footprint and latency of the in-process suggest index.
+
+Builds the index from synthetic videos (no database needed), reports the
+memory it holds per 100k videos and prefix-lookup latency percentiles.
+
+Usage: python benchmarks/bench_suggest.py --videos 100000
+"""
+import argparse
+import random
+import tracemalloc
+from datetime import datetime
+
+from catalog import WORDS, synthetic_video
+from common import print_row, summarize, time_calls
+from suggest import SuggestIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--videos', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    docs = [synthetic_video(rng, now, n) for n in range(args.videos)]
+    for doc in docs:
+        # Unique words per title so the term dictionary grows like a real catalog
+        doc['title'] += f" episode{doc['id'][:6]}"
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    index = SuggestIndex()
+    index.add_many(docs)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    print(f"Indexed {len(index)} videos, {len(index.terms)} terms")
+    print(f"Index memory: {used / 1024 / 1024:.1f} MiB total, "
+          f"{used / len(index) * 100000 / 1024 / 1024:.1f} MiB per 100k videos")
+
+    prefixes = [word[:length] for word in WORDS for length in (1, 2, 3, 5)] + ['episode', 'ep', 'business str']
+    samples = time_calls(lambda: index.suggest(rng.choice(prefixes)), args.iterations)
+    print_row('suggest', summarize(samples))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cost of maintaining and serving the trending ranking as the catalog grows.
+
+Runs in process, no database needed. For each catalog size, replays
+--views Zipf-distributed views into trending.TrendingScores, then times
+serving the top K after a change (the incremental ranking) against
+sorting every tracked score (what a ranking without the top-K structure
+would do per request).
+
+Usage: python benchmarks/bench_trending.py --sizes 10000,100000,1000000 --views 200000
+"""
+import argparse
+import heapq
+import random
+import time
+
+from common import percentile
+
+from trending import TrendingScores
+
+def zipf_ids(size: int, count: int, rng: random.Random):
+    weights = [1.0 / (rank + 1) for rank in range(size)]
+    return rng.choices(range(size), weights=weights, k=count)
+
+def run(size: int, args) -> dict:
+    rng = random.Random(42)
+    scores = TrendingScores(k=args.k, max_tracked=size)
+    # Every video gets at least one view so the full catalog is tracked
+    for video in range(size):
+        scores.record(f'v{video}', 1)
+    views = [f'v{video}' for video in zipf_ids(size, args.views, rng)]
+
+    start = time.perf_counter()
+    for video_id in views:
+        scores.record(video_id, 1)
+    record_us = (time.perf_counter() - start) / len(views) * 1e6
+
+    serve, full_sort = [], []
+    for video_id in views[:args.requests]:
+        scores.record(video_id, 1)  # invalidates the cached ranking, as a live view would
+        start = time.perf_counter()
+        scores.top.ranked()
+        serve.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        heapq.nlargest(args.k, scores.scores.items(), key=lambda item: item[1])
+        full_sort.append(time.perf_counter() - start)
+    return {
+        'record_us': record_us,
+        'serve_p50_us': percentile(serve, 50) * 1e6,
+        'rescan_p50_us': percentile(full_sort, 50) * 1e6,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--views', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=50, help='rankings served per size')
+    parser.add_argument('--k', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'videos':>10} {'record/view':>12} {'serve top-K':>12} {'rescan all':>12}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        result = run(size, args)
+        print(f"{size:>10} {result['record_us']:>10.2f}us {result['serve_p50_us']:>10.1f}us "
+              f"{result['rescan_p50_us']:>10.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Microbenchmark: legacy two-regex extract_video_info vs the provider registry.
+
+Usage: python benchmarks/bench_url_classifier.py --urls 1000000
+"""
+import argparse
+import random
+import re
+
+from common import time_calls
+from video_urls import classify_url, classify_urls
+
+def legacy_extract_video_info(url: str):
+    """The original implementation, kept here for comparison"""
+    youtube_pattern = r'(?:youtube\.com/watch\?v=|youtu\.be/)([^&\n?#]+)'
+    rumble_pattern = r'rumble\.com/(?:embed/)?([^/?]+)'
+
+    youtube_match = re.search(youtube_pattern, url)
+    rumble_match = re.search(rumble_pattern, url)
+
+    if youtube_match:
+        return {'type': 'youtube', 'video_id': youtube_match.group(1),
+                'embed_url': f'https://www.youtube.com/embed/{youtube_match.group(1)}'}
+    elif rumble_match:
+        return {'type': 'rumble', 'video_id': rumble_match.group(1),
+                'embed_url': f'https://rumble.com/embed/{rumble_match.group(1)}/'}
+    return {'type': 'direct', 'video_id': None, 'embed_url': url}
+
+def mixed_urls(count: int):
+    rng = random.Random(42)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'
+    templates = (
+        'https://www.youtube.com/watch?v={}',
+        'https://youtu.be/{}',
+        'https://www.youtube.com/watch?v={}&t=42s',
+        'https://rumble.com/v{}-small-business-tips.html',
+        'https://rumble.com/embed/v{}/?pub=4',
+        'https://cdn.example.com/videos/{}.mp4',
+        'https://media.smenetwork.example/stream/{}/index.m3u8',
+    )
+    return [rng.choice(templates).format(''.join(rng.choice(alphabet) for _ in range(11)))
+            for _ in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--urls', type=int, default=1000000)
+    args = parser.parse_args()
+
+    urls = mixed_urls(args.urls)
+    mismatches = sum(1 for url in urls[:10000] if legacy_extract_video_info(url) != classify_url(url))
+    print(f"Checked 10000 URLs against the legacy classifier: {mismatches} mismatches")
+
+    for label, run in (
+        ('legacy re.search x2', lambda: [legacy_extract_video_info(url) for url in urls]),
+        ('provider registry', lambda: [classify_url(url) for url in urls]),
+        ('classify_urls batch', lambda: classify_urls(urls)),
+    ):
+        elapsed = time_calls(run, 1)[0]
+        print(f"{label:<22} {elapsed:.2f}s  {len(urls) / elapsed / 1e6:.2f}M urls/s  "
+              f"{elapsed / len(urls) * 1e9:.0f} ns/url")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Zipf-distributed load on GET /api/videos/{id} to measure the video cache.
+
+Collects up to --ids video ids from the API, then requests them with a
+Zipfian popularity (rank k is requested in proportion to 1/k^s), the
+shape of real traffic where a few trending videos get most views.
+Reports latency percentiles and the server's cache counters for the run.
+Run once with VIDEO_CACHE_ENABLED=false on the server for a baseline.
+
+Usage: python benchmarks/bench_video_cache.py --base-url http://localhost:8001 \
+           --ids 5000 --requests 20000 --zipf 1.1 --concurrency 32
+"""
+import argparse
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+
+from common import DEFAULT_BASE_URL, print_row, summarize
+
+_local = threading.local()
+
+def _session() -> requests.Session:
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
+def _timed_get(url: str) -> float:
+    start = time.perf_counter()
+    _session().get(url).raise_for_status()
+    return time.perf_counter() - start
+
+def collect_ids(base_url: str, count: int) -> List[str]:
+    """Page through /api/videos with cursors until count ids are collected"""
+    ids = []
+    cursor = None
+    while len(ids) < count:
+        params = {'fields': 'id', 'limit': 100}
+        if cursor:
+            params['cursor'] = cursor
+        response = requests.get(f"{base_url}/api/videos", params=params)
+        response.raise_for_status()
+        ids.extend(video['id'] for video in response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    return ids[:count]
+
+def zipf_sample(ids: List[str], exponent: float, size: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    ranked = list(ids)
+    rng.shuffle(ranked)
+    cum_weights = list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, len(ranked) + 1)))
+    return rng.choices(ranked, cum_weights=cum_weights, k=size)
+
+def cache_stats(base_url: str):
+    return requests.get(f"{base_url}/api/cache/stats").json().get('videos')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--ids', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent s; higher is more skewed')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    ids = collect_ids(base_url, args.ids)
+    if not ids:
+        raise SystemExit("No videos found; import some first (see bench_bulk_import.py)")
+    urls = [f"{base_url}/api/videos/{video_id}" for video_id in zipf_sample(ids, args.zipf, args.requests, args.seed)]
+    distinct = len(set(urls))
+    print(f"{len(urls)} requests over {distinct} distinct of {len(ids)} videos (s={args.zipf})")
+
+    before = cache_stats(base_url)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        start = time.perf_counter()
+        samples = list(pool.map(_timed_get, urls))
+        elapsed = time.perf_counter() - start
+    after = cache_stats(base_url)
+
+    print_row(f"zipf s={args.zipf}", summarize(samples, elapsed))
+    if before is None or after is None:
+        print("Video cache disabled on the server")
+        return
+    delta = {key: after[key] - before[key] for key in after if key != 'entries'}
+    lookups = delta['hits'] + delta['misses']
+    print(f"cache: hit ratio {delta['hits'] / max(lookups, 1):.1%}, "
+          f"{delta['loads']} Mongo loads, {delta['evictions']} evictions, {after['entries']} entries")
+    print("  " + "  ".join(f"{key}={value}" for key, value in delta.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Load test for PUT /api/videos/{id}/view against a single hot video.
+
+Drives the endpoint at a target rate from a thread pool, then reports
+latency percentiles and how many MongoDB update operations the server
+issued per view (from serverStatus opcounters).
+
+Usage: python benchmarks/bench_views.py --base-url http://localhost:8001 \
+           --video-id <id> --rate 10000 --seconds 10
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from pymongo import MongoClient
+
+from common import DEFAULT_BASE_URL, print_row, summarize
+
+_local = threading.local()
+
+def _view(url: str) -> float:
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    start = time.perf_counter()
+    _local.session.put(url).raise_for_status()
+    return time.perf_counter() - start
+
+def update_opcount(client) -> int:
+    return client.admin.command('serverStatus')['opcounters']['update']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--video-id', required=True)
+    parser.add_argument('--rate', type=int, default=10000, help='target views per second')
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--settle', type=float, default=2.0, help='seconds to wait for the last flush')
+    args = parser.parse_args()
+
+    url = f"{args.base_url.rstrip('/')}/api/videos/{args.video_id}/view"
+    client = MongoClient(args.mongo_url)
+    updates_before = update_opcount(client)
+
+    total = args.rate * args.seconds
+    interval = 1.0 / args.rate
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        start = time.perf_counter()
+        for n in range(total):
+            # Open-loop pacing: submit on schedule regardless of response times
+            delay = start + n * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(_view, url))
+        samples = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+    time.sleep(args.settle)
+    updates = update_opcount(client) - updates_before
+    print_row(f"views rate={args.rate}/s", summarize(samples, elapsed))
+    print(f"Mongo update ops: {updates} for {total} views "
+          f"({total / max(updates, 1):.0f}x write reduction)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Throughput scaling of the multi-worker server from 1 to N processes.
+
+For each worker count, starts backend/run.py on a spare port against the
+configured MongoDB, waits for /api/ready, drives --path at a fixed client
+concurrency and stops the server with SIGTERM (exercising graceful drain).
+Prints RPS and speedup over one worker.
+
+Usage: python benchmarks/bench_workers.py --workers 1,2,4,8 --path /api/videos \
+           --concurrency 64 --requests 5000
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+from bench_concurrency import run_level
+from common import BACKEND_DIR, print_row
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/api/ready", timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+def run_workers(workers: int, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    process = subprocess.Popen(
+        [sys.executable, 'run.py', '--workers', str(workers), '--host', '127.0.0.1', '--port', str(args.port)],
+        cwd=BACKEND_DIR, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready_after = wait_ready(base_url, process, args.ready_timeout)
+        url = base_url + args.path
+        run_level(url, args.concurrency, min(args.requests, 200))  # warm caches and pools
+        summary = run_level(url, args.concurrency, args.requests)
+        summary['ready_s'] = ready_after
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=args.ready_timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, os.cpu_count() or 1)))
+    parser.add_argument('--path', default='/api/videos')
+    parser.add_argument('--port', type=int, default=8011)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--ready-timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    counts = sorted({int(value) for value in args.workers.split(',')})
+    print(f"Worker scaling on {args.path}, {os.cpu_count()} CPUs, concurrency {args.concurrency}")
+    baseline = None
+    for workers in counts:
+        summary = run_workers(workers, args)
+        baseline = baseline or summary['rps']
+        summary['speedup'] = summary['rps'] / baseline
+        print_row(f"workers={workers}", summary)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Synthetic video catalog shared by the benchmarks.
+
+Imports nothing from the backend at module level, so benchmarks can use
+it before configure_database() has pointed the backend at their database.
+"""
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from common import configured_db_name
+
+WORDS = ('business', 'marketing', 'finance', 'startup', 'growth', 'sales', 'leadership',
+         'strategy', 'funding', 'hiring', 'branding', 'ecommerce', 'accounting', 'pricing',
+         'negotiation', 'productivity', 'investing', 'retail', 'franchise', 'export')
+CATEGORIES = ('Business', 'Marketing', 'Finance', 'Technology', 'Lifestyle', 'Education')
+
+def synthetic_video(rng: random.Random, now: datetime, n: int):
+    title = ' '.join(rng.choice(WORDS) for _ in range(4)).title()
+    return {
+        'id': str(uuid.uuid4()),
+        'title': title,
+        'description': ' '.join(rng.choice(WORDS) for _ in range(40)),
+        'url': 'https://example.com/video.mp4',
+        'thumbnail': 'https://via.placeholder.com/300x200',
+        'category': rng.choice(CATEGORIES),
+        'tags': rng.sample(WORDS, 3),
+        'is_premium': rng.random() < 0.2,
+        'is_live': rng.random() < 0.05,
+        'video_type': 'direct',
+        'created_at': now - timedelta(seconds=n),
+        'view_count': 0,
+    }
+
+async def seed(count: int, batch_size: int = 5000, progress: bool = False) -> List[str]:
+    """Replace the catalog with count synthetic videos; returns their ids"""
+    configured_db_name()
+    from database import categories_collection, videos_collection
+
+    await videos_collection.delete_many({})
+    await categories_collection.delete_many({})
+    now = datetime.utcnow()
+    await categories_collection.insert_many([
+        {'id': str(uuid.uuid4()), 'name': name, 'description': f'{name} videos', 'created_at': now}
+        for name in CATEGORIES
+    ])
+    rng = random.Random(42)
+    ids = []
+    for start in range(0, count, batch_size):
+        docs = [synthetic_video(rng, now, n) for n in range(start, min(count, start + batch_size))]
+        await videos_collection.insert_many(docs)
+        ids.extend(doc['id'] for doc in docs)
+        if progress:
+            print(f"\rseeded {len(ids)}/{count}", end='', file=sys.stderr)
+    if progress:
+        print(file=sys.stderr)
+    return ids
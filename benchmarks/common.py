@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Make the backend modules importable from benchmark scripts
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_BASE_URL = os.environ.get('SME_BASE_URL', 'http://localhost:8001')
+
+def configure_database(mongo_url: str, db_name: str, in_memory: bool = False):
+    """Point the backend modules at the benchmark's database.
+
+    database.py reads MONGO_URL and DB_NAME when it is first imported, so
+    this must run before any backend module that imports it (search,
+    server, ...); benchmarks import those inside functions. Anything
+    imported earlier would still be bound to the default database, which
+    seeding would then wipe, so that is an error here.
+    """
+    if 'database' in sys.modules:
+        raise RuntimeError("the backend database module was imported before configure_database()")
+    os.environ['MONGO_URL'] = mongo_url
+    os.environ['DB_NAME'] = db_name
+    os.environ.setdefault('YOUTUBE_API_KEY', '')
+    if in_memory:
+        # Capped collections, tailable cursors and change streams are not available in mongomock
+        os.environ.setdefault('WORKER_BUS_ENABLED', 'false')
+        os.environ.setdefault('CHANGE_FEED_MODE', 'poll')
+        use_in_memory_database()
+
+def use_in_memory_database():
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("--in-memory needs mongomock-motor (pip install mongomock-motor)")
+    import database
+    database._client = AsyncMongoMockClient()
+    database._client_pid = os.getpid()
+
+def configured_db_name() -> str:
+    """DB_NAME set by configure_database(); refuses to run against an unconfigured database"""
+    import database
+
+    if 'DB_NAME' not in os.environ or database.DB_NAME != os.environ['DB_NAME']:
+        raise RuntimeError("call configure_database() before touching the benchmark database")
+    return database.DB_NAME
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(samples: List[float], elapsed: float = None) -> Dict[str, float]:
+    """Summarize latency samples (seconds) as milliseconds plus throughput"""
+    summary = {
+        'count': len(samples),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'max_ms': (max(samples) if samples else 0.0) * 1000,
+    }
+    if elapsed:
+        summary['rps'] = len(samples) / elapsed
+    return summary
+
+def time_calls(fn: Callable[[], object], iterations: int) -> List[float]:
+    """Call fn repeatedly and return per-call latencies in seconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def print_row(label: str, summary: Dict[str, float]):
+    parts = [f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+             for key, value in summary.items()]
+    print(f"{label:<28} " + "  ".join(parts))
@@ -0,0 +1,229 @@
+"""Reproducible load test of the main API read and write paths.
+
+Seeds a catalog of --videos synthetic videos over the standard
+categories, then drives each scenario at a fixed concurrency and
+reports p50/p95/p99 latency and RPS as JSON:
+
+    featured   GET /api/featured
+    search     GET /api/search?q=<word>
+    paging     GET /api/videos, following X-Next-Cursor up to --page-depth pages
+    view       PUT /api/videos/{id}/view
+
+Targets:
+    (default)    server.app in process against MongoDB at --mongo-url
+    --in-memory  server.app in process against mongomock-motor, no database
+                 needed. Good for spotting regressions in server.py code
+                 paths, but mongomock's query engine dominates read
+                 latency and grows with the catalog, so keep it small and
+                 compare only against in-memory baselines. Scenarios
+                 mongomock cannot run ($lookup pipelines, $text) are
+                 skipped or use the regex search mode.
+    --base-url   an already running server; --mongo-url/--db-name must
+                 point at its database so the catalog can be seeded
+
+Save a report with --output, then compare a later run with --baseline:
+any scenario whose p95 rises or whose RPS falls by more than --tolerance
+is reported and the exit status is 1. Baselines are machine specific;
+baselines/in-memory.json was recorded with the first command below and
+should be re-recorded on the machine that runs the comparison.
+
+Usage: python benchmarks/load_suite.py --in-memory --videos 500 --requests 1000 \
+           --concurrency 16 --output benchmarks/baselines/in-memory.json
+       python benchmarks/load_suite.py --in-memory --videos 500 --requests 1000 \
+           --concurrency 16 --baseline benchmarks/baselines/in-memory.json
+
+Requires httpx; --in-memory also requires mongomock-motor.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from catalog import WORDS, seed
+from common import configure_database, summarize
+
+SCENARIOS = ('featured', 'search', 'paging', 'view')
+# Scenarios mongomock cannot execute
+IN_MEMORY_UNSUPPORTED = {'featured'}
+# Metrics compared in regression mode and the direction that counts as worse
+REGRESSION_CHECKS = (('p95_ms', 1), ('rps', -1))
+
+class Scenario:
+    """Produces one request per call; paging keeps a cursor per worker"""
+
+    def __init__(self, name: str, ids: List[str], search_mode: Optional[str], page_depth: int):
+        self.name = name
+        self.ids = ids
+        self.search_mode = search_mode
+        self.page_depth = page_depth
+
+    def worker(self, seed: int) -> Callable[[httpx.AsyncClient], Any]:
+        rng = random.Random(seed)
+        state = {'cursor': None, 'depth': 0}
+
+        async def featured(client):
+            return await client.get('/api/featured')
+
+        async def search(client):
+            params = {'q': rng.choice(WORDS), 'per_page': 20}
+            if self.search_mode:
+                params['mode'] = self.search_mode
+            return await client.get('/api/search', params=params)
+
+        async def paging(client):
+            params = {'limit': 20}
+            if state['cursor']:
+                params['cursor'] = state['cursor']
+            response = await client.get('/api/videos', params=params)
+            state['depth'] += 1
+            state['cursor'] = response.headers.get('x-next-cursor')
+            if state['depth'] >= self.page_depth:
+                state['cursor'], state['depth'] = None, 0
+            return response
+
+        async def view(client):
+            return await client.put(f'/api/videos/{rng.choice(self.ids)}/view')
+
+        return {'featured': featured, 'search': search, 'paging': paging, 'view': view}[self.name]
+
+async def drive(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, requests: int):
+    """Run requests calls across concurrency workers; returns (latencies, errors, elapsed)"""
+    samples: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(seed: int):
+        nonlocal remaining, errors
+        call = scenario.worker(seed)
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await call(client)
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return samples, errors, time.perf_counter() - start
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int,
+                       requests: int, warmup: int) -> Dict[str, Any]:
+    if warmup:
+        await drive(client, scenario, concurrency, warmup)
+    samples, errors, elapsed = await drive(client, scenario, concurrency, requests)
+    summary = summarize(samples, elapsed)
+    summary['errors'] = errors
+    return summary
+
+async def run_suite(args) -> Dict[str, Any]:
+    if args.base_url:
+        ids = await seed(args.videos)
+        client = httpx.AsyncClient(base_url=args.base_url.rstrip('/'), timeout=30)
+        app_module = None
+    else:
+        import server as app_module
+        ids = await seed(args.videos)
+        await app_module.startup_database()
+        transport = httpx.ASGITransport(app=app_module.app)
+        client = httpx.AsyncClient(transport=transport, base_url='http://suite', timeout=30)
+
+    results = {}
+    try:
+        for name in args.scenarios.split(','):
+            if args.in_memory and name in IN_MEMORY_UNSUPPORTED:
+                print(f"{name}: skipped, not supported by the in-memory database", file=sys.stderr)
+                continue
+            scenario = Scenario(name, ids, 'regex' if args.in_memory else None, args.page_depth)
+            results[name] = await run_scenario(client, scenario, args.concurrency, args.requests, args.warmup)
+            print(f"{name}: " + "  ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                                           for key, value in results[name].items()), file=sys.stderr)
+    finally:
+        await client.aclose()
+        if app_module is not None:
+            await app_module.shutdown_database()
+
+    return {
+        'meta': {
+            'target': args.base_url or ('in-memory' if args.in_memory else args.mongo_url),
+            'videos': args.videos,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'timestamp': datetime.utcnow().isoformat(),
+        },
+        'results': results,
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describe every metric that is worse than the baseline by more than tolerance"""
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        for metric, direction in REGRESSION_CHECKS:
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            status = 'REGRESSION' if change * direction > tolerance else 'ok'
+            print(f"{name:<10} {metric:<7} {before:10.2f} -> {after:10.2f} ({change:+.1%}) {status}", file=sys.stderr)
+            if status != 'ok':
+                regressions.append(f"{name} {metric} {change:+.1%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017')
+    parser.add_argument('--db-name', default='sme_network_bench')
+    parser.add_argument('--in-memory', action='store_true')
+    parser.add_argument('--base-url')
+    parser.add_argument('--videos', type=int, default=10000)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=100, help='unmeasured requests per scenario')
+    parser.add_argument('--page-depth', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='compare against a previously saved report')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.in_memory and args.base_url:
+        parser.error("--in-memory runs the app in process; it cannot be combined with --base-url")
+    unknown = set(args.scenarios.split(',')) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    configure_database(args.mongo_url, args.db_name, args.in_memory)
+
+    report = asyncio.run(run_suite(args))
+    body = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(body + '\n')
+    else:
+        print(body)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        if regressions:
+            print("Regressions: " + ', '.join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
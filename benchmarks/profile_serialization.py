@@ -0,0 +1,70 @@
+"""CPU time per 100-item page: Pydantic model path vs the fast serialization path.
+
+The model path mirrors what the routes did before: build Video(**doc) per
+document, then let FastAPI validate and encode the list against
+response_model. The fast path fills defaults and encodes with orjson.
+No database is needed; documents are synthetic.
+
+Usage: python benchmarks/profile_serialization.py --page-size 100 --requests 2000
+"""
+import argparse
+import cProfile
+import copy
+import json
+import pstats
+import random
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from catalog import synthetic_video
+from serialization import apply_defaults, dumps
+from server import VIDEO_DEFAULTS, VIDEO_PROJECTION, Video
+
+def page_of_docs(page_size: int):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    fields = set(VIDEO_PROJECTION) - {'_id'}
+    return [{key: value for key, value in synthetic_video(rng, now, n).items() if key in fields}
+            for n in range(page_size)]
+
+def model_path(docs, adapter):
+    videos = [Video(**doc) for doc in docs]
+    # What FastAPI does with a response_model: validate, dump, then json.dumps
+    validated = adapter.validate_python(videos, from_attributes=True)
+    return json.dumps(jsonable_encoder(adapter.dump_python(validated, mode='json'))).encode()
+
+def fast_path(docs):
+    return dumps(apply_defaults(docs, VIDEO_DEFAULTS))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--profile', action='store_true', help='print the top functions of each path')
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[Video])
+    template = page_of_docs(args.page_size)
+    assert json.loads(model_path(copy.deepcopy(template), adapter)) == json.loads(fast_path(copy.deepcopy(template)))
+
+    for label, run in (('model path', lambda docs: model_path(docs, adapter)), ('fast path', fast_path)):
+        pages = [copy.deepcopy(template) for _ in range(args.requests)]
+        profiler = cProfile.Profile() if args.profile else None
+        start = time.process_time()
+        if profiler:
+            profiler.enable()
+        for docs in pages:
+            run(docs)
+        if profiler:
+            profiler.disable()
+        cpu = time.process_time() - start
+        print(f"{label:<12} {cpu / args.requests * 1000:.3f} ms CPU per {args.page_size}-item page")
+        if profiler:
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(8)
+
+if __name__ == "__main__":
+    main()
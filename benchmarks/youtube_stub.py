@@ -0,0 +1,52 @@
+"""Offline stand-in for the YouTube Data API videos.list endpoint.
+
+Returns synthetic metadata for any requested id. Failure injection and
+latency make it usable for exercising retries and timeouts.
+
+Usage:
+    STUB_FAIL_RATE=0.1 STUB_LATENCY_MS=50 uvicorn youtube_stub:app --port 8009
+    YOUTUBE_API_KEY=stub YOUTUBE_API_URL=http://localhost:8009/youtube/v3/videos uvicorn server:app
+"""
+import asyncio
+import os
+import random
+
+from fastapi import FastAPI, HTTPException, Query
+
+STUB_FAIL_RATE = float(os.environ.get('STUB_FAIL_RATE', 0))
+STUB_LATENCY_MS = float(os.environ.get('STUB_LATENCY_MS', 0))
+# Ids starting with this prefix are reported as unknown (absent from items)
+STUB_MISSING_PREFIX = os.environ.get('STUB_MISSING_PREFIX', 'missing')
+
+app = FastAPI(title="YouTube API stub")
+app.state.calls = 0
+app.state.ids_requested = 0
+
+def stub_item(video_id: str):
+    return {
+        'id': video_id,
+        'snippet': {
+            'title': f'Stub video {video_id}',
+            'description': f'Synthetic metadata for {video_id}',
+            'thumbnails': {'high': {'url': f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'}},
+        },
+        'contentDetails': {'duration': 'PT4M13S'},
+        'statistics': {'viewCount': str(sum(map(ord, video_id)))},
+    }
+
+@app.get("/youtube/v3/videos")
+async def videos_list(id: str = Query(...), part: str = '', key: str = ''):
+    app.state.calls += 1
+    if STUB_LATENCY_MS:
+        await asyncio.sleep(STUB_LATENCY_MS / 1000)
+    if random.random() < STUB_FAIL_RATE:
+        raise HTTPException(status_code=503, detail="Injected failure")
+    ids = [video_id for video_id in id.split(',') if video_id]
+    if len(ids) > 50:
+        raise HTTPException(status_code=400, detail="Too many ids")
+    app.state.ids_requested += len(ids)
+    return {'items': [stub_item(video_id) for video_id in ids if not video_id.startswith(STUB_MISSING_PREFIX)]}
+
+@app.get("/stats")
+async def stats():
+    return {'calls': app.state.calls, 'ids_requested': app.state.ids_requested}
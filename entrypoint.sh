@@ -4,25 +4,46 @@ set -e
 # Start the FastAPI backend
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
-echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
-BACKEND_PID=$!
+# Seconds to wait for the backend to report ready
+READY_TIMEOUT=${READY_TIMEOUT:-60}
 
-echo "Waiting for backend to start..."
-sleep 30
+echo "Starting FastAPI backend with ${WEB_CONCURRENCY:-one per CPU} workers"
+# run.py forks the uvicorn workers; each opens its own MongoDB client
+python3 run.py --host 0.0.0.0 --port 8001 &
+BACKEND_PID=$!
 
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
-fi
+echo "Waiting for backend to become ready..."
+waited=0
+until wget -q -O /dev/null http://127.0.0.1:8001/api/ready 2>/dev/null; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ "$waited" -ge "$READY_TIMEOUT" ]; then
+        echo "Backend not ready after ${READY_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 1
+    waited=$((waited + 1))
+done
+echo "Backend ready after ${waited}s"
 
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
-# Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+# Graceful drain: nginx stops taking new connections and finishes its
+# requests (SIGQUIT), then the backend finishes in-flight requests (SIGTERM)
+shutdown() {
+    echo "Draining..."
+    kill -QUIT $NGINX_PID 2>/dev/null || true
+    wait $NGINX_PID 2>/dev/null || true
+    kill -TERM $BACKEND_PID 2>/dev/null || true
+    wait $BACKEND_PID 2>/dev/null || true
+    exit 0
+}
+trap shutdown TERM INT
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
@@ -3,18 +3,53 @@ import './App.css';
 
 const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
 
+// Categories rarely change, so they are kept in localStorage and only
+// refetched when /api/categories/version moves
+const CATEGORIES_CACHE_KEY = 'sme:categories';
+
+const loadCategories = async () => {
+  const versionResponse = await fetch(`${API_BASE_URL}/api/categories/version`);
+  if (!versionResponse.ok) {
+    const response = await fetch(`${API_BASE_URL}/api/categories`);
+    return response.json();
+  }
+  const { version } = await versionResponse.json();
+
+  try {
+    const cached = JSON.parse(localStorage.getItem(CATEGORIES_CACHE_KEY));
+    if (cached && cached.version === version) {
+      return cached.categories;
+    }
+  } catch (error) {
+    console.error('Error reading cached categories:', error);
+  }
+
+  // The version in the URL keeps HTTP caches from serving an older list
+  const response = await fetch(`${API_BASE_URL}/api/categories?v=${version}`);
+  const categories = await response.json();
+  const servedVersion = Number(response.headers.get('X-Categories-Version') ?? version);
+  try {
+    localStorage.setItem(CATEGORIES_CACHE_KEY, JSON.stringify({ version: servedVersion, categories }));
+  } catch (error) {
+    console.error('Error caching categories:', error);
+  }
+  return categories;
+};
+
 // Video Player Component
 const VideoPlayer = ({ video, onClose }) => {
   const [isPlaying, setIsPlaying] = useState(false);
+  const videoId = video ? video.id : null;
 
   useEffect(() => {
-    // Increment view count when video starts playing
-    if (isPlaying && video) {
-      fetch(`${API_BASE_URL}/api/videos/${video.id}/view`, {
+    // Increment view count when video starts playing; keyed on the id so a
+    // refreshed copy of the same video does not count a second view
+    if (isPlaying && videoId) {
+      fetch(`${API_BASE_URL}/api/videos/${videoId}/view`, {
         method: 'PUT'
       }).catch(console.error);
     }
-  }, [isPlaying, video]);
+  }, [isPlaying, videoId]);
 
   const renderPlayer = () => {
     if (!video) return null;
@@ -176,13 +211,54 @@ const HeroSection = ({ video, onPlayClick }) => {
 
 // Search Component
 const SearchBar = ({ onSearch, searchTerm, setSearchTerm }) => {
+  const [suggestions, setSuggestions] = useState([]);
+
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setSuggestions([]);
+      return undefined;
+    }
+
+    // Debounced typeahead against the in-memory suggest index
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(
+          `${API_BASE_URL}/api/search/suggest?q=${encodeURIComponent(query)}&limit=8`,
+          { signal: controller.signal }
+        );
+        if (response.ok) {
+          const data = await response.json();
+          setSuggestions(data.terms);
+        }
+      } catch (error) {
+        if (error.name !== 'AbortError') {
+          console.error('Error fetching suggestions:', error);
+        }
+      }
+    }, 150);
+
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm]);
+
   const handleSubmit = (e) => {
     e.preventDefault();
+    setSuggestions([]);
     if (searchTerm.trim()) {
       onSearch(searchTerm.trim());
     }
   };
 
+  const handleSuggestionClick = (term) => {
+    setSearchTerm(term);
+    setSuggestions([]);
+    onSearch(term);
+  };
+
   return (
     <form onSubmit={handleSubmit} className="flex-1 max-w-lg">
       <div className="relative">
@@ -190,6 +266,7 @@ const SearchBar = ({ onSearch, searchTerm, setSearchTerm }) => {
           type="text"
           value={searchTerm}
           onChange={(e) => setSearchTerm(e.target.value)}
+          onBlur={() => setTimeout(() => setSuggestions([]), 150)}
           placeholder="Search videos, categories, tags..."
           className="w-full bg-gray-800 text-white px-4 py-2 rounded-lg focus:outline-none focus:ring-2 focus:ring-red-600"
         />
@@ -199,6 +276,19 @@ const SearchBar = ({ onSearch, searchTerm, setSearchTerm }) => {
         >
           🔍
         </button>
+        {suggestions.length > 0 && (
+          <ul className="absolute left-0 right-0 mt-1 bg-gray-800 rounded-lg shadow-lg overflow-hidden z-50">
+            {suggestions.map(term => (
+              <li
+                key={term}
+                onMouseDown={() => handleSuggestionClick(term)}
+                className="px-4 py-2 text-white cursor-pointer hover:bg-gray-700"
+              >
+                {term}
+              </li>
+            ))}
+          </ul>
+        )}
       </div>
     </form>
   );
@@ -413,13 +503,12 @@ function App() {
       setLoading(true);
       
       // Fetch featured content and categories
-      const [featuredResponse, categoriesResponse] = await Promise.all([
+      const [featuredResponse, categoriesData] = await Promise.all([
         fetch(`${API_BASE_URL}/api/featured`),
-        fetch(`${API_BASE_URL}/api/categories`)
+        loadCategories()
       ]);
 
       const featured = await featuredResponse.json();
-      const categoriesData = await categoriesResponse.json();
 
       setFeaturedContent(featured);
       setCategories(categoriesData);
@@ -458,8 +547,7 @@ function App() {
     }
 
     // Refresh categories
-    const response = await fetch(`${API_BASE_URL}/api/categories`);
-    const categoriesData = await response.json();
+    const categoriesData = await loadCategories();
     setCategories(categoriesData);
   };
 
@@ -473,8 +561,23 @@ function App() {
     }
   };
 
-  const handleVideoClick = (video) => {
-    setCurrentVideo(video);
+  const handleVideoClick = async (video) => {
+    // List endpoints return card fields only; the player opens once the full video is loaded.
+    // Full videos (the featured hero) are played as they are.
+    if (video.video_type) {
+      setCurrentVideo(video);
+      return;
+    }
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/videos/${video.id}`);
+      if (response.ok) {
+        setCurrentVideo(await response.json());
+      } else {
+        console.error('Error loading video:', await response.text());
+      }
+    } catch (error) {
+      console.error('Error loading video:', error);
+    }
   };
 
   const handleCloseVideo = () => {
@@ -527,7 +630,7 @@ function App() {
           // Search Results View
           <div className="container mx-auto px-6 py-8">
             <h1 className="text-white text-3xl font-bold mb-6">
-              Search Results for "{searchTerm}" ({searchResults.total} results)
+              Search Results for "{searchTerm}" ({searchResults.total_exact ? '' : '~'}{searchResults.total} results)
             </h1>
             <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-4 xl:grid-cols-5 gap-4">
               {searchResults.videos.map(video => (
@@ -572,6 +675,7 @@ function App() {
 
       {currentVideo && (
         <VideoPlayer
+          key={currentVideo.id}
           video={currentVideo}
           onClose={handleCloseVideo}
         />
@@ -0,0 +1,57 @@
+from datetime import datetime
+import asyncio
+import os
+import sys
+
+import pytest
+
+# The backend is a flat set of modules run from backend/, not an installed package
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings are read at import time; keep the tests off the network
+os.environ.setdefault('YOUTUBE_API_KEY', '')
+
+@pytest.fixture
+def mongo():
+    """Point the database module at an empty in-memory MongoDB"""
+    import mongomock_motor
+
+    import database
+
+    database._client = mongomock_motor.AsyncMongoMockClient()
+    database._client_pid = os.getpid()
+    yield database
+    database._client = None
+
+@pytest.fixture
+def api(mongo):
+    """TestClient for server.app on an empty in-memory database; startup handlers do not run"""
+    from fastapi.testclient import TestClient
+
+    import server
+
+    server.video_cache.clear()
+    yield TestClient(server.app)
+    server.video_cache.clear()
+
+@pytest.fixture
+def insert_videos(api):
+    """Write video documents straight to the api fixture's database"""
+    from database import videos_collection
+
+    def insert(docs):
+        asyncio.run(videos_collection.insert_many([dict(doc) for doc in docs]))
+    return insert
+
+@pytest.fixture
+def make_video():
+    """Factory for complete video documents: make_video(n, **overrides) has id vn and view_count n"""
+    def make(n, **fields):
+        return dict({
+            'id': f'v{n}', 'title': f'Video {n}', 'description': 'd', 'url': 'https://example.com/v.mp4',
+            'thumbnail': 't', 'category': 'Business', 'video_type': 'direct',
+            'created_at': datetime(2024, 1, 1, 0, 0, n), 'view_count': n,
+        }, **fields)
+    return make
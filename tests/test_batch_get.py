@@ -0,0 +1,37 @@
+def test_results_follow_request_order(api, insert_videos, make_video):
+    insert_videos([make_video(n) for n in range(5)])
+    ids = ['v3', 'v0', 'v4', 'v0']
+    response = api.post('/api/videos/batch-get', json={'ids': ids})
+    assert response.status_code == 200
+    body = response.json()
+    assert [result['id'] for result in body['results']] == ids
+    assert [result['video']['title'] for result in body['results']] == ['Video 3', 'Video 0', 'Video 4', 'Video 0']
+    assert (body['found'], body['missing']) == (4, 0)
+
+def test_missing_ids_are_reported_in_place(api, insert_videos, make_video):
+    insert_videos([make_video(1), make_video(2)])
+    response = api.post('/api/videos/batch-get', json={'ids': ['nope', 'v2', 'gone', 'v1']})
+    body = response.json()
+    assert [(result['id'], result['found']) for result in body['results']] == [
+        ('nope', False), ('v2', True), ('gone', False), ('v1', True),
+    ]
+    assert body['results'][0]['video'] is None
+    assert (body['found'], body['missing']) == (2, 2)
+
+def test_cached_and_uncached_ids_mix(api, insert_videos, make_video):
+    insert_videos([make_video(n) for n in range(3)])
+    assert api.get('/api/videos/v1').status_code == 200  # now cached
+    body = api.post('/api/videos/batch-get', json={'ids': ['v2', 'v1', 'v0']}).json()
+    assert [result['video']['view_count'] for result in body['results']] == [2, 1, 0]
+
+def test_full_documents_with_defaults_unless_fields_narrow_them(api, insert_videos, make_video):
+    insert_videos([make_video(1)])
+    full = api.post('/api/videos/batch-get', json={'ids': ['v1']}).json()['results'][0]['video']
+    assert full['tags'] == [] and full['is_premium'] is False and full['embed_url'] is None
+    narrow = api.post('/api/videos/batch-get', params={'fields': 'title'}, json={'ids': ['v1']}).json()
+    assert narrow['results'][0]['video'] == {'id': 'v1', 'created_at': '2024-01-01T00:00:01', 'title': 'Video 1'}
+
+def test_request_limits(api):
+    assert api.post('/api/videos/batch-get', json={'ids': []}).status_code == 422
+    assert api.post('/api/videos/batch-get', json={'ids': [f'v{n}' for n in range(501)]}).status_code == 422
+    assert api.post('/api/videos/batch-get', params={'fields': 'bogus'}, json={'ids': ['v1']}).status_code == 400
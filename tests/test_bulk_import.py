@@ -0,0 +1,89 @@
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+import bulk_import
+from bulk_import import import_records, iter_records
+
+async def _chunks(body: bytes, size: int = 7):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+def collect(body: bytes, fmt: str):
+    async def run():
+        return [record async for record in iter_records(_chunks(body), fmt)]
+    return asyncio.run(run())
+
+class FakeCollection:
+    """insert_many only; rejects documents whose title is 'duplicate' like a unique index would"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc['title'] == 'duplicate':
+                errors.append({'index': index, 'code': 11000, 'errmsg': 'E11000 duplicate key error'})
+            else:
+                self.docs.append(doc)
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'nInserted': len(docs) - len(errors)})
+
+def build_doc(record):
+    if not isinstance(record.get('title'), str):
+        raise ValueError('title must be a string')
+    return {'id': f"doc-{record['title']}", 'title': record['title']}
+
+def run_import(monkeypatch, body: bytes, fmt: str = 'ndjson', batch_size: int = 2):
+    collection = FakeCollection()
+    monkeypatch.setattr(bulk_import, 'videos_collection', collection)
+    report = asyncio.run(import_records(iter_records(_chunks(body), fmt), build_doc, batch_size))
+    return report, collection
+
+def test_ndjson_records_and_line_numbers():
+    records = collect(b'{"title": "a"}\n\n{"title": "b"}\r\n[1]\nnot json\n{"title": "c"}', 'ndjson')
+    assert [(line, record) for line, record, _ in records] == [
+        (1, {'title': 'a'}), (3, {'title': 'b'}), (4, None), (5, None), (6, {'title': 'c'}),
+    ]
+    assert records[2][2] == 'Invalid JSON: expected a JSON object'
+    assert records[3][2].startswith('Invalid JSON')
+
+def test_ndjson_invalid_utf8_is_an_invalid_record():
+    records = collect(b'{"title": "a"}\n{"title": "\xff\xfe"}\n{"title": "caf\xc3\xa9"}\n', 'ndjson')
+    assert records[0] == (1, {'title': 'a'}, None)
+    assert records[1] == (2, None, 'Invalid UTF-8 at byte 11')
+    assert records[2] == (3, {'title': 'café'}, None)
+
+def test_csv_quoted_newlines_and_lists():
+    body = b'title,tags,description\n"Multi\nline",a|b| ,\nplain,,desc\n'
+    assert collect(body, 'csv') == [
+        (2, {'title': 'Multi\nline', 'tags': ['a', 'b']}, None),
+        (4, {'title': 'plain', 'description': 'desc'}, None),
+    ]
+
+def test_csv_invalid_utf8_keeps_later_rows_aligned():
+    body = b'title,description\n"bad\n\xff",x\nok,y\n"open\n'
+    assert collect(body, 'csv') == [
+        (2, None, 'Invalid UTF-8 at byte 0 on line 3'),
+        (4, {'title': 'ok', 'description': 'y'}, None),
+        (5, None, 'Unterminated quoted field'),
+    ]
+
+def test_report_covers_every_record(monkeypatch):
+    body = b'{"title": "a"}\n{"title": 1}\n{"title": "duplicate"}\n\xff\n{"title": "b"}\n'
+    report, collection = run_import(monkeypatch, body)
+    assert (report['created'], report['invalid'], report['failed']) == (2, 2, 1)
+    assert [(result['line'], result['status']) for result in report['results']] == [
+        (1, 'created'), (2, 'invalid'), (3, 'failed'), (4, 'invalid'), (5, 'created'),
+    ]
+    assert report['results'][1]['error'] == 'title must be a string'
+    assert report['results'][2]['error'] == 'E11000 duplicate key error'
+    assert report['results'][3]['error'] == 'Invalid UTF-8 at byte 0'
+    assert [doc['title'] for doc in collection.docs] == ['a', 'b']
+
+def test_batches_already_written_are_reported(monkeypatch):
+    # A bad line after a full batch must not lose the report for the rows written before it
+    report, collection = run_import(monkeypatch, b'{"title": "a"}\n{"title": "b"}\n\xc3\n', batch_size=2)
+    assert [result['status'] for result in report['results']] == ['created', 'created', 'invalid']
+    assert len(collection.docs) == 2
@@ -0,0 +1,63 @@
+import asyncio
+import json
+from datetime import datetime
+
+from category_catalog import CategoryCatalog
+from http_cache import make_etag
+
+PROJECTION = {'_id': 0, 'id': 1, 'name': 1}
+
+def add_category(name):
+    from database import categories_collection
+
+    asyncio.run(categories_collection.insert_one({'id': name.lower(), 'name': name, 'created_at': datetime(2024, 1, 1)}))
+
+def names(body):
+    return [category['name'] for category in json.loads(body)]
+
+def test_served_etag_and_version_match_the_body(mongo):
+    add_category('Tech')
+    add_category('Business')
+    catalog = CategoryCatalog(PROJECTION)
+    body, etag, version = asyncio.run(catalog.get())
+    assert names(body) == ['Business', 'Tech']
+    assert etag == make_etag(body)
+    assert version == asyncio.run(catalog.shared_version())
+
+def test_a_bump_on_one_worker_reaches_the_others(mongo):
+    add_category('Business')
+    writer = CategoryCatalog(PROJECTION)
+    # A long check interval: only a bus invalidate() or min_version makes this worker look again
+    reader = CategoryCatalog(PROJECTION, check_interval=3600)
+    asyncio.run(writer.get())
+    _, _, before = asyncio.run(reader.get())
+
+    add_category('Tech')
+    bumped = asyncio.run(writer.bump())
+    assert bumped == before + 1
+    assert names(asyncio.run(reader.get())[0]) == ['Business']  # not told yet
+
+    reader.invalidate()  # the worker bus event
+    body, etag, version = asyncio.run(reader.get())
+    assert (names(body), version, etag) == (['Business', 'Tech'], bumped, make_etag(body))
+
+def test_the_version_check_interval_bounds_staleness(mongo):
+    add_category('Business')
+    writer = CategoryCatalog(PROJECTION)
+    reader = CategoryCatalog(PROJECTION, check_interval=0)
+    asyncio.run(reader.get())
+    add_category('Tech')
+    asyncio.run(writer.bump())
+    assert names(asyncio.run(reader.get())[0]) == ['Business', 'Tech']
+    assert reader.loads == 2
+
+def test_a_direct_write_without_a_bump_gets_a_new_version(mongo):
+    add_category('Business')
+    catalog = CategoryCatalog(PROJECTION)
+    _, etag, version = asyncio.run(catalog.get())
+    add_category('Tech')  # written straight to MongoDB; the change feed only calls invalidate()
+    catalog.invalidate()
+    body, new_etag, new_version = asyncio.run(catalog.get())
+    assert names(body) == ['Business', 'Tech']
+    assert new_etag != etag and new_version == version + 1
+    assert asyncio.run(catalog.shared_version()) == new_version
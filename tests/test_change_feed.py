@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime
+
+from change_feed import CATEGORY_CREATED, CATEGORY_UPDATED, VIDEO_CREATED, VIDEO_UPDATED, VIEW_DELTA, ChangeFeed
+
+def video(video_id, **fields):
+    now = datetime.utcnow()
+    return dict({
+        'id': video_id, 'title': 'Title', 'category': 'Business', 'is_premium': False,
+        'view_count': 0, 'created_at': now, 'updated_at': now,
+    }, **fields)
+
+async def later() -> datetime:
+    # MongoDB keeps milliseconds; make each write's timestamp distinct from the previous one
+    await asyncio.sleep(0.002)
+    return datetime.utcnow()
+
+async def flush_views(videos, video_id, count):
+    # The write ViewCounter.flush makes
+    await videos.update_one({'id': video_id}, {'$inc': {'view_count': count},
+                                               '$set': {'view_count_delta': count, 'viewed_at': await later()}})
+
+async def poll(feed, seen):
+    seen.clear()
+    await feed.poll()
+    return {event.kind: event for event in seen}
+
+def test_poll_mode_delivers_each_kind_of_change(mongo):
+    from database import categories_collection, videos_collection
+
+    async def scenario():
+        feed = ChangeFeed(mode='poll')
+        seen = []
+
+        async def record(event):
+            seen.append(event)
+        for kind in (VIDEO_CREATED, VIDEO_UPDATED, CATEGORY_CREATED, CATEGORY_UPDATED, VIEW_DELTA):
+            feed.subscribe(kind, record)
+
+        assert await poll(feed, seen) == {}  # the first poll only records where it started
+
+        await videos_collection.insert_one(video('v'))
+        await categories_collection.insert_one({'id': 'c', 'name': 'Business', 'description': 'x'})
+        events = await poll(feed, seen)
+        assert events[VIDEO_CREATED].ids == ['v']
+        assert events[CATEGORY_CREATED].documents[0]['name'] == 'Business'
+        assert VIDEO_UPDATED not in events
+
+        await videos_collection.update_one({'id': 'v'}, {'$set': {'title': 'Edited', 'updated_at': await later()}})
+        await categories_collection.update_one({'id': 'c'}, {'$set': {'description': 'y'}})
+        events = await poll(feed, seen)
+        assert events[VIDEO_UPDATED].ids == ['v']
+        assert events[CATEGORY_UPDATED].ids == ['c']
+        assert VIDEO_CREATED not in events  # already delivered inside the poll overlap
+
+        await flush_views(videos_collection, 'v', 5)
+        events = await poll(feed, seen)
+        assert events[VIEW_DELTA].view_deltas == {'v': 5}
+        assert events[VIEW_DELTA].view_counts == {'v': 5}
+
+        # Enrichment adds YouTube's count to view_count; it is a new total, not new views
+        await videos_collection.update_one({'id': 'v'}, {
+            '$set': {'title': 'From YouTube', 'enrichment_status': 'done', 'updated_at': await later()},
+            '$inc': {'view_count': 1000000},
+        })
+        events = await poll(feed, seen)
+        assert events[VIDEO_UPDATED].ids == ['v']
+        assert events[VIEW_DELTA].view_deltas == {}
+        assert events[VIEW_DELTA].view_counts == {'v': 1000005}
+
+        await flush_views(videos_collection, 'v', 2)
+        events = await poll(feed, seen)
+        assert events[VIEW_DELTA].view_deltas == {'v': 2}
+        assert events[VIEW_DELTA].view_counts == {'v': 1000007}
+
+    asyncio.run(scenario())
+
+def test_views_flushed_after_enrichment_in_the_same_poll_still_count(mongo):
+    from database import videos_collection
+
+    async def scenario():
+        feed = ChangeFeed(mode='poll')
+        seen = []
+
+        async def record(event):
+            seen.append(event)
+        feed.subscribe(VIEW_DELTA, record)
+
+        await videos_collection.insert_one(video('v'))
+        await feed.poll()
+        await flush_views(videos_collection, 'v', 5)
+        await poll(feed, seen)
+
+        await videos_collection.update_one({'id': 'v'}, {'$set': {'updated_at': await later()},
+                                                         '$inc': {'view_count': 1000}})
+        await flush_views(videos_collection, 'v', 3)
+        events = await poll(feed, seen)
+        assert events[VIEW_DELTA].view_deltas == {'v': 3}
+
+    asyncio.run(scenario())
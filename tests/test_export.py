@@ -0,0 +1,53 @@
+import asyncio
+import json
+from datetime import datetime
+
+from export import export_cursor, export_filter, iter_export
+
+def collect(cursor, defaults=None, chunk_bytes=1):
+    async def run():
+        return [chunk async for chunk in iter_export(cursor, defaults or {}, chunk_bytes)]
+    return asyncio.run(run())
+
+def test_chunks_hold_whole_lines_across_batch_boundaries(mongo, make_video):
+    asyncio.run(mongo.videos_collection.insert_many([make_video(n) for n in range(7)]))
+    line = len(json.dumps({'id': 'v0', 'view_count': 0}, separators=(',', ':'))) + 1
+    # Batches of 2 documents, chunks of about 3 lines: neither boundary lines up with the other
+    chunks = collect(export_cursor({'_id': 0, 'id': 1, 'view_count': 1}, batch_size=2), chunk_bytes=3 * line)
+    assert [chunk.count(b'\n') for chunk in chunks] == [3, 3, 1]
+    assert all(chunk.endswith(b'\n') for chunk in chunks)
+    lines = b''.join(chunks).splitlines()
+    assert sorted(json.loads(line)['id'] for line in lines) == [f'v{n}' for n in range(7)]
+
+def test_defaults_fill_missing_fields_only(mongo, make_video):
+    asyncio.run(mongo.videos_collection.insert_many([make_video(1, tags=['a']), make_video(2)]))
+    chunks = collect(export_cursor({'_id': 0, 'id': 1, 'tags': 1}), {'tags': []}, chunk_bytes=1 << 16)
+    assert len(chunks) == 1
+    assert sorted(json.loads(line)['tags'] for line in chunks[0].splitlines()) == [[], ['a']]
+
+def test_empty_cursor_yields_nothing(mongo):
+    assert collect(export_cursor({'_id': 0, 'id': 1})) == []
+
+def test_updated_since_selects_created_or_edited_videos(mongo, make_video):
+    since = datetime(2024, 6, 1)
+    asyncio.run(mongo.videos_collection.insert_many([
+        make_video(1),                                    # old, never edited
+        make_video(2, updated_at=datetime(2024, 7, 1)),   # old, edited since
+        make_video(3, created_at=datetime(2024, 7, 1)),   # created since, no updated_at yet
+        make_video(4, updated_at=datetime(2024, 5, 1)),   # edited before
+    ]))
+    assert export_filter(None) == {}
+    lines = b''.join(collect(export_cursor({'_id': 0, 'id': 1}, since))).splitlines()
+    assert sorted(json.loads(line)['id'] for line in lines) == ['v2', 'v3']
+
+def test_endpoint_streams_filtered_ndjson(api, insert_videos, make_video):
+    insert_videos([make_video(1), make_video(2, updated_at=datetime(2024, 7, 1))])
+    response = api.get('/api/videos/export', params={'updated_since': '2024-06-01T00:00:00', 'fields': 'title'})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert response.headers['x-export-started-at'].endswith('Z')
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {'id': 'v2', 'created_at': '2024-01-01T00:00:02', 'title': 'Video 2'}
+    ]
+    everything = api.get('/api/videos/export').text.splitlines()
+    assert len(everything) == 2 and json.loads(everything[0])['tags'] == []
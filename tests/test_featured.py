@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime
+
+from featured import FeaturedSnapshot, featured_pipeline
+
+PUBLIC_FIELDS = ('id', 'title', 'category', 'is_premium', 'view_count', 'created_at')
+
+def stored_video(video_id, **fields):
+    return dict({
+        'id': video_id, 'title': video_id.upper(), 'category': 'Business', 'is_premium': False,
+        'view_count': 3, 'created_at': datetime(2024, 1, 1),
+        # Stored for the view counter and the export, never sent to clients
+        'view_count_delta': 2, 'viewed_at': datetime(2024, 1, 2), 'updated_at': datetime(2024, 1, 3),
+    }, **fields)
+
+def snapshot():
+    featured = FeaturedSnapshot(hero_fields=PUBLIC_FIELDS, redis_url=None, row_fields=('id', 'title', 'category'))
+    featured.category_names = ['Business']
+    asyncio.run(featured._publish({'hero_video': None, 'categories': []}))
+    return featured
+
+def test_applied_hero_carries_only_public_fields():
+    featured = snapshot()
+    asyncio.run(featured.apply_video(stored_video('a', _id='object-id')))
+    assert sorted(featured.payload['hero_video']) == sorted(PUBLIC_FIELDS)
+    assert featured.payload['categories'] == [{'category': 'Business', 'videos': [{'id': 'a', 'title': 'A', 'category': 'Business'}]}]
+    assert b'view_count_delta' not in featured.body and b'viewed_at' not in featured.body
+
+def test_premium_video_joins_its_row_but_not_the_hero():
+    featured = snapshot()
+    asyncio.run(featured.apply_video(stored_video('a')))
+    asyncio.run(featured.apply_video(stored_video('b', is_premium=True)))
+    assert featured.payload['hero_video']['id'] == 'a'
+    assert [video['id'] for video in featured.payload['categories'][0]['videos']] == ['b', 'a']
+
+def test_pipeline_projects_the_hero():
+    projection = {'_id': 0, 'id': 1, 'title': 1}
+    hero_stage = featured_pipeline(hero_projection=projection)[-1]['$unionWith']['pipeline']
+    assert {'$project': projection} in hero_stage
+    whole = featured_pipeline()[-1]['$unionWith']['pipeline']
+    assert {'$unset': '_id'} in whole
+
+def test_rebuild_racing_an_invalidate_is_not_kept(monkeypatch):
+    import featured as featured_module
+
+    featured = FeaturedSnapshot(hero_fields=PUBLIC_FIELDS, redis_url=None)
+    heroes = iter(['old', 'new'])
+
+    async def aggregate(row_projection, hero_projection):
+        hero = next(heroes)
+        if hero == 'old':
+            # A video changes while the first build is still reading
+            await featured.invalidate()
+        return ['Business'], {'hero_video': {'id': hero}, 'categories': []}
+
+    monkeypatch.setattr(featured_module, '_aggregate_featured', aggregate)
+
+    async def reads():
+        first, _ = await featured.get()
+        assert featured.payload is None  # the racing build answered its read but was dropped
+        second, etag = await featured.get()
+        return first, second, etag
+
+    first, second, etag = asyncio.run(reads())
+    assert b'"old"' in first
+    assert b'"new"' in second and featured.etag == etag
+    assert featured.payload['hero_video'] == {'id': 'new'}
@@ -0,0 +1,72 @@
+import pytest
+
+from serialization import REQUIRED_VIDEO_FIELDS, VIDEO_CARD_FIELDS, InvalidFields, fields_projection, select_fields
+
+ALLOWED = ['id', 'title', 'thumbnail', 'description', 'created_at', 'tags']
+
+def test_default_fieldset():
+    assert select_fields(None, ALLOWED, ['id', 'title', 'created_at']) == ['id', 'title', 'created_at']
+
+@pytest.mark.parametrize('fields', ['all', '*', ' all '])
+def test_all_fields(fields):
+    assert select_fields(fields, ALLOWED, ['id']) == ALLOWED
+
+def test_required_fields_are_always_selected():
+    assert select_fields('title', ALLOWED, ['id']) == ['id', 'created_at', 'title']
+    assert select_fields('created_at,title', ALLOWED, ['id']) == ['id', 'created_at', 'title']
+
+def test_whitespace_empty_names_and_duplicates_are_ignored():
+    assert select_fields(' title , ,tags,title', ALLOWED, ['id']) == ['id', 'created_at', 'title', 'tags']
+
+@pytest.mark.parametrize('fields,unknown', [('bogus', 'bogus'), ('title,_id,secret', '_id, secret'), ('ALL,title', 'ALL')])
+def test_unknown_fields_are_rejected(fields, unknown):
+    with pytest.raises(InvalidFields, match=f"Unknown fields: {unknown}"):
+        select_fields(fields, ALLOWED, ['id'])
+
+def test_projection():
+    assert fields_projection(['id', 'title']) == {'_id': 0, 'id': 1, 'title': 1}
+
+def test_card_fields_include_the_required_fields():
+    assert set(REQUIRED_VIDEO_FIELDS) <= set(VIDEO_CARD_FIELDS)
+
+def test_list_endpoints_default_to_card_fields(api, insert_videos, make_video):
+    insert_videos([make_video(n, title=f'Business {n}') for n in range(3)])
+    videos = api.get('/api/videos').json()
+    assert [sorted(item) for item in videos] == [sorted(VIDEO_CARD_FIELDS)] * 3
+    results = api.get('/api/search', params={'q': 'business', 'mode': 'regex'}).json()['videos']
+    assert [sorted(item) for item in results] == [sorted(VIDEO_CARD_FIELDS)] * 3
+
+def test_list_endpoints_honour_fields(api, insert_videos, make_video):
+    insert_videos([make_video(1)])
+    assert api.get('/api/videos', params={'fields': 'title'}).json() == [
+        {'id': 'v1', 'created_at': '2024-01-01T00:00:01', 'title': 'Video 1'}
+    ]
+    full = api.get('/api/videos', params={'fields': 'all'}).json()[0]
+    assert full['tags'] == [] and full['view_count'] == 1 and full['embed_url'] is None
+
+@pytest.mark.parametrize('path,params', [
+    ('/api/videos', {'fields': 'bogus'}),
+    ('/api/search', {'q': 'x', 'fields': 'title,bogus'}),
+    ('/api/videos/export', {'fields': 'nope'}),
+])
+def test_unknown_fields_are_a_400(api, path, params):
+    response = api.get(path, params=params)
+    assert response.status_code == 400
+    assert response.json()['detail'].startswith('Unknown fields')
+
+def test_openapi_describes_cards():
+    import server
+
+    schema = server.app.openapi()
+    for path in ('/api/videos', '/api/trending'):
+        listing = schema['paths'][path]['get']['responses']['200']['content']['application/json']['schema']
+        assert listing['items'] == {'$ref': '#/components/schemas/VideoCard'}
+    assert schema['components']['schemas']['VideoCard']['required'] == ['id', 'created_at']
+    assert schema['components']['schemas']['SearchResponse']['properties']['videos']['items'] == {
+        '$ref': '#/components/schemas/VideoCard'
+    }
+
+def test_video_card_covers_every_video_field():
+    import server
+
+    assert set(server.VideoCard.model_fields) == set(server.Video.model_fields)
@@ -0,0 +1,153 @@
+import asyncio
+import gzip
+
+import pytest
+
+import http_cache
+from http_cache import CompressionMiddleware, HTTPCacheMiddleware, make_etag
+
+def app_serving(*headers):
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/json'), *headers]})
+        await send({'type': 'http.response.body', 'body': b'{"ok":true}'})
+    return app
+
+def request(path, query=b'', headers=(), app=app_serving()):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query, 'headers': list(headers)}
+    asyncio.run(HTTPCacheMiddleware(app)(scope, None, send))
+    return messages[0]['status'], dict(messages[0]['headers'])
+
+@pytest.mark.parametrize('path', ['/api/featured', '/api/trending', '/api/videos', '/api/videos/abc', '/api/search'])
+def test_mutable_routes_revalidate(path):
+    status, headers = request(path)
+    assert status == 200
+    assert headers[b'cache-control'] == b'no-cache'
+    assert headers[b'etag'] == make_etag(b'{"ok":true}').encode()
+
+def test_matching_etag_gets_304():
+    etag = make_etag(b'{"ok":true}').encode()
+    status, headers = request('/api/videos/abc', headers=[(b'if-none-match', etag)])
+    assert status == 304
+    assert headers[b'etag'] == etag
+
+def test_only_categories_of_the_requested_version_get_a_max_age():
+    version_7 = app_serving((b'x-categories-version', b'7'))
+    assert request('/api/categories', app=version_7)[1][b'cache-control'] == b'no-cache'
+    assert request('/api/categories', b'v=', app=version_7)[1][b'cache-control'] == b'no-cache'
+    assert request('/api/categories', b'v=7', app=version_7)[1][b'cache-control'] == b'public, max-age=300'
+    # A worker still on an older version must not let caches keep its list under the new URL
+    assert request('/api/categories', b'v=8', app=version_7)[1][b'cache-control'] == b'no-cache'
+    assert request('/api/categories', b'v=7')[1][b'cache-control'] == b'no-cache'
+
+def test_categories_reload_for_a_version_bumped_by_another_worker(api):
+    import server
+    from database import categories_collection, versions_collection
+
+    server.category_catalog.invalidate()
+    first = api.get('/api/categories')
+    assert first.json() == [] and first.headers['x-categories-version'] == '0'
+
+    # Another worker adds a category and bumps the shared version; this worker has not checked yet
+    asyncio.run(categories_collection.insert_one({'id': 'c', 'name': 'Business', 'description': '', 'created_at': '2024'}))
+    asyncio.run(versions_collection.update_one({'_id': 'categories'}, {'$inc': {'version': 1}}, upsert=True))
+    assert api.get('/api/categories').json() == []
+
+    response = api.get('/api/categories', params={'v': 1})
+    assert [category['name'] for category in response.json()] == ['Business']
+    assert response.headers['x-categories-version'] == '1'
+    assert response.headers['cache-control'] == 'public, max-age=300'
+    ahead = api.get('/api/categories', params={'v': 2})
+    assert ahead.headers['x-categories-version'] == '1' and ahead.headers['cache-control'] == 'no-cache'
+    server.category_catalog.invalidate()
+
+def test_export_is_not_stored():
+    assert request('/api/videos/export')[1][b'cache-control'] == b'no-store'
+
+def compress(body, accept_encoding='gzip', status=200, headers=(), minimum_size=1024, more_body=False):
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'), *headers]})
+        if more_body:
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': body})
+        else:
+            await send({'type': 'http.response.body', 'body': body})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/api/videos', 'query_string': b'',
+             'headers': [(b'accept-encoding', accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size)(scope, None, send))
+    return messages[0]['status'], dict(messages[0]['headers']), b''.join(message['body'] for message in messages[1:])
+
+LARGE = b'{"title":"video"}' * 100
+
+@pytest.mark.parametrize('accept_encoding,expected', [
+    ('gzip, deflate, br', 'br'),
+    ('br;q=1.0, gzip;q=0.8', 'br'),
+    ('gzip, deflate', 'gzip'),
+    ('deflate', None),
+    ('', None),
+])
+def test_negotiate_prefers_brotli(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr(http_cache, 'brotli', object())
+    assert CompressionMiddleware.negotiate(accept_encoding) == expected
+
+def test_negotiate_falls_back_to_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    assert CompressionMiddleware.negotiate('br, gzip') == 'gzip'
+    assert CompressionMiddleware.negotiate('br') is None
+
+def test_large_bodies_are_gzipped(monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    status, headers, body = compress(LARGE, 'br, gzip', headers=[(b'etag', b'"abc"')])
+    assert headers[b'content-encoding'] == b'gzip'
+    assert headers[b'etag'] == b'"abc-gzip"'
+    assert headers[b'content-length'] == str(len(body)).encode()
+    assert gzip.decompress(body) == LARGE
+
+@pytest.mark.skipif(http_cache.brotli is None, reason='brotli is not installed')
+def test_large_bodies_are_brotli_compressed_when_accepted():
+    _, headers, body = compress(LARGE, 'gzip, br')
+    assert headers[b'content-encoding'] == b'br'
+    assert http_cache.brotli.decompress(body) == LARGE
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    _, headers, body = compress(LARGE, 'gzip', more_body=True)
+    assert headers[b'content-encoding'] == b'gzip' and b'content-length' not in headers
+    assert gzip.decompress(body) == LARGE * 2
+
+def test_small_bodies_and_unaccepted_encodings_pass_through():
+    _, headers, body = compress(b'{"ok":true}')
+    assert b'content-encoding' not in headers and body == b'{"ok":true}'
+    _, headers, body = compress(LARGE, 'identity')
+    assert b'content-encoding' not in headers and body == LARGE
+
+@pytest.mark.parametrize('vary,expected', [
+    (None, b'Accept-Encoding'),
+    (b'Origin', b'Origin, Accept-Encoding'),
+    (b'accept-encoding', b'accept-encoding'),
+])
+def test_vary_names_accept_encoding_once(vary, expected):
+    headers = [(b'vary', vary)] if vary else []
+    # Even uncompressed responses vary: another client could be sent the compressed form
+    for body in (LARGE, b'{}'):
+        assert compress(body, headers=headers)[1][b'vary'] == expected
+
+def test_not_modified_is_not_compressed():
+    status, headers, body = compress(b'', status=304, headers=[(b'etag', b'"abc"')], minimum_size=0)
+    assert status == 304 and body == b''
+    assert b'content-encoding' not in headers and headers[b'etag'] == b'"abc"'
+
+def test_already_encoded_responses_pass_through():
+    _, headers, body = compress(LARGE, headers=[(b'content-encoding', b'identity')])
+    assert headers[b'content-encoding'] == b'identity' and body == LARGE
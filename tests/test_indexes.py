@@ -0,0 +1,29 @@
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+import indexes
+
+class FakeCollection:
+    def __init__(self, conflicting=()):
+        self.conflicting = set(conflicting)
+        self.created = []
+
+    async def create_indexes(self, models):
+        for model in models:
+            if model.document['name'] in self.conflicting:
+                raise OperationFailure('An equivalent index already exists with a different name', 85)
+        self.created += [model.document['name'] for model in models]
+
+def test_a_conflicting_index_does_not_block_the_others(monkeypatch):
+    videos = FakeCollection(conflicting={indexes.TEXT_INDEX_NAME, 'videos_id'})
+    categories = FakeCollection()
+    monkeypatch.setattr(indexes, 'videos_collection', videos)
+    monkeypatch.setattr(indexes, 'categories_collection', categories)
+
+    failed = asyncio.run(indexes.ensure_indexes())
+
+    assert sorted(failed) == sorted([indexes.TEXT_INDEX_NAME, 'videos_id'])
+    expected = [model.document['name'] for model in indexes.INDEX_MANIFEST['videos']]
+    assert videos.created == [name for name in expected if name not in failed]
+    assert categories.created == ['categories_id', 'categories_name']
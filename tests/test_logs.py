@@ -0,0 +1,36 @@
+import json
+
+import logs
+
+def events(output):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+
+def test_print_logger_adds_the_trace_id_and_traceback(capsys):
+    token = logs.current_trace_id.set('abc123')
+    try:
+        try:
+            raise RuntimeError('boom')
+        except RuntimeError:
+            logs._PrintLogger().exception('step_failed', step='x')
+    finally:
+        logs.current_trace_id.reset(token)
+    event, = events(capsys.readouterr().out)
+    assert (event['event'], event['level'], event['step'], event['trace_id']) == ('step_failed', 'error', 'x', 'abc123')
+    assert 'RuntimeError: boom' in event['exception']
+
+def test_events_outside_a_request_have_no_trace_id(capsys):
+    logs._PrintLogger().warning('idle')
+    event, = events(capsys.readouterr().out)
+    assert 'trace_id' not in event
+
+def test_handler_errors_carry_the_request_id(api, monkeypatch, capsys):
+    import server
+
+    async def failing_get():
+        raise RuntimeError('snapshot unavailable')
+
+    monkeypatch.setattr(server.featured_snapshot, 'get', failing_get)
+    response = api.get('/api/featured', headers={'X-Request-ID': 'req-42'})
+    assert response.status_code == 500
+    errors = [event for event in events(capsys.readouterr().out) if event['event'] == 'handler_error']
+    assert [event['trace_id'] for event in errors] == ['req-42']
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import VIDEO_SORT, InvalidCursor, decode_cursor, encode_cursor, keyset_filter, next_cursor
+
+def test_cursor_round_trip():
+    doc = {'id': 'abc', 'created_at': datetime(2024, 5, 1, 12, 30, 15, 123000), 'title': 'ignored'}
+    cursor = encode_cursor(doc, VIDEO_SORT)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, VIDEO_SORT) == {'created_at': doc['created_at'], 'id': 'abc'}
+
+def test_cursor_round_trip_with_score():
+    sort = [('score', -1)] + VIDEO_SORT
+    doc = {'score': 1.75, 'id': 'abc', 'created_at': datetime(2024, 5, 1)}
+    assert decode_cursor(encode_cursor(doc, sort), sort) == {'score': 1.75, 'created_at': datetime(2024, 5, 1), 'id': 'abc'}
+
+@pytest.mark.parametrize('cursor', ['', 'zz', '!!!', 'bm90IGpzb24', 'e30', 'eyJpZCI6ImEifQ', 'eyJpZCI6ImEiLCJjcmVhdGVkX2F0IjoieCJ9'])
+def test_invalid_cursors(cursor):
+    # '', garbage, non-base64, not JSON, {}, a missing key and an unparseable date
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, VIDEO_SORT)
+
+def test_cursor_for_another_sort_is_invalid():
+    cursor = encode_cursor({'id': 'abc', 'created_at': datetime(2024, 5, 1)}, VIDEO_SORT)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, [('score', -1)] + VIDEO_SORT)
+
+def test_keyset_filter():
+    values = {'created_at': datetime(2024, 5, 1), 'id': 'abc'}
+    assert keyset_filter(values, VIDEO_SORT) == {'$or': [
+        {'created_at': {'$lt': datetime(2024, 5, 1)}},
+        {'created_at': datetime(2024, 5, 1), 'id': {'$lt': 'abc'}},
+    ]}
+
+def test_next_cursor_only_for_full_pages():
+    docs = [{'id': str(n), 'created_at': datetime(2024, 5, n + 1)} for n in range(3)]
+    assert next_cursor(docs, 4, VIDEO_SORT) is None
+    assert next_cursor([], 0, VIDEO_SORT) is None
+    assert decode_cursor(next_cursor(docs, 3, VIDEO_SORT), VIDEO_SORT)['id'] == '2'
@@ -0,0 +1,51 @@
+from suggest import SuggestIndex
+
+def video(video_id, title, category='Business', tags=()):
+    return {'id': video_id, 'title': title, 'category': category, 'tags': list(tags)}
+
+def test_prefix_completes_terms_and_videos():
+    index = SuggestIndex()
+    index.add_many([video('a', 'Growth strategy'), video('b', 'Growth hacking')])
+    result = index.suggest('gro')
+    assert result['terms'] == ['growth']
+    assert {item['id'] for item in result['videos']} == {'a', 'b'}
+
+def test_earlier_words_must_match_whole_terms():
+    index = SuggestIndex()
+    index.add_many([video('a', 'Growth strategy'), video('b', 'Growth hacking')])
+    assert [item['id'] for item in index.suggest('growth str')['videos']] == ['a']
+
+def test_reindex_drops_old_terms():
+    index = SuggestIndex()
+    index.add(video('a', 'Submitted title', tags=['draft']))
+    index.add(video('a', 'Enriched name', tags=['final']))
+    assert index.suggest('sub') == {'terms': [], 'videos': []}
+    assert index.suggest('dra') == {'terms': [], 'videos': []}
+    assert index.suggest('enr')['videos'] == [{'id': 'a', 'title': 'Enriched name', 'category': 'Business'}]
+    assert 'submitted' not in index.postings
+    assert index.terms == sorted(['enriched', 'name', 'business', 'final'])
+
+def test_reindex_keeps_terms_shared_with_other_videos():
+    index = SuggestIndex()
+    index.add(video('a', 'Leadership basics'))
+    index.add(video('b', 'Leadership advanced'))
+    index.add(video('a', 'Marketing basics'))
+    assert index.postings['leadership'] == {'b'}
+    assert index.postings['basics'] == {'a'}
+    assert [item['id'] for item in index.suggest('lead')['videos']] == ['b']
+
+def test_repeated_reindex_does_not_grow_the_index():
+    index = SuggestIndex()
+    for n in range(100):
+        index.add(video('a', f'Episode {n}'))
+    assert len(index) == 1
+    assert index.terms == ['99', 'business', 'episode']
+
+def test_remove():
+    index = SuggestIndex()
+    index.add_many([video('a', 'Sales pipeline'), video('b', 'Sales calls')])
+    index.remove('a')
+    index.remove('missing')
+    assert len(index) == 1
+    assert 'pipeline' not in index.postings
+    assert [item['id'] for item in index.suggest('sal')['videos']] == ['b']
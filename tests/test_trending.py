@@ -0,0 +1,87 @@
+import math
+import random
+
+import pytest
+
+from trending import MAX_DECAY_EXPONENT, Rankings, TopK, TrendingScores
+
+def brute_force_top(scores, k):
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+def test_top_k_matches_a_full_sort_under_increasing_scores():
+    rng = random.Random(7)
+    top = TopK(10)
+    scores = {}
+    for _ in range(5000):
+        key = f'v{rng.randrange(200)}'
+        scores[key] = scores.get(key, 0) + rng.randint(1, 20)
+        top.update(key, scores[key])
+        expected = brute_force_top(scores, 10)
+        # Ties may be ordered either way; the scores and the set above the cut must agree
+        assert [score for _, score in top.ranked()] == [score for _, score in expected]
+    assert len(top) == 10
+
+def test_lower_scores_are_ignored():
+    top = TopK(2)
+    top.update('a', 5)
+    top.update('a', 3)
+    assert top.ranked() == [('a', 5)]
+
+def test_the_floor_is_evicted_for_a_higher_newcomer():
+    top = TopK(3)
+    for key, score in (('a', 1), ('b', 2), ('c', 3)):
+        top.update(key, score)
+    top.update('d', 1)  # not above the floor
+    assert 'd' not in top
+    top.update('e', 4)
+    assert [key for key, _ in top.ranked()] == ['e', 'c', 'b']
+    # The floor moves when its own score rises
+    top.update('b', 10)
+    top.update('f', 3.5)
+    assert [key for key, _ in top.ranked()] == ['b', 'e', 'f']
+
+def test_reset_keeps_only_the_best():
+    top = TopK(2)
+    top.reset([('a', 1), ('b', 9), ('c', 5)])
+    assert top.ranked() == [('b', 9), ('c', 5)]
+
+def test_recent_views_outrank_older_ones():
+    trending = TrendingScores(k=5, half_life_hours=1)
+    start = trending.landmark
+    trending.record('old', 10, start)
+    trending.record('new', 6, start + 3600)  # one half-life later: 6 now beats 10 halved
+    assert [key for key, _ in trending.top.ranked()] == ['new', 'old']
+    assert trending.scores['old'] * math.exp(-3600 / trending.tau) == pytest.approx(5)
+
+def test_rebasing_keeps_order_and_current_scores(monkeypatch):
+    trending = TrendingScores(k=5, half_life_hours=1)
+    start = trending.landmark
+    trending.record('a', 10, start)
+    trending.record('b', 4, start + 1800)
+    later = start + MAX_DECAY_EXPONENT * trending.tau + 1
+    monkeypatch.setattr('trending.time.time', lambda: later)
+    before = {key: trending.current(score) for key, score in trending.scores.items()}
+
+    trending.record('c', 1, later)  # past MAX_DECAY_EXPONENT: the landmark moves to now
+
+    assert trending.landmark == later
+    assert max(trending.scores.values()) < 10  # weights are back near 1
+    assert trending.current(trending.scores['a']) == pytest.approx(before['a'])
+    assert trending.current(trending.scores['b']) == pytest.approx(before['b'])
+    assert trending.current(trending.scores['c']) == pytest.approx(1)
+    assert [key for key, _ in trending.top.ranked()] == ['c', 'a', 'b']
+
+def test_pruning_forgets_the_weakest_untracked_videos():
+    trending = TrendingScores(k=2, max_tracked=6)
+    at = trending.landmark
+    for n in range(1, 7):
+        trending.record(f'v{n}', n, at)
+    trending.record('v0', 0.5, at)  # 7 tracked: the weakest 2 of the 5 outside the top 2 go
+    assert set(trending.scores) == {'v2', 'v3', 'v4', 'v5', 'v6'}
+    assert [key for key, _ in trending.top.ranked()] == ['v6', 'v5']
+
+def test_trending_is_padded_with_most_viewed():
+    rankings = Rankings(k=3)
+    rankings.popular.reset([('p1', 100), ('p2', 50), ('t1', 10)])
+    rankings.record_views({'t1': 2}, {})
+    assert rankings.trending_ids() == ['t1', 'p1', 'p2']
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import video_cache
+from video_cache import LRUCache, VideoCache
+
+PROJECTION = {'_id': 0, 'id': 1, 'title': 1, 'view_count': 1}
+
+@pytest.fixture
+def videos(mongo, monkeypatch):
+    """Two stored videos, with every document load recorded in the returned list"""
+    from database import videos_collection
+
+    asyncio.run(videos_collection.insert_many([
+        {'id': 'a', 'title': 'A', 'view_count': 3, 'created_at': datetime(2024, 1, 1)},
+        {'id': 'b', 'title': 'B', 'view_count': 5, 'created_at': datetime(2024, 1, 2)},
+    ]))
+    loads = []
+    load_video = video_cache.load_video
+
+    async def recording_load_video(video_id, projection):
+        loads.append(video_id)
+        return await load_video(video_id, projection)
+
+    monkeypatch.setattr(video_cache, 'load_video', recording_load_video)
+    return loads
+
+def test_without_redis_hits_are_served_from_process_memory(videos):
+    cache = VideoCache(PROJECTION, redis_url=None)
+
+    async def reads():
+        return [await cache.get('a'), await cache.get('a'), await cache.get('missing')]
+
+    first, second, missing = asyncio.run(reads())
+    assert first == second == {'id': 'a', 'title': 'A', 'view_count': 3}
+    assert missing is None
+    assert videos == ['a', 'missing']  # missing ids are not cached
+    stats = cache.stats()
+    assert (stats['hits'], stats['loads']) == (1, 2)
+    assert 'redis_hits' not in stats
+
+class CountingCollection:
+    """Records find_one calls and passes everything else to the real collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.find_one_calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def find_one(self, *args, **kwargs):
+        self.find_one_calls += 1
+        return await self.collection.find_one(*args, **kwargs)
+
+def test_a_miss_loads_the_view_count_with_the_document(videos, monkeypatch):
+    collection = CountingCollection(video_cache.videos_collection)
+    monkeypatch.setattr(video_cache, 'videos_collection', collection)
+    cache = VideoCache(PROJECTION, redis_url=None)
+    assert asyncio.run(cache.get('b')) == {'id': 'b', 'title': 'B', 'view_count': 5}
+    assert collection.find_one_calls == 1
+
+def test_concurrent_misses_share_one_load(videos, monkeypatch):
+    cache = VideoCache(PROJECTION, redis_url=None)
+    load_video = video_cache.load_video
+
+    async def slow_load_video(video_id, projection):
+        await asyncio.sleep(0.01)
+        return await load_video(video_id, projection)
+
+    monkeypatch.setattr(video_cache, 'load_video', slow_load_video)
+
+    async def reads():
+        return await asyncio.gather(*(cache.get('b') for _ in range(10)))
+
+    results = asyncio.run(reads())
+    assert videos == ['b']
+    assert all(result == {'id': 'b', 'title': 'B', 'view_count': 5} for result in results)
+    assert not cache._loading
+
+def test_a_load_racing_an_invalidation_is_not_cached(videos, monkeypatch):
+    from database import videos_collection
+
+    cache = VideoCache(PROJECTION, redis_url=None)
+    load_video = video_cache.load_video
+
+    async def load_during_edit(video_id, projection):
+        doc = await load_video(video_id, projection)
+        # The video is edited, and the cache invalidated, after the read but before it is cached
+        await videos_collection.update_one({'id': video_id}, {'$set': {'title': 'Edited'}})
+        await cache.invalidate([video_id])
+        return doc
+
+    monkeypatch.setattr(video_cache, 'load_video', load_during_edit)
+
+    async def reads():
+        raced = await cache.get('a')
+        monkeypatch.setattr(video_cache, 'load_video', load_video)
+        return raced, await cache.get('a')
+
+    raced, fresh = asyncio.run(reads())
+    assert raced['title'] == 'A'  # the racing read still answers with what it loaded
+    assert fresh['title'] == 'Edited'
+    assert cache.loads == 2
+
+def test_batch_loads_racing_an_invalidation_are_not_cached(videos, monkeypatch):
+    cache = VideoCache(PROJECTION, redis_url=None)
+    load_videos = video_cache.load_videos
+
+    async def load_during_invalidation(video_ids, projection):
+        docs = await load_videos(video_ids, projection)
+        await cache.invalidate(video_ids)
+        return docs
+
+    monkeypatch.setattr(video_cache, 'load_videos', load_during_invalidation)
+    found = asyncio.run(cache.get_many(['a', 'b']))
+    assert {video_id: doc['view_count'] for video_id, doc in found.items()} == {'a': 3, 'b': 5}
+    assert len(cache.local) == 0 and len(cache.view_counts) == 0
+
+def test_lru_evicts_the_least_recently_used_and_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(video_cache.time, 'monotonic', lambda: now[0])
+    cache = LRUCache(max_entries=2, ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # 'b' is the least recently used
+    assert (cache.get('b'), cache.evictions) == (None, 1)
+    now[0] += 11
+    assert (cache.get('a'), cache.expirations) == (None, 1)
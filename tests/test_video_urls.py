@@ -0,0 +1,111 @@
+import random
+import re
+
+import pytest
+
+from video_urls import classify_url, classify_urls
+
+def legacy_extract_video_info(url: str):
+    """The classifier video_urls replaced, as it was in server.py"""
+    youtube_pattern = r'(?:youtube\.com/watch\?v=|youtu\.be/)([^&\n?#]+)'
+    rumble_pattern = r'rumble\.com/(?:embed/)?([^/?]+)'
+
+    youtube_match = re.search(youtube_pattern, url)
+    rumble_match = re.search(rumble_pattern, url)
+
+    if youtube_match:
+        return {'type': 'youtube', 'video_id': youtube_match.group(1),
+                'embed_url': f'https://www.youtube.com/embed/{youtube_match.group(1)}'}
+    elif rumble_match:
+        return {'type': 'rumble', 'video_id': rumble_match.group(1),
+                'embed_url': f'https://rumble.com/embed/{rumble_match.group(1)}/'}
+    return {'type': 'direct', 'video_id': None, 'embed_url': url}
+
+CORPUS = [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://youtube.com/watch?v=dQw4w9WgXcQ',
+    'http://youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://m.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://music.youtube.com/watch?v=abc',
+    'https://gaming.youtube.com/watch?v=abc&list=PL1',
+    'https://www.youtube.com/watch?v=abc&t=42s',
+    'https://www.youtube.com/watch?v=abc#t=1m',
+    'https://user:pw@youtube.com/watch?v=a',
+    'https://user@www.youtube.com/watch?v=a',
+    'youtube.com/watch?v=abc',
+    'www.youtube.com/watch?v=abc',
+    '//www.youtube.com/watch?v=abc',
+    'https://www.youtube.com/watch?feature=share&v=abc',
+    'https://www.youtube.com/embed/abc',
+    'https://www.youtube.com/shorts/abc',
+    'https://www.youtube.com/',
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ?t=10',
+    'https://www.youtu.be/abc',
+    'youtu.be/abc',
+    'youtu.be/abc?next=//example.com',
+    'https://youtu.be/',
+    'https://rumble.com/v4abcd-small-business-tips.html',
+    'https://rumble.com/embed/v4abcd/?pub=4',
+    'https://www.rumble.com/v4abcd-tips.html',
+    'https://user:pw@rumble.com/v4abcd',
+    'rumble.com/v4abcd',
+    'https://rumble.com/',
+    'https://cdn.example.com/videos/abc.mp4',
+    'https://media.smenetwork.example/stream/abc/index.m3u8',
+    'https://example.com/watch?v=abc',
+    'https://vimeo.com/123456',
+    'https://youtube.com.example.com/watch?v=abc',
+    'ftp://files.example.com/video.mov',
+    '/videos/local.mp4',
+    'not a url',
+    '',
+]
+
+# Where the registry deliberately differs from the old substring search
+INTENDED_DIFFERENCES = {
+    # Ports are part of the host, not of the path
+    'https://www.youtube.com:443/watch?v=abc': 'youtube',
+    'http://rumble.com:8080/v4abcd': 'rumble',
+    # Host names are case-insensitive
+    'https://WWW.YouTube.com/watch?v=abc': 'youtube',
+    # A provider URL in the path or query is not the video's own host
+    'https://example.com/?next=https://youtu.be/abc': 'direct',
+    'https://notyoutube.com/watch?v=abc': 'direct',
+    'https://cdn.example.com/mirror/rumble.com/v4abcd': 'direct',
+}
+
+def generated_urls(count: int):
+    rng = random.Random(42)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'
+    templates = (
+        'https://www.youtube.com/watch?v={}',
+        'https://m.youtube.com/watch?v={}&feature=share',
+        'https://youtu.be/{}',
+        'https://rumble.com/v{}-small-business-tips.html',
+        'https://rumble.com/embed/v{}/?pub=4',
+        'https://cdn.example.com/videos/{}.mp4',
+    )
+    return [rng.choice(templates).format(''.join(rng.choice(alphabet) for _ in range(11))) for _ in range(count)]
+
+@pytest.mark.parametrize('url', CORPUS)
+def test_matches_legacy_classifier(url):
+    assert classify_url(url) == legacy_extract_video_info(url)
+
+def test_matches_legacy_classifier_on_generated_urls():
+    urls = generated_urls(2000)
+    assert classify_urls(urls) == [legacy_extract_video_info(url) for url in urls]
+
+@pytest.mark.parametrize('url,video_type', sorted(INTENDED_DIFFERENCES.items()))
+def test_intended_differences(url, video_type):
+    assert classify_url(url)['type'] == video_type
+    assert legacy_extract_video_info(url)['type'] != video_type
+
+def test_embed_urls():
+    assert classify_url('https://music.youtube.com/watch?v=abc')['embed_url'] == 'https://www.youtube.com/embed/abc'
+    assert classify_url('https://rumble.com/embed/v4abcd/?pub=4') == {
+        'type': 'rumble', 'video_id': 'v4abcd', 'embed_url': 'https://rumble.com/embed/v4abcd/'
+    }
+    assert classify_url('https://cdn.example.com/a.mp4') == {
+        'type': 'direct', 'video_id': None, 'embed_url': 'https://cdn.example.com/a.mp4'
+    }
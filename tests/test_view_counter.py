@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+
+import view_counter as view_counter_module
+from view_counter import ViewCounter
+
+def stored(*ids):
+    from database import videos_collection
+
+    asyncio.run(videos_collection.insert_many([
+        {'id': video_id, 'view_count': 0, 'created_at': datetime(2024, 1, 1)} for video_id in ids
+    ]))
+
+def view_counts():
+    from database import videos_collection
+
+    async def read():
+        return {doc['id']: doc['view_count'] async for doc in videos_collection.find({}, {'_id': 0})}
+    return asyncio.run(read())
+
+class FailingCollection:
+    async def bulk_write(self, requests, ordered=True):
+        raise ConnectionError('primary stepped down')
+
+def test_a_failed_flush_merges_its_views_back(mongo, monkeypatch):
+    stored('a', 'b')
+    counter = ViewCounter()
+    counter.record('a', 2)
+    counter.record('b')
+
+    async def failed_then_retried():
+        with monkeypatch.context() as patch:
+            patch.setattr(view_counter_module, 'videos_collection', FailingCollection())
+            assert await counter.flush() == 0
+        # Views recorded while the write was failing are merged with the ones it returned
+        counter.record('a')
+        return await counter.flush()
+
+    assert asyncio.run(failed_then_retried()) == 2
+    assert view_counts() == {'a': 3, 'b': 1}
+    assert (counter.pending, counter.pending_events, counter.flushed_events) == ({}, 0, 4)
+
+def test_unknown_ids_are_not_counted(mongo):
+    stored('a')
+    counter = ViewCounter()
+
+    async def check():
+        return await counter.exists('a'), await counter.exists('gone')
+
+    assert asyncio.run(check()) == (True, False)
+    assert 'gone' not in counter.known_ids and 'a' in counter.known_ids
+
+def test_views_of_unknown_videos_are_a_404_and_not_buffered(api, monkeypatch):
+    import server
+
+    counter = ViewCounter()
+    monkeypatch.setattr(server, 'view_counter', counter)
+    monkeypatch.setattr(server, 'VIEW_COUNTER_ENABLED', True)
+    assert api.put('/api/videos/gone/view').status_code == 404
+    assert counter.pending == {}
+
+def test_stopping_flushes_pending_views(mongo):
+    stored('a')
+    counter = ViewCounter(interval_ms=60000)
+
+    async def run():
+        counter.start()
+        counter.record('a', 5)
+        await counter.stop()
+
+    asyncio.run(run())
+    assert view_counts() == {'a': 5}
+    assert counter._task is None and counter.pending == {}
+
+def test_a_full_batch_flushes_early(mongo):
+    stored('a')
+    counter = ViewCounter(interval_ms=60000, max_events=3)
+
+    async def run():
+        for _ in range(3):
+            counter.record('a')
+        await counter._flushing
+
+    asyncio.run(run())
+    assert view_counts() == {'a': 3}
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import youtube
+from youtube import YOUTUBE_MAX_ATTEMPTS, EnrichmentQueue, MetadataCache
+
+def item(youtube_id, views=1000):
+    return {
+        'id': youtube_id,
+        'snippet': {'title': f'YouTube {youtube_id}', 'description': 'd', 'thumbnails': {'high': {'url': 'hq.jpg'}}},
+        'contentDetails': {'duration': 'PT1M'},
+        'statistics': {'viewCount': str(views)},
+    }
+
+class FakeResponse:
+    def __init__(self, status_code, items=()):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.items = list(items)
+
+    def json(self):
+        return {'items': self.items}
+
+    def raise_for_status(self):
+        pass
+
+class FakeYouTube:
+    """videos.list that answers 503 for any call including a failing id"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def get(self, url, params, timeout):
+        ids = params['id'].split(',')
+        self.calls.append(ids)
+        if self.failing & set(ids):
+            return FakeResponse(503)
+        return FakeResponse(200, [item(youtube_id) for youtube_id in ids])
+
+@pytest.fixture
+def api_stub(mongo, monkeypatch):
+    stub = FakeYouTube(failing={'yt-bad'})
+    monkeypatch.setattr(youtube, 'YOUTUBE_API_KEY', 'key')
+    monkeypatch.setattr(youtube, '_session', stub)
+    monkeypatch.setattr(youtube, 'metadata_cache', MetadataCache())
+    monkeypatch.setattr(youtube._videos_list.retry, 'sleep', lambda seconds: None)
+    return stub
+
+def store(*docs):
+    from database import videos_collection
+
+    asyncio.run(videos_collection.insert_many([dict({
+        'title': 'Submitted', 'view_count': 5, 'created_at': datetime(2024, 1, 1), 'enrichment_status': 'pending',
+    }, **doc) for doc in docs]))
+
+def stored():
+    from database import videos_collection
+
+    async def read():
+        return {doc['id']: doc async for doc in videos_collection.find({}, {'_id': 0})}
+    return asyncio.run(read())
+
+def test_only_pending_videos_are_written(api_stub):
+    store({'id': 'a', 'video_id': 'yt-a'}, {'id': 'b', 'video_id': 'yt-b', 'enrichment_status': 'done', 'title': 'Kept'})
+    queue = EnrichmentQueue()
+    notified = []
+    queue.add_listener(notified.append)
+
+    asyncio.run(queue.enrich([('a', 'yt-a'), ('b', 'yt-b')]))
+
+    docs = stored()
+    assert (docs['a']['enrichment_status'], docs['a']['title']) == ('done', 'YouTube yt-a')
+    assert docs['a']['view_count'] == 1005  # YouTube's count plus the views recorded here
+    assert (docs['b']['title'], docs['b']['view_count']) == ('Kept', 5)
+    assert notified == [['a']]
+
+def test_giving_up_on_one_batch_keeps_the_rest_of_the_queue(api_stub, monkeypatch):
+    monkeypatch.setattr(youtube, 'YOUTUBE_BATCH_SIZE', 1)
+    store({'id': 'a', 'video_id': 'yt-a'}, {'id': 'bad', 'video_id': 'yt-bad'}, {'id': 'c', 'video_id': 'yt-c'})
+    queue = EnrichmentQueue(workers=1)
+
+    async def run():
+        queue.start()
+        for doc_id in ('a', 'bad', 'c'):
+            queue.enqueue(doc_id, f'yt-{doc_id}')
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert api_stub.calls.count(['yt-bad']) == YOUTUBE_MAX_ATTEMPTS
+    statuses = {doc_id: doc['enrichment_status'] for doc_id, doc in stored().items()}
+    assert statuses == {'a': 'done', 'bad': 'failed', 'c': 'done'}
+    assert queue.queue.empty()
+
+def test_resume_pending_queues_only_pending_videos(api_stub):
+    store({'id': 'a', 'video_id': 'yt-a'}, {'id': 'b', 'video_id': 'yt-b', 'enrichment_status': 'done'},
+          {'id': 'c', 'video_id': 'yt-c', 'enrichment_status': 'failed'})
+    queue = EnrichmentQueue()
+    assert asyncio.run(queue.resume_pending()) == 1
+    assert queue.queue.get_nowait() == ('a', 'yt-a')